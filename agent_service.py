@@ -5,54 +5,315 @@ Menyediakan API endpoints:
 - GET /health - Health check
 - GET /api/status - System status summary
 - GET /api/history - Command history
+- GET /api/completions - Kandidat completion untuk REPL CLI
+- GET /metrics - Metrics format Prometheus (request, command, DB, host)
+- POST /api/admin/profile - Profiling on-demand (collapsed stack / pstats)
+- GET /api/debug/traces - Trace command terbaru (ringkas atau OTLP/JSON)
+- POST /api/tools/install - Batch install tools
+- GET /api/tools/install/<job_id> - Status batch install
 - GET / - Web dashboard
+
+Command chat juga dilayani lewat Unix domain socket (core.socket_server)
+untuk CLI lokal.
+
+Response /api/status dan /api/history membawa ETag (versi snapshot system
+monitor / high-water mark history) sehingga polling dengan If-None-Match
+dijawab 304 tanpa body; response di atas HTTP_COMPRESS_MIN_BYTES dikompres
+gzip (atau brotli jika package `brotli` terinstall).
+
+Import modul ini tidak punya side effect filesystem: directory runtime,
+log file handler, dan socket dibuat oleh init() (dipanggil di __main__ atau
+lewat create_app() untuk WSGI server). Tools manager dan install scheduler
+di-import saat endpoint-nya pertama kali dipakai.
 """
 
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, g
 from datetime import datetime
+import os
+import sys
+import gzip
+import hmac
+import time
 import logging
 from pathlib import Path
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # Opsional: tanpa brotli hanya gzip
+    brotli = None
 
 # Import konfigurasi
+import config.settings as settings
 from config.settings import (
     SERVER_HOST,
     SERVER_PORT,
     DEBUG_MODE,
-    LOG_FILE,
-    LOG_LEVEL,
     API_PREFIX,
-    PROJECT_ROOT
+    PROJECT_ROOT,
+    MONITOR_CACHE_SECONDS,
+    HTTP_COMPRESS_MIN_BYTES,
+    HTTP_GZIP_LEVEL,
+    HTTP_BROTLI_QUALITY,
+    SOCKET_ENABLED,
+    METRICS_ENABLED,
+    ADMIN_TOKEN
 )
 
 # Import core modules
-from core.chat_rules import process_command
-from core.system_monitor import get_system_summary
+from core.chat_handler import handle_chat, get_completions
+from core.system_monitor import get_system_summary, get_snapshot_version
+from core.single_flight import get_single_flight
+from core import metrics, profiler, tracing
+from core.log_pipeline import setup_logging, set_request_id, reset_request_id, get_request_id
 from storage.db import get_db
 
-# Setup logging
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
+access_logger = logging.getLogger('agent_service.access')
 
 # Inisialisasi Flask app
 app = Flask(__name__)
-db = get_db()
+
+_initialized = False
+
+
+def init(start_socket: bool = False) -> None:
+    """Inisialisasi runtime service (idempotent).
+
+    Args:
+        start_socket: Buka Unix domain socket untuk CLI lokal
+    """
+    global _initialized
+    if _initialized:
+        return
+    settings.init()
+    
+    # Logging non-blocking: QueueHandler + listener (JSON lines, rotasi)
+    setup_logging()
+    
+    if start_socket and SOCKET_ENABLED:
+        from core.socket_server import AgentSocketServer
+        AgentSocketServer().start()
+    _initialized = True
+
+
+def create_app() -> Flask:
+    """Entry point WSGI server (misal `gunicorn 'agent_service:create_app()'`)."""
+    init()
+    return app
+
+
+def _get_tools_manager():
+    from core.tools_manager import get_tools_manager
+    return get_tools_manager()
+
+
+def _loaded_tools_manager():
+    """ToolsManager jika sudah dibuat, tanpa memicu import/inisialisasi."""
+    module = sys.modules.get('core.tools_manager')
+    return getattr(module, '_tools_manager_instance', None)
+
+
+def _get_install_scheduler():
+    from core.install_scheduler import get_install_scheduler
+    return get_install_scheduler()
+
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+    g.request_id_token = set_request_id(request.headers.get('X-Request-Id'))
+    g.profile_token = profiler.begin('request')
+
+
+@app.teardown_request
+def _end_request(exc=None):
+    profiler.end(g.pop('profile_token', None))
+    token = g.pop('request_id_token', None)
+    if token is not None:
+        reset_request_id(token)
+
+
+@app.after_request
+def _record_request(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        # Label route memakai pola URL (misal /api/tools/install/<job_id>)
+        # agar cardinality tidak tumbuh per job id
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        elapsed = time.perf_counter() - start
+        metrics.HTTP_REQUEST_SECONDS.observe(elapsed, route, request.method)
+        metrics.HTTP_REQUESTS.inc(route, request.method, str(response.status_code))
+        access_logger.info(
+            "%s %s %s", request.method, request.path, response.status_code,
+            extra={
+                'sampled': True,
+                'route': route,
+                'status': response.status_code,
+                'latency_ms': round(elapsed * 1000, 3),
+                'remote_addr': request.remote_addr
+            }
+        )
+    request_id = get_request_id()
+    if request_id is not None:
+        response.headers['X-Request-Id'] = request_id
+    return response
+
+
+@app.after_request
+def _compress(response):
+    """Kompres response JSON/teks di atas HTTP_COMPRESS_MIN_BYTES."""
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or not (response.mimetype == 'application/json' or response.mimetype.startswith('text/'))):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < HTTP_COMPRESS_MIN_BYTES:
+        return response
+    
+    encoding = request.accept_encodings.best_match(['br', 'gzip'] if brotli is not None else ['gzip'])
+    if encoding == 'br':
+        response.set_data(brotli.compress(data, quality=HTTP_BROTLI_QUALITY))
+    elif encoding == 'gzip':
+        response.set_data(gzip.compress(data, compresslevel=HTTP_GZIP_LEVEL))
+    else:
+        return response
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def _cache_headers(response: Response, etag: str, max_age: Optional[int] = None) -> Response:
+    """Pasang ETag (weak, aman untuk versi terkompres) dan Cache-Control.
+    
+    Args:
+        response: Response yang akan dikirim
+        etag: Versi data
+        max_age: Detik response boleh dipakai tanpa revalidasi
+            (None = `no-cache`, selalu revalidasi dengan If-None-Match)
+    """
+    response.set_etag(etag, weak=True)
+    if max_age is None:
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.max_age = max_age
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Metrics format teks Prometheus, dirender saat scrape."""
+    if not METRICS_ENABLED:
+        return jsonify({
+            'success': False,
+            'message': 'Metrics disabled (AG_METRICS=false)',
+            'timestamp': datetime.now().isoformat()
+        }), 404
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+def _admin_authorized() -> bool:
+    """Endpoint admin: header X-Admin-Token, atau localhost jika token tidak diset."""
+    if ADMIN_TOKEN:
+        return hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN)
+    # Request lewat reverse proxy juga datang dari 127.0.0.1
+    return request.remote_addr in ('127.0.0.1', '::1') and 'X-Forwarded-For' not in request.headers
+
+
+@app.route(f'{API_PREFIX}/admin/profile', methods=['POST'])
+def admin_profile():
+    """Jalankan profiler selama N detik dan kembalikan hasilnya.
+    
+    Request Body:
+        {
+            "seconds": 10,
+            "format": "collapsed" | "pstats" | "text",
+            "command_type": "ram_status" (optional),
+            "interval_ms": 5 (optional, mode collapsed)
+        }
+    
+    Response: collapsed stack (text/plain, untuk flamegraph), dump pstats
+    (application/octet-stream), atau ringkasan pstats (text/plain). Header
+    X-Profile-Requests/X-Profile-Samples/X-Profile-Skipped berisi jumlah
+    request yang masuk hasil, jumlah sample, dan request yang tidak bisa
+    diprofile.
+    """
+    if not _admin_authorized():
+        return jsonify({
+            'success': False,
+            'message': 'Unauthorized',
+            'timestamp': datetime.now().isoformat()
+        }), 403
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        seconds = float(data.get('seconds', 10))
+        interval_ms = float(data['interval_ms']) if data.get('interval_ms') else None
+    except (TypeError, ValueError):
+        seconds, interval_ms = 0, None
+    mode = data.get('format', 'collapsed')
+    
+    success, result = profiler.profile(seconds, mode, data.get('command_type'), interval_ms)
+    if not success:
+        return jsonify({
+            'success': False,
+            'message': result,
+            'timestamp': datetime.now().isoformat()
+        }), 409 if result == profiler.BUSY_MESSAGE else 400
+    
+    headers = {
+        'X-Profile-Requests': str(result.matched),
+        'X-Profile-Samples': str(result.samples),
+        # Mode pstats di Python 3.12+: request bersamaan tidak ikut diprofile
+        'X-Profile-Skipped': str(result.skipped)
+    }
+    if mode == 'pstats':
+        headers['Content-Disposition'] = 'attachment; filename=ag-profile.pstats'
+        return Response(result.render_pstats(), content_type='application/octet-stream', headers=headers)
+    body = result.render_collapsed() if mode == 'collapsed' else result.render_text()
+    return Response(body, content_type='text/plain; charset=utf-8', headers=headers)
+
+
+@app.route(f'{API_PREFIX}/debug/traces', methods=['GET'])
+def debug_traces():
+    """Trace command terbaru dari ring buffer (?limit=N, ?format=otlp)."""
+    if not _admin_authorized():
+        return jsonify({
+            'success': False,
+            'message': 'Unauthorized',
+            'timestamp': datetime.now().isoformat()
+        }), 403
+    
+    traces = tracing.get_traces(request.args.get('limit', 20, type=int))
+    if request.args.get('format') == 'otlp':
+        return jsonify(tracing.to_otlp(traces))
+    
+    return jsonify({
+        'success': True,
+        'data': [trace.to_dict() for trace in traces],
+        'timestamp': datetime.now().isoformat()
+    })
 
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint."""
-    return jsonify({
+    """Health check endpoint.
+    
+    Statistik build hanya disertakan jika ToolsManager sudah dimuat: membuatnya
+    di sini berarti reconcile manifest + GC sweep di setiap poll.
+    """
+    data = {
         'status': 'healthy',
         'service': 'Agent Pribadi (AG)',
+        'coalescing': get_single_flight().get_stats(),
         'timestamp': datetime.now().isoformat()
-    })
+    }
+    manager = _loaded_tools_manager()
+    if manager is not None:
+        data['builds'] = manager.get_build_stats()
+    return jsonify(data)
 
 
 @app.route(f'{API_PREFIX}/chat', methods=['POST'])
@@ -61,7 +322,8 @@ def chat():
     
     Request Body:
         {
-            "message": "user command"
+            "message": "user command",
+            "timing": false (optional, juga ?timing=1)
         }
     
     Response:
@@ -70,7 +332,8 @@ def chat():
             "message": str,
             "data": dict (optional),
             "command_type": str,
-            "timestamp": str
+            "timestamp": str,
+            "timing": dict (optional, span trace command ini)
         }
     """
     try:
@@ -83,30 +346,14 @@ def chat():
                 'timestamp': datetime.now().isoformat()
             }), 400
         
-        user_message = data['message']
-        logger.info(f"Processing command: {user_message}")
-        
-        # Process command dengan chat_rules
-        result = process_command(user_message)
-        
-        # Tambahkan timestamp
-        result['timestamp'] = datetime.now().isoformat()
-        
-        # Save ke database
-        db.add_command_history(
-            command=user_message,
-            command_type=result.get('command_type', 'unknown'),
-            success=result.get('success', False),
-            response_preview=result.get('message', ''),
-            data=result.get('data', None)
-        )
-        
-        logger.info(f"Command processed: {result['command_type']}, success: {result['success']}")
+        # Process command (chat_rules + history), sama dengan jalur Unix socket
+        timing = bool(data.get('timing')) or request.args.get('timing') in ('1', 'true')
+        result = handle_chat(data['message'], timing=timing)
         
         return jsonify(result)
         
     except Exception as e:
-        logger.error(f"Error processing chat: {str(e)}", exc_info=True)
+        logger.error("Error processing chat: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'message': f'Internal server error: {str(e)}',
@@ -116,16 +363,30 @@ def chat():
 
 @app.route(f'{API_PREFIX}/status', methods=['GET'])
 def status():
-    """System status summary endpoint."""
+    """System status summary endpoint.
+    
+    ETag = versi snapshot system monitor. Selama sample di cache masih
+    berlaku, If-None-Match yang cocok dijawab 304 tanpa sampling; setelah
+    sampling ulang versi hanya berubah jika datanya berubah.
+    """
+    version = get_snapshot_version()
+    if version is not None and request.if_none_match.contains_weak(version):
+        return _cache_headers(Response(status=304), version, MONITOR_CACHE_SECONDS)
+    
     try:
         summary = get_system_summary()
-        return jsonify({
+        response = jsonify({
             'success': True,
             'data': summary,
             'timestamp': datetime.now().isoformat()
         })
+        version = get_snapshot_version()
+        if version is None:
+            # Ada sample yang gagal (tidak di-cache), tidak ada versi
+            return response
+        return _cache_headers(response, version, MONITOR_CACHE_SECONDS).make_conditional(request)
     except Exception as e:
-        logger.error(f"Error getting status: {str(e)}", exc_info=True)
+        logger.error("Error getting status: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'message': f'Error: {str(e)}',
@@ -135,13 +396,20 @@ def status():
 
 @app.route(f'{API_PREFIX}/history', methods=['GET'])
 def history():
-    """Command history endpoint."""
+    """Command history endpoint (ETag dari high-water mark history)."""
     try:
         limit = request.args.get('limit', 20, type=int)
+        db = get_db()
+        
+        # History dan statistik hanya berubah saat ada insert baru
+        etag = f"h{db.get_history_version()}-{limit}"
+        if request.if_none_match.contains_weak(etag):
+            return _cache_headers(Response(status=304), etag)
+        
         history_data = db.get_command_history(limit=limit)
         stats = db.get_command_statistics()
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'data': {
                 'history': history_data,
@@ -149,8 +417,9 @@ def history():
             },
             'timestamp': datetime.now().isoformat()
         })
+        return _cache_headers(response, etag)
     except Exception as e:
-        logger.error(f"Error getting history: {str(e)}", exc_info=True)
+        logger.error("Error getting history: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'message': f'Error: {str(e)}',
@@ -158,6 +427,102 @@ def history():
         }), 500
 
 
+@app.route(f'{API_PREFIX}/completions', methods=['GET'])
+def completions():
+    """Kandidat completion (intent + tools) untuk `ag --repl`."""
+    return jsonify({
+        'success': True,
+        'data': get_completions(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+
+@app.route(f'{API_PREFIX}/tools/install', methods=['POST'])
+def tools_install():
+    """Batch install endpoint.
+    
+    Request Body:
+        {
+            "tools": [{"tool": "nginx", "version": "1.25.4"}, "node 22.14.0"],
+            "force": false,
+            "wait": true
+        }
+    
+    Response berisi job dengan status per tool. Jika "wait" false, response
+    langsung dikembalikan (202) dan status bisa dipantau lewat
+    GET /api/tools/install/<job_id>.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        tools = data.get('tools')
+        
+        if not isinstance(tools, list) or not tools:
+            return jsonify({
+                'success': False,
+                'message': 'Invalid request. Field "tools" (list) required.',
+                'timestamp': datetime.now().isoformat()
+            }), 400
+        
+        items = []
+        for entry in tools:
+            if isinstance(entry, dict):
+                tool, version = entry.get('tool'), entry.get('version')
+            elif isinstance(entry, str) and len(entry.split()) == 2:
+                tool, version = entry.split()
+            else:
+                tool, version = None, None
+            
+            if not tool or not version:
+                return jsonify({
+                    'success': False,
+                    'message': f'Invalid tool entry: {entry}',
+                    'timestamp': datetime.now().isoformat()
+                }), 400
+            items.append((str(tool).lower(), str(version)))
+        
+        scheduler = _get_install_scheduler()
+        job_id = scheduler.submit(items, force=bool(data.get('force', False)))
+        
+        if not data.get('wait', True):
+            return jsonify({
+                'success': True,
+                'data': scheduler.get_job(job_id),
+                'timestamp': datetime.now().isoformat()
+            }), 202
+        
+        job = scheduler.wait(job_id)
+        return jsonify({
+            'success': all(item['status'] == 'done' for item in job['items']),
+            'data': job,
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        logger.error("Error installing tools: %s", e, exc_info=True)
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}',
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+
+@app.route(f'{API_PREFIX}/tools/install/<job_id>', methods=['GET'])
+def tools_install_status(job_id):
+    """Status batch install per tool."""
+    job = _get_install_scheduler().get_job(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'message': f'Job {job_id} tidak ditemukan',
+            'timestamp': datetime.now().isoformat()
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'data': job,
+        'timestamp': datetime.now().isoformat()
+    })
+
+
 @app.route('/', methods=['GET'])
 def dashboard():
     """Web dashboard sederhana."""
@@ -169,6 +534,10 @@ def dashboard():
 
 
 if __name__ == '__main__':
+    # Reloader debug menjalankan parent watcher + child server; socket
+    # hanya dibuka di proses yang benar-benar melayani request
+    init(start_socket=not DEBUG_MODE or os.environ.get('WERKZEUG_RUN_MAIN') == 'true')
+    
     logger.info(f"Starting Agent Service on {SERVER_HOST}:{SERVER_PORT}")
     logger.info(f"Debug mode: {DEBUG_MODE}")
     logger.info(f"Project root: {PROJECT_ROOT}")
@@ -0,0 +1,172 @@
+"""AG Client - client native untuk Agent Pribadi lewat Unix domain socket
+
+Dipanggil oleh ag_launcher.sh dengan `python3 -I -S` agar startup
+interpreter minimal. Jalur `ag <command>` hanya memakai modul builtin
+(`_socket`, `posix`) yang sudah ter-load atau berupa extension C: tanpa
+site-packages, tanpa `socket`/`enum`/`json`/`re`, tanpa modul project.
+Response diminta dalam mode teks (`"reply": "text"`) sehingga tidak perlu
+decode JSON.
+
+Protokol (lihat core/socket_server.py): frame
+[4 byte panjang big-endian][payload], satu response per request.
+
+Usage:
+    python3 -I -S ag_client.py [-v] <command...>
+
+Exit code:
+    0 = sukses, 1 = Agent gagal memproses command,
+    3 = socket tidak tersedia (launcher fallback ke HTTP)
+"""
+
+import sys
+import posix
+import _socket
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_UNAVAILABLE = 3
+
+DEFAULT_TIMEOUT = 600.0
+
+
+def socket_path() -> str:
+    """Path socket: $AG_SOCKET atau <project>/storage/ag.sock."""
+    path = posix.environ.get(b'AG_SOCKET')
+    if path:
+        return path.decode()
+    # ag_launcher.sh memanggil client dengan path absolut yang sudah di-resolve
+    cli_dir = __file__.rpartition('/')[0] or '.'
+    return f"{cli_dir}/../storage/ag.sock"
+
+
+def connect(path: str = None, timeout: float = DEFAULT_TIMEOUT):
+    """Buka koneksi ke service (raise OSError jika tidak tersedia)."""
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path or socket_path())
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _recv_exact(sock, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("connection closed by agent")
+        buf += chunk
+    return bytes(buf)
+
+
+def _roundtrip(sock, payload: bytes) -> bytes:
+    """Kirim satu frame, terima satu frame."""
+    sock.sendall(len(payload).to_bytes(4, 'big') + payload)
+    size = int.from_bytes(_recv_exact(sock, 4), 'big')
+    return _recv_exact(sock, size)
+
+
+def _json_string(value: str) -> str:
+    """Encode string sebagai literal JSON tanpa import modul json."""
+    out = ['"']
+    for ch in value:
+        if ch == '"' or ch == '\\':
+            out.append('\\' + ch)
+        elif ch < ' ':
+            out.append(f'\\u{ord(ch):04x}')
+        else:
+            out.append(ch)
+    out.append('"')
+    return ''.join(out)
+
+
+def call(sock, request: dict) -> dict:
+    """Kirim request JSON dan kembalikan response JSON (untuk REPL/benchmark)."""
+    import json
+
+    payload = json.dumps(request, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.loads(_roundtrip(sock, payload))
+
+
+def chat(sock, message: str) -> dict:
+    return call(sock, {'op': 'chat', 'message': message})
+
+
+def chat_text(sock, message: str):
+    """Chat dengan response mode teks.
+
+    Returns:
+        Tuple[bool, str]: (success, message)
+    """
+    payload = f'{{"op":"chat","reply":"text","message":{_json_string(message)}}}'.encode('utf-8')
+    reply = _roundtrip(sock, payload).decode('utf-8')
+    status, _, text = reply.partition('\n')
+    return status == '0', text
+
+
+def speak(text: str) -> None:
+    """TTS di background (espeak / say / PowerShell), tanpa menunggu selesai."""
+    import shutil
+    import subprocess
+
+    clean = text.replace('•', '').replace('*', ' ')
+    if shutil.which('espeak'):
+        cmd = ['espeak', '-v', 'en-us', '-s', '140', clean]
+    elif shutil.which('say'):
+        cmd = ['say', clean]
+    elif shutil.which('powershell.exe'):
+        escaped = clean.replace("'", "''")
+        cmd = ['powershell.exe', '-Command',
+               "Add-Type -AssemblyName System.Speech; "
+               f"(New-Object System.Speech.Synthesis.SpeechSynthesizer).Speak('{escaped}')"]
+    else:
+        print("[INFO: TTS tidak tersedia atau tidak dikonfigurasi di sistem ini.]", file=sys.stderr)
+        return
+    subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def main(argv) -> int:
+    use_tts = False
+    if argv and argv[0] == '-v':
+        use_tts = True
+        argv = argv[1:]
+
+    command = ' '.join(argv)
+    if not command:
+        print("Usage: ag [-v] <command>", file=sys.stderr)
+        return EXIT_FAILED
+
+    try:
+        sock = connect()
+    except OSError:
+        return EXIT_UNAVAILABLE
+
+    try:
+        success, message = chat_text(sock, command)
+    except (OSError, ValueError) as e:
+        print(f"Error: Koneksi ke Agent Service terputus ({e}).", file=sys.stderr)
+        return EXIT_FAILED
+    finally:
+        sock.close()
+
+    return print_result(success, message, use_tts)
+
+
+def print_result(success: bool, message: str, use_tts: bool = False) -> int:
+    """Tampilkan response (dan TTS) seperti ag_launcher.sh; kembalikan exit code."""
+    if not success:
+        print("Error: Agent Service gagal memproses command.")
+        print("Detail:")
+        print(message)
+        return EXIT_FAILED
+
+    print(message.replace('•', '*'))
+    if use_tts:
+        speak(message)
+    return EXIT_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
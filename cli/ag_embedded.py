@@ -0,0 +1,62 @@
+"""AG Embedded - jalankan command in-process tanpa Agent Service
+
+Dipakai ag_launcher.sh jika service tidak berjalan (socket dan HTTP tidak
+tersedia). Command diproses langsung dengan core.chat_handler.handle_chat,
+jadi hasilnya tetap masuk command history lewat storage.db yang sama.
+
+Hanya modul yang dibutuhkan intent yang di-import: chat_rules memuat
+tools manager (requests, yaml, tarfile, ...) hanya untuk command tools,
+dan Flask tidak pernah di-import. Untuk `ag cek ram` yang dimuat hanya
+persona, system_monitor (psutil), dan storage.db.
+
+Budget cold start (shell sampai jawaban tercetak) untuk command sistem:
+COLD_START_BUDGET_MS. Diukur dengan:
+    python3 cli/bench_cli.py --embedded
+"""
+
+import os
+import sys
+
+# Budget p50 cold start `ag cek ram` mode embedded (milidetik)
+COLD_START_BUDGET_MS = 200
+
+CLI_DIR = os.path.dirname(os.path.realpath(__file__))
+PROJECT_ROOT = os.path.dirname(CLI_DIR)
+
+
+def run(command: str) -> dict:
+    """Proses satu command in-process (termasuk simpan history)."""
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    from core.chat_handler import handle_chat
+
+    return handle_chat(command)
+
+
+def main(argv) -> int:
+    sys.path.insert(0, CLI_DIR)
+    import ag_client
+
+    use_tts = False
+    if argv and argv[0] == '-v':
+        use_tts = True
+        argv = argv[1:]
+
+    command = ' '.join(argv)
+    if not command:
+        print("Usage: ag [-v] <command>", file=sys.stderr)
+        return ag_client.EXIT_FAILED
+
+    try:
+        result = run(command)
+    except Exception as e:
+        print(f"Error: Gagal menjalankan command tanpa Agent Service: {e}")
+        return ag_client.EXIT_FAILED
+
+    message = result.get('message') or ''
+    success = bool(message) and result.get('success') is not False
+    return ag_client.print_result(success, message or f"Raw Response: {result}", use_tts)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
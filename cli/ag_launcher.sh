@@ -7,6 +7,8 @@
 # --- Configuration ---
 API_URL="http://localhost:7777/api/chat"
 USE_TTS=false
+CLI_DIR="$(cd "$(dirname "$(readlink -f "${BASH_SOURCE[0]}" 2>/dev/null || echo "${BASH_SOURCE[0]}")")" && pwd)"
+CLIENT="$CLI_DIR/ag_client.py"
 
 # --- Function: Speak ---
 # Fungsi cross-platform untuk Text-to-Speech
@@ -59,10 +61,20 @@ if [ "$COMMAND" = "--ui" ] || [ "$COMMAND" = "-w" ] || [ "$COMMAND" = "ui" ] ||
     exit 0
 fi
 
+# Mode interaktif: satu proses + satu koneksi untuk banyak command
+if [ "$COMMAND" = "--repl" ]; then
+    if [ "$USE_TTS" = true ]; then
+        exec python3 "$CLI_DIR/ag_repl.py" --tts
+    fi
+    exec python3 "$CLI_DIR/ag_repl.py"
+fi
+
 # Validasi input
 if [ -z "$COMMAND" ]; then
     echo "Usage: ag [-v] <command>"
-    echo "  -v    Enable Text-to-Speech"
+    echo "       ag [-v] --repl"
+    echo "  -v      Enable Text-to-Speech"
+    echo "  --repl  Sesi interaktif (history, tab-completion, watch <command>)"
     echo ""
     echo "Examples:"
     echo "  ag cek ram"
@@ -71,17 +83,41 @@ if [ -z "$COMMAND" ]; then
 fi
 
 
+# --- Fast Path: Unix Socket ---
+# Client native (stdlib saja, tanpa site-packages) ke socket service.
+# Exit code 3 = socket tidak tersedia -> lanjut ke HTTP di bawah.
+if command -v python3 &> /dev/null && [ -f "$CLIENT" ]; then
+    if [ "$USE_TTS" = true ]; then
+        python3 -I -S "$CLIENT" -v "$@"
+    else
+        python3 -I -S "$CLIENT" "$@"
+    fi
+    STATUS=$?
+    if [ $STATUS -ne 3 ]; then
+        exit $STATUS
+    fi
+fi
+
+
 # --- API Call ---
-# Kirim request ke API Flask
+# Kirim request ke API Flask (body JSON dibangun jq agar aman untuk tanda kutip)
+PAYLOAD=$(jq -n --arg message "$COMMAND" '{message: $message}')
 RESPONSE=$(curl -s -X POST "$API_URL" \
     -H "Content-Type: application/json" \
-    -d "{\"message\":\"$COMMAND\"}" 2>/dev/null)
+    -d "$PAYLOAD" 2>/dev/null)
 
 
 # --- Error Checking and JSON Parsing (KUNCI PERBAIKAN) ---
 
 # Cek apakah curl gagal terhubung ke server (Error Code != 0)
 if [ $? -ne 0 ]; then
+    # Service tidak berjalan: proses command in-process (AG_EMBEDDED=false untuk mematikan)
+    if [ "${AG_EMBEDDED:-true}" = true ] && command -v python3 &> /dev/null && [ -f "$CLI_DIR/ag_embedded.py" ]; then
+        if [ "$USE_TTS" = true ]; then
+            exec python3 "$CLI_DIR/ag_embedded.py" -v "$@"
+        fi
+        exec python3 "$CLI_DIR/ag_embedded.py" "$@"
+    fi
     echo "Error: Tidak dapat terhubung ke Agent Service."
     echo "Pastikan server berjalan di $API_URL"
     exit 1
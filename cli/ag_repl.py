@@ -0,0 +1,272 @@
+"""AG REPL - sesi interaktif untuk Agent Pribadi (`ag --repl` / `agt --repl`)
+
+Satu proses dan satu koneksi untuk banyak command:
+- Unix domain socket service (persistent, lihat core/socket_server.py);
+  fallback ke HTTP keep-alive /api/chat jika socket tidak tersedia
+- History (readline, ~/.ag_history) dan tab-completion dari registry
+  intent chat_rules plus daftar tools tersedia/terinstall
+- `watch [-n detik] <command>` menjalankan ulang command tiap interval
+  dengan redraw in-place (Ctrl+C untuk berhenti)
+
+Usage:
+    python3 cli/ag_repl.py [--tts] [--timing] [--url http://localhost:7777]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import http.client
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import ag_client  # noqa: E402
+
+HISTORY_FILE = os.path.expanduser('~/.ag_history')
+HISTORY_LENGTH = 1000
+DEFAULT_WATCH_SECONDS = 2.0
+
+EXIT_COMMANDS = {'exit', 'quit', 'keluar', ':q'}
+
+
+class SocketTransport:
+    """Koneksi persistent ke Unix socket service."""
+
+    name = 'socket'
+
+    def __init__(self):
+        self.sock = ag_client.connect()
+
+    def request(self, payload: dict) -> dict:
+        try:
+            return ag_client.call(self.sock, payload)
+        except (OSError, ConnectionError):
+            # Service restart: sambung ulang sekali
+            self.sock.close()
+            self.sock = ag_client.connect()
+            return ag_client.call(self.sock, payload)
+
+    def chat(self, message: str, timing: bool = False) -> dict:
+        return self.request({'op': 'chat', 'message': message, 'timing': timing})
+
+    def completions(self) -> dict:
+        return self.request({'op': 'complete'}).get('data') or {}
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class HttpTransport:
+    """HTTP keep-alive ke Flask service (http.client menyambung ulang otomatis)."""
+
+    name = 'http'
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.conn = http.client.HTTPConnection(parts.hostname or 'localhost', parts.port or 80, timeout=600)
+
+    def _request(self, method: str, path: str, body: dict = None) -> dict:
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in (1, 2):
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                return json.loads(response.read())
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self.conn.close()
+                if attempt == 2:
+                    raise
+
+    def chat(self, message: str, timing: bool = False) -> dict:
+        return self._request('POST', '/api/chat', {'message': message, 'timing': timing})
+
+    def completions(self) -> dict:
+        return self._request('GET', '/api/completions').get('data') or {}
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def open_transport(url: str):
+    """Socket jika tersedia, jika tidak HTTP keep-alive."""
+    try:
+        return SocketTransport()
+    except OSError:
+        return HttpTransport(url)
+
+
+class Completer:
+    """Completion seluruh baris (bukan per kata) untuk readline."""
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.candidates = []
+        self.matches = []
+
+    def refresh(self) -> None:
+        try:
+            data = self.transport.completions()
+        except (OSError, ValueError, http.client.HTTPException):
+            return
+
+        candidates = list(data.get('intents', []))
+        for tool, versions in data.get('available', {}).items():
+            candidates.append(f"setup {tool} latest")
+            candidates.extend(f"setup {tool} {version}" for version in versions)
+        for tool, versions in data.get('installed', {}).items():
+            for command in ('use', 'remove'):
+                candidates.extend(f"{command} {tool} {version}" for version in versions)
+        candidates.extend(f"watch {intent}" for intent in data.get('intents', []))
+        candidates.extend(['exit', 'watch '])
+        self.candidates = sorted(set(candidates))
+
+    def complete(self, text: str, state: int):
+        import readline
+
+        if state == 0:
+            line = readline.get_line_buffer()
+            begidx = readline.get_begidx()
+            # Kembalikan bagian kandidat mulai dari kata yang sedang diketik
+            self.matches = [c[begidx:] for c in self.candidates if c.startswith(line)]
+        return self.matches[state] if state < len(self.matches) else None
+
+
+def _setup_readline(completer: Completer) -> None:
+    try:
+        import readline
+        import atexit
+    except ImportError:
+        return
+
+    try:
+        readline.read_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+    readline.set_history_length(HISTORY_LENGTH)
+    atexit.register(_save_history, readline)
+
+    readline.set_completer_delims(' ')
+    readline.set_completer(completer.complete)
+    if 'libedit' in (readline.__doc__ or ''):
+        readline.parse_and_bind('bind ^I rl_complete')
+    else:
+        readline.parse_and_bind('tab: complete')
+
+
+def _save_history(readline) -> None:
+    try:
+        readline.write_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+
+
+def _format(result: dict) -> str:
+    message = result.get('message')
+    if not message or result.get('success') is False:
+        detail = message or f"Raw Response: {json.dumps(result, indent=2, ensure_ascii=False)}"
+        return f"Error: Agent Service gagal memproses command.\nDetail:\n{detail}"
+    return message.replace('•', '*')
+
+
+def _format_timing(timing: dict) -> str:
+    """Rincian span dari field timing response (mode --timing)."""
+    lines = [f"trace {timing.get('trace_id')}  total {timing.get('total_ms', 0):.2f} ms"]
+    for span in timing.get('spans', []):
+        attributes = ' '.join(f"{key}={value}" for key, value in span.get('attributes', {}).items())
+        lines.append(f"{'  ' * span.get('depth', 1)}{span['name']:<32} {span['duration_ms']:8.3f} ms  {attributes}")
+    return '\n'.join(lines)
+
+
+def _watch(transport, line: str) -> None:
+    """`watch [-n detik] <command>`: redraw in-place sampai Ctrl+C."""
+    parts = line.split()[1:]
+    interval = DEFAULT_WATCH_SECONDS
+    if len(parts) >= 2 and parts[0] == '-n':
+        try:
+            interval = max(0.1, float(parts[1]))
+        except ValueError:
+            print("Usage: watch [-n detik] <command>")
+            return
+        parts = parts[2:]
+    command = ' '.join(parts)
+    if not command:
+        print("Usage: watch [-n detik] <command>")
+        return
+
+    # Layar alternatif: output watch tidak mengotori scrollback sesi
+    sys.stdout.write('\033[?1049h\033[?25l')
+    try:
+        while True:
+            start = time.perf_counter()
+            result = transport.chat(command)
+            elapsed = (time.perf_counter() - start) * 1000
+            header = f"Every {interval:g}s: {command}    {time.strftime('%H:%M:%S')}  ({elapsed:.1f} ms)"
+            # Cursor ke kiri atas, tulis ulang, hapus sisa layar: tanpa flicker
+            sys.stdout.write(f"\033[H{header}\033[K\n\n" + _format(result).replace('\n', '\033[K\n') + '\033[K\033[J')
+            sys.stdout.flush()
+            time.sleep(max(0.0, interval - (time.perf_counter() - start)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sys.stdout.write('\033[?25h\033[?1049l')
+        sys.stdout.flush()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Sesi interaktif Agent Pribadi (AG)')
+    parser.add_argument('--tts', action='store_true', help='Bacakan setiap response (mode agt)')
+    parser.add_argument('--timing', action='store_true', help='Tampilkan latency dan span trace per command')
+    parser.add_argument('--url', default=os.environ.get('AG_URL', 'http://localhost:7777'))
+    args = parser.parse_args()
+
+    transport = open_transport(args.url)
+    completer = Completer(transport)
+    completer.refresh()
+    _setup_readline(completer)
+
+    print(f"AG REPL ({transport.name}). Ketik 'bantuan' untuk daftar perintah, 'exit' untuk keluar.")
+
+    try:
+        while True:
+            try:
+                line = input('ag> ').strip()
+            except KeyboardInterrupt:
+                print()
+                continue
+            if not line:
+                continue
+            if line.lower() in EXIT_COMMANDS:
+                break
+
+            try:
+                if line.startswith('watch'):
+                    _watch(transport, line)
+                    continue
+
+                start = time.perf_counter()
+                result = transport.chat(line, timing=args.timing)
+                elapsed = (time.perf_counter() - start) * 1000
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                print(f"Error: Tidak dapat terhubung ke Agent Service ({e}).")
+                continue
+
+            print(_format(result))
+            if args.timing:
+                print(f"\033[2m({elapsed:.1f} ms)\033[0m")
+                if result.get('timing'):
+                    print(f"\033[2m{_format_timing(result['timing'])}\033[0m")
+            if args.tts and result.get('message'):
+                ag_client.speak(result['message'])
+            if result.get('command_type') in ('tool_setup', 'tool_remove'):
+                completer.refresh()
+    except EOFError:
+        print()
+    finally:
+        transport.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
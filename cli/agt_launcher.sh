@@ -39,6 +39,12 @@ speak() {
 # Gabungkan semua argumen menjadi satu command
 COMMAND="$*"
 
+# Mode interaktif dengan TTS: agt --repl
+if [ "$COMMAND" = "--repl" ]; then
+    CLI_DIR="$(cd "$(dirname "$(readlink -f "${BASH_SOURCE[0]}" 2>/dev/null || echo "${BASH_SOURCE[0]}")")" && pwd)"
+    exec python3 "$CLI_DIR/ag_repl.py" --tts
+fi
+
 # If user wants to open web UI: agt --ui | agt -w | agt ui
 if [ "$COMMAND" = "--ui" ] || [ "$COMMAND" = "-w" ] || [ "$COMMAND" = "ui" ] || [ "$COMMAND" = "open-ui" ]; then
     URL="http://localhost:7777"
@@ -62,6 +68,7 @@ if [ -z "$COMMAND" ]; then
     echo "═══════════════════════════════════════════════════════════"
     echo ""
     echo "Usage: agt <command>"
+    echo "       agt --repl   (sesi interaktif)"
     echo ""
     echo "Perbedaan dengan 'ag':"
     echo "  • ag  : TTS optional (gunakan flag -v untuk voice)"
@@ -0,0 +1,126 @@
+"""Benchmark jalur CLI: Unix socket vs curl HTTP
+
+Mengukur round trip command lokal (default `cek ram`) lewat:
+- socket (persistent): satu koneksi, banyak request (batas bawah protokol)
+- ag_client.py: proses baru `python3 -I -S ag_client.py` per command
+- ag (launcher+socket): ag_launcher.sh lengkap seperti yang dijalankan user
+- embedded: `python3 ag_embedded.py` per command (tanpa service)
+- curl: `curl -X POST /api/chat` per command (jalur lama ag_launcher.sh)
+
+Service harus sudah berjalan (./agent.sh start), kecuali dengan --embedded
+yang hanya mengukur mode embedded dan gagal (exit 1) jika p50 melebihi
+ag_embedded.COLD_START_BUDGET_MS.
+
+Usage:
+    python3 cli/bench_cli.py [-n 50] [--command "cek ram"] [--url http://localhost:7777]
+    python3 cli/bench_cli.py --embedded [-n 20]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import ag_client  # noqa: E402
+import ag_embedded  # noqa: E402
+
+
+def _p50(samples) -> float:
+    return sorted(samples)[len(samples) // 2]
+
+
+def _summary(name: str, samples) -> str:
+    samples = sorted(samples)
+    if not samples:
+        return f"{name:<22} (skipped)"
+    p50 = _p50(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    mean = sum(samples) / len(samples)
+    return f"{name:<22} min {samples[0]:7.2f}  p50 {p50:7.2f}  p95 {p95:7.2f}  mean {mean:7.2f} ms"
+
+
+def _timed(fn, iterations: int):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--iterations', type=int, default=50)
+    parser.add_argument('--command', default='cek ram')
+    parser.add_argument('--url', default='http://localhost:7777')
+    parser.add_argument('--embedded', action='store_true', help='Ukur mode embedded saja dan cek budget')
+    args = parser.parse_args()
+
+    embedded_cmd = [sys.executable, os.path.abspath(ag_embedded.__file__), *args.command.split()]
+    if args.embedded:
+        samples = _timed(lambda: subprocess.run(embedded_cmd, stdout=subprocess.DEVNULL, check=False),
+                         args.iterations)
+        print(f"\n{args.iterations} iterasi, command: {args.command!r}")
+        print(_summary('embedded (cold)', samples))
+        budget = ag_embedded.COLD_START_BUDGET_MS
+        if _p50(samples) > budget:
+            print(f"FAIL: p50 melebihi budget {budget} ms")
+            return 1
+        print(f"OK: p50 dalam budget {budget} ms")
+        return 0
+
+    results = []
+
+    try:
+        sock = ag_client.connect()
+    except OSError as e:
+        print(f"Socket {ag_client.socket_path()} tidak tersedia: {e}")
+        sock = None
+
+    if sock is not None:
+        try:
+            ag_client.chat_text(sock, args.command)  # warm-up
+            results.append(_summary('socket ping', _timed(lambda: ag_client.call(sock, {'op': 'ping'}), args.iterations)))
+            results.append(_summary('socket (persistent)', _timed(lambda: ag_client.chat_text(sock, args.command), args.iterations)))
+        finally:
+            sock.close()
+
+        client_cmd = [sys.executable, '-I', '-S', os.path.abspath(ag_client.__file__), *args.command.split()]
+        results.append(_summary('ag_client.py', _timed(
+            lambda: subprocess.run(client_cmd, stdout=subprocess.DEVNULL, check=False), args.iterations
+        )))
+
+        launcher_cmd = ['bash', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ag_launcher.sh'),
+                        *args.command.split()]
+        results.append(_summary('ag (launcher+socket)', _timed(
+            lambda: subprocess.run(launcher_cmd, stdout=subprocess.DEVNULL, check=False), args.iterations
+        )))
+
+    if shutil.which('curl'):
+        payload = json.dumps({'message': args.command})
+        curl_cmd = ['curl', '-s', '-X', 'POST', f"{args.url}/api/chat",
+                    '-H', 'Content-Type: application/json', '-d', payload]
+        probe = subprocess.run(curl_cmd, capture_output=True, check=False)
+        if probe.returncode == 0 and probe.stdout:
+            results.append(_summary('curl HTTP', _timed(
+                lambda: subprocess.run(curl_cmd, stdout=subprocess.DEVNULL, check=False), args.iterations
+            )))
+        else:
+            print(f"HTTP {args.url} tidak tersedia, curl dilewati")
+
+    results.append(_summary('embedded (cold)', _timed(
+        lambda: subprocess.run(embedded_cmd, stdout=subprocess.DEVNULL, check=False), args.iterations
+    )))
+
+    print(f"\n{args.iterations} iterasi, command: {args.command!r}")
+    for line in results:
+        print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Load test endpoint read-only: Flask langsung vs lewat nginx
+
+Menjalankan N client konkuren (thread, masing-masing satu koneksi HTTP/1.1
+keep-alive) selama beberapa detik ke setiap base URL secara bergantian, lalu
+mencetak request/detik, latency p50/p95/p99, status code, dan distribusi
+X-Cache-Status (micro-cache nginx) per path.
+
+Bandingkan sebelum/sesudah tuning dengan menjalankan target yang sama dengan
+config nginx lama dan baru, atau Flask langsung vs proxy:
+
+    python3 cli/bench_proxy.py http://localhost:7777 http://localhost
+
+--no-keepalive membuka koneksi TCP baru per request (perilaku client
+tanpa connection reuse).
+
+Usage:
+    python3 cli/bench_proxy.py [BASE_URL ...] [-c 16] [-d 10] [--path /api/status --path /health]
+"""
+
+import sys
+import time
+import argparse
+import threading
+import http.client
+from collections import Counter
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_TARGETS = ['http://localhost:7777', 'http://localhost']
+DEFAULT_PATHS = ['/api/status', '/health']
+
+
+class _Worker(threading.Thread):
+    """Satu client: request berulang sampai deadline."""
+
+    def __init__(self, host: str, port: int, path: str, deadline: float,
+                 keepalive: bool, timeout: float, start_event: threading.Event):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.path = path
+        self.deadline = deadline
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.start_event = start_event
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.cache: Counter = Counter()
+        self.errors = 0
+
+    def run(self) -> None:
+        headers = {} if self.keepalive else {'Connection': 'close'}
+        conn: Optional[http.client.HTTPConnection] = None
+        self.start_event.wait()
+        while time.monotonic() < self.deadline:
+            if conn is None:
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            start = time.perf_counter()
+            try:
+                conn.request('GET', self.path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                conn.close()
+                conn = None
+                if not self.latencies:
+                    break  # Target tidak bisa dihubungi sama sekali
+                continue
+            self.latencies.append((time.perf_counter() - start) * 1000)
+            self.statuses[response.status] += 1
+            self.cache[response.getheader('X-Cache-Status', '-')] += 1
+            if not self.keepalive or response.will_close:
+                conn.close()
+                conn = None
+        if conn is not None:
+            conn.close()
+
+
+def run_load(base_url: str, path: str, concurrency: int, duration: float,
+             keepalive: bool = True, timeout: float = 10.0) -> Dict:
+    """Jalankan load test ke base_url + path.
+
+    Args:
+        base_url: Misal http://localhost:7777
+        path: Path yang diminta (GET)
+        concurrency: Jumlah client bersamaan
+        duration: Durasi (detik)
+        keepalive: Pakai ulang koneksi antar request
+        timeout: Timeout per request (detik)
+
+    Returns:
+        Dict: requests, rps, latency (ms), status, cache, errors
+    """
+    url = urlsplit(base_url)
+    host = url.hostname or 'localhost'
+    port = url.port or 80
+
+    start_event = threading.Event()
+    deadline = time.monotonic() + duration
+    workers = [_Worker(host, port, path, deadline, keepalive, timeout, start_event)
+               for _ in range(concurrency)]
+    for worker in workers:
+        worker.start()
+    started = time.monotonic()
+    start_event.set()
+    for worker in workers:
+        worker.join()
+    elapsed = max(time.monotonic() - started, 1e-9)
+
+    latencies = sorted(ms for worker in workers for ms in worker.latencies)
+    statuses: Counter = Counter()
+    cache: Counter = Counter()
+    for worker in workers:
+        statuses.update(worker.statuses)
+        cache.update(worker.cache)
+
+    def percentile(q: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * q))]
+
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50': percentile(0.50),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+        'status': dict(statuses),
+        'cache': {key: value for key, value in cache.items() if key != '-'},
+        'errors': sum(worker.errors for worker in workers)
+    }
+
+
+def _format(base_url: str, path: str, result: Dict) -> str:
+    status = ' '.join(f"{code}:{count}" for code, count in sorted(result['status'].items())) or '-'
+    line = (f"{base_url + path:<40} {result['rps']:9.1f} req/s  "
+            f"p50 {result['p50']:7.2f}  p95 {result['p95']:7.2f}  p99 {result['p99']:7.2f} ms  "
+            f"[{status}]")
+    if result['cache']:
+        line += '  cache ' + ' '.join(f"{key}:{count}" for key, count in sorted(result['cache'].items()))
+    if result['errors']:
+        line += f"  errors {result['errors']}"
+    return line
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('targets', nargs='*', default=DEFAULT_TARGETS, help='Base URL (default: Flask dan nginx)')
+    parser.add_argument('--path', action='append', dest='paths', help='Path GET (boleh berulang)')
+    parser.add_argument('-c', '--concurrency', type=int, default=16)
+    parser.add_argument('-d', '--duration', type=float, default=10.0, help='Detik per target per path')
+    parser.add_argument('--no-keepalive', action='store_true', help='Koneksi baru per request')
+    args = parser.parse_args()
+
+    paths = args.paths or DEFAULT_PATHS
+    print(f"{args.concurrency} client, {args.duration:g}s per target, "
+          f"keep-alive {'off' if args.no_keepalive else 'on'}\n")
+
+    failed = False
+    for path in paths:
+        for base_url in args.targets:
+            base_url = base_url.rstrip('/')
+            result = run_load(base_url, path, max(1, args.concurrency), args.duration,
+                              keepalive=not args.no_keepalive)
+            if result['requests'] == 0:
+                print(f"{base_url + path:<40} tidak tersedia ({result['errors']} error)")
+                failed = True
+                continue
+            print(_format(base_url, path, result))
+        print()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Cek setup tool bersamaan lewat chat dan batch install
+
+Menjalankan `setup a 1` (ToolsManager.setup_tool, jalur chat) bersamaan
+dengan batch install [('a', '1'), ('b', '1')] (InstallScheduler) untuk tool
+yang sama, beberapa ronde, lalu gagal (exit 1) jika ada install yang gagal
+atau tool yang sama dieksekusi lebih dari sekali per ronde. Tanpa
+coalescing antara kedua jalur, keduanya menulis ke
+bin/.downloads/a-1.tar.gz.part yang sama dan salah satunya gagal.
+
+Archive disajikan server HTTP lokal (lambat, agar download saling tumpang
+tindih). bin/, packages.yaml dan database memakai directory sementara
+(AG_BIN_DIR, AG_TOOLS_CONFIG, AG_DB_PATH), jadi instalasi asli tidak
+tersentuh.
+
+Usage:
+    python3 cli/check_concurrent_setup.py [--rounds 5] [--stream]
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import tarfile
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ARCHIVE_FILES = 8
+ARCHIVE_FILE_SIZE = 256 * 1024
+SEND_CHUNK = 64 * 1024
+SEND_DELAY = 0.01  # Detik per chunk (download ~0.3 detik)
+
+
+def make_archive(root: str) -> bytes:
+    """tar.gz kecil dengan satu root directory."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode='w:gz') as tar:
+        for i in range(ARCHIVE_FILES):
+            data = os.urandom(ARCHIVE_FILE_SIZE)
+            info = tarfile.TarInfo(f"{root}/bin/f{i}")
+            info.size = len(data)
+            info.mode = 0o755
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def serve(archives: dict) -> ThreadingHTTPServer:
+    """Server HTTP lokal yang mengirim archive perlahan (tanpa Range)."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            data = archives.get(self.path.lstrip('/'))
+            if data is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            for offset in range(0, len(data), SEND_CHUNK):
+                self.wfile.write(data[offset:offset + SEND_CHUNK])
+                time.sleep(SEND_DELAY)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--stream', action='store_true', help='Pakai streaming install (AG_TOOLS_STREAM)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='ag-setup-check-')
+    archives = {f"{tool}-1.tar.gz": make_archive(f"{tool}-1") for tool in ('a', 'b')}
+    server = serve(archives)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    config_path = os.path.join(workdir, 'packages.yaml')
+    with open(config_path, 'w') as f:
+        for tool in ('a', 'b'):
+            f.write(f"{tool}:\n  '1': {base_url}/{tool}-1.tar.gz\n")
+
+    # Harus diset sebelum config.settings di-import
+    os.environ['AG_BIN_DIR'] = os.path.join(workdir, 'bin')
+    os.environ['AG_TOOLS_CONFIG'] = config_path
+    os.environ['AG_DB_PATH'] = os.path.join(workdir, 'agent.db')
+    os.environ['AG_TOOLS_CACHE'] = 'False'  # Setiap ronde benar-benar download
+    os.environ['AG_TOOLS_STREAM'] = 'True' if args.stream else 'False'
+
+    sys.path.insert(0, PROJECT_ROOT)
+    from core.tools_manager import ToolsManager
+    from core.install_scheduler import InstallScheduler
+    from core.single_flight import get_single_flight
+
+    tm = ToolsManager()
+    scheduler = InstallScheduler(tm)
+    flight = get_single_flight()
+
+    failed = False
+    for round_no in range(1, max(1, args.rounds) + 1):
+        before = flight.get_stats().get('tool_setup', {}).get('executions', 0)
+        chat_result = {}
+
+        chat = threading.Thread(target=lambda: chat_result.update(result=tm.setup_tool('a', '1')))
+        chat.start()
+        job = scheduler.wait(scheduler.submit([('a', '1'), ('b', '1')]), timeout=120)
+        chat.join()
+
+        executions = flight.get_stats().get('tool_setup', {}).get('executions', 0) - before
+        results = [('chat a 1', *chat_result['result'])]
+        results += [(f"batch {i['tool']} {i['version']}", i['status'] == 'done', i['message']) for i in job['items']]
+
+        ok = all(success for _, success, _ in results) and executions == 2
+        failed = failed or not ok
+        print(f"round {round_no}: {'OK' if ok else 'FAIL'} (executions {executions})")
+        for name, success, message in results:
+            print(f"  {name:<14} {'ok ' if success else 'ERR'} {message}")
+
+        for tool in ('a', 'b'):
+            tm.remove_tool(tool, '1')
+        tm.gc.wait(30)
+
+    server.shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+    print("OK" if not failed else "FAIL: setup bersamaan gagal atau dieksekusi dua kali")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Cek dedup store: file konfigurasi dan build cache
+
+- File konfigurasi (conf/nginx.conf, conf/mime.types, lib/php.ini) tidak
+  boleh di-hardlink antar instalasi: edit in-place satu versi tidak boleh
+  mengubah versi lain maupun object store. File biasa tetap di-dedup.
+- Instalasi hasil source build (dengan build cache) tanpa versi kedua
+  tidak boleh dilaporkan "shared"/"saved", dan prune() harus membebaskan
+  object-nya setelah instalasi dihapus (build cache tidak ikut memegang
+  inode object).
+
+Semua di directory sementara; exit 1 jika ada yang gagal.
+
+Usage:
+    python3 cli/check_dedup.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from core.dedup_store import DedupStore  # noqa: E402
+from core.source_builder import SourceBuilder  # noqa: E402
+
+FILE_SIZE = 8192
+FILES = {
+    'bin/tool': os.urandom(FILE_SIZE),
+    'conf/nginx.conf': os.urandom(FILE_SIZE),
+    'conf/mime.types': os.urandom(FILE_SIZE),
+    'lib/php.ini': os.urandom(FILE_SIZE),
+}
+
+MAKEFILE = """all:
+\ttrue
+install:
+\tmkdir -p $(DESTDIR)$(PREFIX)/bin $(DESTDIR)$(PREFIX)/conf
+\thead -c 65536 /dev/urandom > $(DESTDIR)$(PREFIX)/bin/server
+\thead -c 8192 /dev/urandom > $(DESTDIR)$(PREFIX)/conf/server.conf
+"""
+
+
+def write_tree(root: Path) -> None:
+    for rel, data in FILES.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+
+def same_inode(a: Path, b: Path) -> bool:
+    return os.stat(a).st_ino == os.stat(b).st_ino
+
+
+def check_config_files(workdir: Path) -> bool:
+    """Dua versi dengan isi identik: hanya file non-konfigurasi yang di-link."""
+    store = DedupStore(workdir / 'objects', workers=2, min_size=4096)
+    v1, v2 = workdir / 't' / '1.0', workdir / 't' / '1.1'
+    for root in (v1, v2):
+        write_tree(root)
+        store.dedupe_tree(root)
+
+    linked = same_inode(v1 / 'bin/tool', v2 / 'bin/tool')
+    configs_separate = all(not same_inode(v1 / rel, v2 / rel) for rel in FILES if rel != 'bin/tool')
+
+    (v1 / 'conf/nginx.conf').write_bytes(b'worker_processes 4;\n')
+    edit_isolated = (v2 / 'conf/nginx.conf').read_bytes() == FILES['conf/nginx.conf']
+
+    usage = store.shared_usage(v1)
+    ok = linked and configs_separate and edit_isolated and usage['linked_files'] == 1
+    print(f"config files   {'OK' if ok else 'FAIL'}  binary linked: {linked}, "
+          f"configs separate: {configs_separate}, edit isolated: {edit_isolated}, usage: {usage}")
+    return ok
+
+
+def check_build_cache(workdir: Path) -> bool:
+    """Satu instalasi hasil build (cache terisi): tidak ada yang 'shared'."""
+    store = DedupStore(workdir / 'objects-build', workers=2, min_size=4096)
+    builder = SourceBuilder(workdir / 'builds', jobs=1, use_ccache=False)
+    source = workdir / 'src'
+    source.mkdir()
+    (source / 'Makefile').write_text(MAKEFILE)
+    prefix = workdir / 'bin' / 'server' / '1.0'
+    os.environ['PREFIX'] = str(prefix)
+
+    results = []
+    for name in ('build', 'cache-hit'):
+        staging = workdir / f'staging-{name}'
+        staging.mkdir()
+        info = builder.build('server', '1.0', source, prefix, staging, [], 'sha-check')
+        store.dedupe_tree(staging)
+        usage = store.shared_usage(staging)
+        saved = store.get_stats()['saved_bytes']
+        shutil.rmtree(staging)
+        freed = store.prune()['removed']
+        ok = usage['saved_bytes'] == 0 and saved == 0 and freed == 1 and store.get_stats()['objects'] == 0
+        print(f"build cache    {'OK' if ok else 'FAIL'}  {name} (cache_hit {info['cache_hit']}): "
+              f"usage {usage}, store saved {saved}, pruned {freed}")
+        results.append(ok)
+    return all(results)
+
+
+def main() -> int:
+    workdir = Path(tempfile.mkdtemp(prefix='ag-dedup-check-'))
+    try:
+        failed = not check_config_files(workdir)
+        failed = not check_build_cache(workdir) or failed
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print("OK" if not failed else "FAIL: dedup berbagi file konfigurasi atau inode build cache")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
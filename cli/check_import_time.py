@@ -0,0 +1,90 @@
+"""Cek regresi waktu import untuk Agent Pribadi (AG)
+
+Mengukur cold import `core.chat_rules` (jalur CLI embedded dan service)
+dengan `python -X importtime` dan gagal (exit 1) jika:
+- waktu import kumulatif melebihi IMPORT_BUDGET_MS (minimum dari beberapa
+  run, agar noise proses lain tidak membuat hasil flaky)
+- import tersebut memuat modul berat yang seharusnya lazy (FORBIDDEN_MODULES),
+  di luar modul yang sudah dimuat interpreter/site sendiri
+
+Usage:
+    python3 cli/check_import_time.py [--module core.chat_rules] [--runs 5] [--budget 120]
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget import kumulatif core.chat_rules (milidetik)
+IMPORT_BUDGET_MS = 120
+
+# Modul yang hanya boleh di-import saat dipakai (tools, web server)
+FORBIDDEN_MODULES = [
+    'flask',
+    'requests',
+    'yaml',
+    'tarfile',
+    'zipfile',
+    'lzma',
+    'core.tools_manager',
+    'core.install_scheduler',
+    'core.downloader'
+]
+
+
+def measure(module: str) -> float:
+    """Waktu import kumulatif module (ms) dari satu proses baru."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        # Format: "import time: <self us> | <cumulative us> | <nama>"
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"{module} not found in importtime output")
+
+
+def loaded_modules(code: str) -> set:
+    result = subprocess.run(
+        [sys.executable, '-c', f'{code}\nimport sys\nprint("\\n".join(sys.modules))'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Cek regresi waktu import')
+    parser.add_argument('--module', default='core.chat_rules')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_MS, help='Budget (ms)')
+    args = parser.parse_args()
+
+    failed = False
+
+    samples = [measure(args.module) for _ in range(max(1, args.runs))]
+    best = min(samples)
+    print(f"import {args.module}: min {best:.1f} ms, max {max(samples):.1f} ms ({len(samples)} runs), "
+          f"budget {args.budget:g} ms")
+    if best > args.budget:
+        print(f"FAIL: import time melebihi budget")
+        failed = True
+
+    baseline = loaded_modules('pass')
+    loaded = loaded_modules(f'import {args.module}') - baseline
+    eager = [name for name in FORBIDDEN_MODULES if name in loaded]
+    if eager:
+        print(f"FAIL: modul berat ikut ter-import: {', '.join(eager)}")
+        failed = True
+
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
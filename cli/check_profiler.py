@@ -0,0 +1,82 @@
+"""Cek profiler on-demand: region yang melewati akhir sesi
+
+Request yang masih berjalan saat sesi pstats/text berakhir harus tetap
+dimatikan oleh end() di thread pemiliknya. Jika tidak, sys.getprofile()
+thread tersebut tetap berisi cProfile.Profile: thread yang hidup lama
+(koneksi socket server, worker pool) terus diprofile dan sesi berikutnya
+gagal enable() di thread itu.
+
+Untuk setiap mode, satu thread membuka region sebelum sesi berakhir dan
+menutupnya sesudahnya, lalu membuka region lagi di sesi kedua. Gagal
+(exit 1) jika hook profiler masih terpasang setelah end() atau region di
+sesi kedua tidak terprofile.
+
+Usage:
+    python3 cli/check_profiler.py
+"""
+
+import os
+import sys
+import time
+import threading
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from core import profiler  # noqa: E402
+
+SESSION_SECONDS = 0.3
+
+
+def spanning_region(started: threading.Event, session_done: threading.Event, result: dict) -> None:
+    """Region yang dimulai di dalam sesi dan selesai setelah sesi berakhir."""
+    while profiler._session is None:
+        time.sleep(0.01)
+    token = profiler.begin('request')
+    started.set()
+    session_done.wait()
+    profiler.end(token)
+    result['hook_after_end'] = sys.getprofile()
+
+    # Sesi kedua di thread yang sama: enable() harus berhasil lagi
+    while profiler._session is None:
+        time.sleep(0.01)
+    token = profiler.begin('request')
+    sum(range(10000))
+    profiler.end(token)
+    result['hook_after_second'] = sys.getprofile()
+
+
+def check(mode: str) -> bool:
+    started = threading.Event()
+    session_done = threading.Event()
+    result: dict = {}
+    worker = threading.Thread(target=spanning_region, args=(started, session_done, result))
+    worker.start()
+
+    ok, first = profiler.profile(SESSION_SECONDS, mode)
+    session_done.set()
+    ok2, second = profiler.profile(SESSION_SECONDS, mode)
+    worker.join(10)
+
+    passed = (ok and ok2 and started.is_set()
+              and result.get('hook_after_end') is None
+              and result.get('hook_after_second') is None
+              and first.matched == 0
+              and (mode == 'collapsed' or (second.matched == 1 and second.skipped == 0)))
+    print(f"{mode:<10} {'OK' if passed else 'FAIL'}  "
+          f"hook setelah end: {result.get('hook_after_end')!r}, "
+          f"sesi 1: {first.matched}/{first.requests}, sesi 2: {second.matched}/{second.requests}")
+    return passed
+
+
+def main() -> int:
+    failed = False
+    for mode in profiler.FORMATS:
+        failed = not check(mode) or failed
+    print("OK" if not failed else "FAIL: hook profiler tertinggal setelah sesi berakhir")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
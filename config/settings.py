@@ -11,12 +11,17 @@ SERVER_PORT = int(os.getenv('AG_PORT', 7777))
 DEBUG_MODE = os.getenv('AG_DEBUG', 'False').lower() == 'true'
 
 # Database Configuration
-DB_PATH = PROJECT_ROOT / 'storage' / 'agent.db'
+DB_PATH = Path(os.getenv('AG_DB_PATH', PROJECT_ROOT / 'storage' / 'agent.db'))
 
 # Logging Configuration
 LOG_DIR = PROJECT_ROOT / 'logs'
 LOG_FILE = LOG_DIR / 'agent.log'
 LOG_LEVEL = os.getenv('AG_LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('AG_LOG_FORMAT', 'json').lower()  # Format LOG_FILE: 'json' (JSON lines) atau 'text'
+LOG_MAX_BYTES = int(os.getenv('AG_LOG_MAX_MB', 10)) * 1024 * 1024  # Rotasi agent.log berdasarkan ukuran
+LOG_BACKUP_COUNT = 5  # agent.log.1 .. agent.log.5
+LOG_QUEUE_SIZE = 10000  # Record menunggu ditulis; penuh = record dibuang, request tidak menunggu disk
+LOG_SAMPLE_RATE = float(os.getenv('AG_LOG_SAMPLE_RATE', 1.0))  # Fraksi request yang log per-request-nya disimpan
 
 # Persona Configuration
 PERSONA_NAME = "Sarah"
@@ -32,14 +37,94 @@ TTS_DEFAULT_ENABLED = False  # Default TTS off, bisa diaktifkan via -v flag
 
 # API Configuration
 API_PREFIX = '/api'
+HTTP_COMPRESS_MIN_BYTES = 1024  # Response lebih kecil tidak dikompres
+HTTP_GZIP_LEVEL = 6
+HTTP_BROTLI_QUALITY = 5  # Brotli dipakai jika package `brotli` terinstall
+
+# Unix Socket Configuration (jalur cepat untuk CLI lokal `ag`)
+SOCKET_ENABLED = os.getenv('AG_SOCKET_ENABLED', 'True').lower() == 'true'
+SOCKET_PATH = Path(os.getenv('AG_SOCKET', PROJECT_ROOT / 'storage' / 'ag.sock'))
+SOCKET_MAX_FRAME = 1024 * 1024  # Ukuran frame maksimal (bytes)
 MAX_COMMAND_HISTORY = 100  # Maksimal history yang disimpan
 
+# Context Manager Configuration
+# 'file' = journal + snapshot (satu proses), 'sqlite' = aman untuk multi-worker
+CONTEXT_BACKEND = os.getenv('AG_CONTEXT_BACKEND', 'file').lower()
+CONTEXT_DB_PATH = PROJECT_ROOT / 'storage' / 'context.db'
+CONTEXT_SNAPSHOT_PATH = PROJECT_ROOT / 'storage' / 'context.json'  # Snapshot terkompaksi
+CONTEXT_JOURNAL_PATH = PROJECT_ROOT / 'storage' / 'context.journal'  # Event append-only (JSON lines)
+CONTEXT_SNAPSHOT_EVERY = int(os.getenv('AG_CONTEXT_SNAPSHOT_EVERY', 200))  # Kompaksi tiap N event
+CONTEXT_STAT_CAPACITY = 50  # Sample per jenis stat (ring buffer array('d'))
+CONTEXT_STAT_EWMA_ALPHA = 0.3  # Bobot sample terbaru untuk EWMA stat
+
 # Tools Manager Configuration
-BIN_DIR = PROJECT_ROOT / 'bin'  # Directory untuk tools binaries
-TOOLS_CONFIG_PATH = PROJECT_ROOT / 'config' / 'tools' / 'packages.yaml'
+BIN_DIR = Path(os.getenv('AG_BIN_DIR', PROJECT_ROOT / 'bin'))  # Directory untuk tools binaries
+TOOLS_CONFIG_PATH = Path(os.getenv('AG_TOOLS_CONFIG', PROJECT_ROOT / 'config' / 'tools' / 'packages.yaml'))
+TOOLS_CONFIG_CACHE_PATH = PROJECT_ROOT / 'storage' / 'tools_config.cache'  # Hasil parse YAML (marshal)
+TOOLS_CONFIG_CHECK_SECONDS = 1.0  # Interval cek perubahan packages.yaml (hot reload)
+TOOLS_MANIFEST_PATH = BIN_DIR / 'manifest.json'  # Daftar tools terinstall
 TOOLS_DOWNLOAD_TIMEOUT = 300  # 5 minutes timeout untuk download
+TOOLS_DOWNLOAD_SEGMENTS = int(os.getenv('AG_DOWNLOAD_SEGMENTS', 4))  # Koneksi Range paralel per file
+TOOLS_DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # Buffer 1 MB per chunk
+TOOLS_DOWNLOAD_MIN_SEGMENT_SIZE = 8 * 1024 * 1024  # File < 16 MB didownload single stream
+TOOLS_BANDWIDTH_LIMIT = int(float(os.getenv('AG_BANDWIDTH_LIMIT_MBPS', 0)) * 1024 * 1024)  # Batas global, 0 = tanpa batas
+TOOLS_MIRROR_PROBE_BYTES = 256 * 1024  # Ranged request kecil untuk ukur latency/throughput mirror
+TOOLS_MIRROR_PROBE_TIMEOUT = 5  # Timeout probe per mirror (detik)
+TOOLS_MIRROR_SCORE_TTL = int(os.getenv('AG_MIRROR_SCORE_TTL', 3600))  # Skor lebih muda dari ini tidak di-probe ulang
+TOOLS_DOWNLOAD_WORKERS = int(os.getenv('AG_DOWNLOAD_WORKERS', 3))  # Download paralel saat batch install
+TOOLS_EXTRACT_WORKERS = os.cpu_count() or 1  # Ekstraksi paralel (CPU-bound)
+TOOLS_CACHE_ENABLED = os.getenv('AG_TOOLS_CACHE', 'True').lower() == 'true'
+TOOLS_CACHE_DIR = BIN_DIR / '.cache'  # Content-addressed archive cache
+TOOLS_CACHE_MAX_BYTES = int(os.getenv('AG_TOOLS_CACHE_MAX_MB', 2048)) * 1024 * 1024  # LRU budget
+# Streaming mode: response HTTP langsung diekstrak (tanpa archive perantara)
+TOOLS_STREAM_EXTRACT = os.getenv('AG_TOOLS_STREAM', 'False').lower() == 'true'
+TOOLS_DECOMPRESS_EXTERNAL = True  # Pakai xz -T0 / pigz / zstd -T0 jika tersedia
+TOOLS_STREAM_TEE_CACHE = os.getenv('AG_TOOLS_STREAM_CACHE', 'True').lower() == 'true'  # Tee ke archive cache
+TOOLS_DEDUP_ENABLED = os.getenv('AG_TOOLS_DEDUP', 'True').lower() == 'true'  # Hardlink file identik antar versi
+TOOLS_DEDUP_DIR = BIN_DIR / '.objects'  # Object store (sha256 + mode)
+TOOLS_DEDUP_MIN_SIZE = 4096  # File lebih kecil dari ini tidak di-dedup
+# Source build (configure && make -j && make install) untuk entry `build:`
+# Default off: tanpa toolchain (build-essential + header -dev) entry `build:`
+# cukup diekstrak seperti sebelumnya
+TOOLS_BUILD_ENABLED = os.getenv('AG_TOOLS_BUILD', 'False').lower() == 'true'
+TOOLS_BUILD_DIR = BIN_DIR / '.builds'  # Build cache + log build
+TOOLS_BUILD_CACHE_MAX_BYTES = int(os.getenv('AG_BUILD_CACHE_MAX_MB', 4096)) * 1024 * 1024  # LRU budget build cache
+TOOLS_BUILD_JOBS = int(os.getenv('AG_BUILD_JOBS', os.cpu_count() or 1))  # make -j<jobs>
+TOOLS_BUILD_CONCURRENCY = int(os.getenv('AG_BUILD_CONCURRENCY', 1))  # Build paralel maksimal
+TOOLS_BUILD_CCACHE = os.getenv('AG_BUILD_CCACHE', 'True').lower() == 'true'  # Pakai ccache jika terinstall
+TOOLS_BUILD_TIMEOUT = 3600  # Timeout per langkah build (detik)
+
+# Request Coalescing Configuration
+# Command yang eksekusi bersamaannya digabung (single-flight)
+COALESCED_COMMANDS = {'tool_setup', 'tool_remove', 'system_summary'}
+
+# Metrics Configuration (GET /metrics, format Prometheus)
+METRICS_ENABLED = os.getenv('AG_METRICS', 'True').lower() == 'true'
+METRICS_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)  # Detik
+
+# Admin Configuration (endpoint /api/admin/*)
+ADMIN_TOKEN = os.getenv('AG_ADMIN_TOKEN', '')  # Header X-Admin-Token; kosong = hanya dari localhost
+PROFILER_INTERVAL_MS = 5  # Interval sampling stack (mode collapsed)
+PROFILER_MAX_SECONDS = 120  # Durasi sesi profiling maksimal
+
+# Tracing Configuration (span per command chat, GET /api/debug/traces)
+TRACING_ENABLED = os.getenv('AG_TRACING', 'True').lower() == 'true'
+TRACE_BUFFER_SIZE = 200  # Trace terbaru yang disimpan di memory
+TRACE_EXPORT_PATH = os.getenv('AG_TRACE_EXPORT', '')  # File JSON lines OTLP; kosong = tidak diexport
+
+_initialized = False
+
+
+def init() -> None:
+    """Buat directory runtime (logs/, storage/, bin/).
 
-# Create necessary directories
-LOG_DIR.mkdir(parents=True, exist_ok=True)
-(PROJECT_ROOT / 'storage').mkdir(parents=True, exist_ok=True)
-BIN_DIR.mkdir(parents=True, exist_ok=True)
+    Tidak dijalankan saat import agar CLI dan import modul tidak menyentuh
+    filesystem; dipanggil sekali oleh entry point (agent_service).
+    """
+    global _initialized
+    if _initialized:
+        return
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    (PROJECT_ROOT / 'storage').mkdir(parents=True, exist_ok=True)
+    BIN_DIR.mkdir(parents=True, exist_ok=True)
+    _initialized = True
@@ -0,0 +1,208 @@
+"""Atomic Filesystem Helpers untuk Agent Pribadi (AG)
+
+Operasi filesystem untuk instalasi tools yang tidak pernah mengekspos
+directory setengah jadi:
+- Publish directory hasil staging dengan rename atomik (RENAME_EXCHANGE di
+  Linux jika tersedia, fallback dua rename berurutan)
+- Swap symlink `current` secara atomik (symlink baru + os.replace)
+- Garbage collection directory lama di background thread
+"""
+
+import os
+import sys
+import time
+import uuid
+import shutil
+import threading
+import logging
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Prefix directory sementara di dalam bin/<tool>/
+STAGING_PREFIX = '.staging-'
+TRASH_PREFIX = '.trash-'
+
+# Sisa staging lebih tua dari ini dianggap milik proses yang sudah mati
+STALE_STAGING_SECONDS = 3600
+
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+_renameat2 = None
+
+if sys.platform.startswith('linux'):
+    try:
+        import ctypes
+        _libc = ctypes.CDLL(None, use_errno=True)
+        _renameat2 = _libc.renameat2
+    except (OSError, AttributeError):
+        _renameat2 = None
+
+
+def _rename_exchange(a: Path, b: Path) -> bool:
+    """Tukar dua path secara atomik (Linux renameat2). False jika tidak didukung."""
+    if _renameat2 is None:
+        return False
+    result = _renameat2(_AT_FDCWD, os.fsencode(str(a)), _AT_FDCWD, os.fsencode(str(b)), _RENAME_EXCHANGE)
+    return result == 0
+
+
+def make_staging_dir(parent: Path, name: str) -> Path:
+    """Buat directory staging unik sebagai sibling dari target.
+
+    Berada di filesystem yang sama dengan target sehingga publish cukup
+    dengan rename.
+    """
+    parent.mkdir(parents=True, exist_ok=True)
+    staging = parent / f"{STAGING_PREFIX}{name}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    staging.mkdir()
+    return staging
+
+
+def trash_path(parent: Path, name: str) -> Path:
+    """Path unik untuk directory yang akan di-garbage-collect."""
+    return parent / f"{TRASH_PREFIX}{name}-{int(time.time())}-{uuid.uuid4().hex[:8]}"
+
+
+def publish_dir(source: Path, target: Path) -> Optional[Path]:
+    """Publish source ke target dengan rename atomik.
+
+    Jika target sudah ada (force reinstall), target lama ditukar keluar ke
+    directory trash dan path trash dikembalikan untuk di-GC. Pembaca target
+    selalu melihat versi lama atau versi baru yang lengkap.
+
+    Args:
+        source: Directory hasil ekstraksi (filesystem yang sama dengan target)
+        target: Directory instalasi final
+
+    Returns:
+        Optional[Path]: Directory lama yang sudah dipindah ke trash
+    """
+    if not target.exists():
+        os.rename(source, target)
+        return None
+
+    old = trash_path(target.parent, target.name)
+
+    if _rename_exchange(source, target):
+        # source sekarang berisi versi lama
+        os.rename(source, old)
+        return old
+
+    # Fallback: jeda antara dua rename hanya beberapa mikrodetik
+    os.rename(target, old)
+    os.rename(source, target)
+    return old
+
+
+def swap_symlink(link: Path, target_name: str) -> bool:
+    """Arahkan symlink ke target_name secara atomik.
+
+    Args:
+        link: Path symlink (misal bin/node/current)
+        target_name: Target relatif (misal "20.18.0")
+
+    Returns:
+        bool: False jika platform tidak mendukung symlink
+    """
+    tmp_link = link.with_name(f".{link.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}")
+    try:
+        os.symlink(target_name, tmp_link, target_is_directory=True)
+        os.replace(tmp_link, link)
+        return True
+    except (OSError, NotImplementedError) as e:
+        logger.warning(f"Cannot update symlink {link}: {e}")
+        if os.path.lexists(tmp_link):
+            os.unlink(tmp_link)
+        return False
+
+
+class BackgroundGC:
+    """Hapus directory trash di background agar tidak memblokir request."""
+
+    def __init__(self, on_collected: Optional[Callable[[], None]] = None):
+        """Inisialisasi GC.
+
+        Args:
+            on_collected: Callback opsional setelah antrian GC kosong
+                          (misal prune object store dedup)
+        """
+        self._lock = threading.Lock()
+        self._pending = []
+        self._thread: Optional[threading.Thread] = None
+        self.on_collected = on_collected
+
+    def schedule(self, path: Path) -> None:
+        """Jadwalkan penghapusan path."""
+        with self._lock:
+            self._pending.append(path)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='ag-gc', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        collected = False
+        while True:
+            with self._lock:
+                if not self._pending and not collected:
+                    self._thread = None
+                    return
+                path = self._pending.pop(0) if self._pending else None
+            if path is None:
+                # Antrian kosong: jalankan callback lalu cek antrian lagi
+                collected = False
+                self._after_collect()
+                continue
+            collected = True
+            try:
+                shutil.rmtree(path)
+                logger.info(f"Garbage-collected {path}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"GC error for {path}: {e}")
+
+    def _after_collect(self) -> None:
+        if self.on_collected is None:
+            return
+        try:
+            self.on_collected()
+        except Exception as e:
+            logger.error(f"GC callback error: {e}")
+
+    def sweep(self, bin_dir: Path) -> int:
+        """Jadwalkan semua sisa staging/trash/extract di bin_dir (saat startup).
+
+        Returns:
+            int: Jumlah directory yang dijadwalkan
+        """
+        count = 0
+        if not bin_dir.exists():
+            return count
+
+        candidates = [p for p in bin_dir.iterdir() if p.name.startswith('.extract_')]
+        for tool_dir in bin_dir.iterdir():
+            if tool_dir.is_dir() and not tool_dir.name.startswith('.'):
+                candidates.extend(
+                    p for p in tool_dir.iterdir()
+                    if p.name.startswith((STAGING_PREFIX, TRASH_PREFIX)) and not p.is_symlink()
+                )
+
+        cutoff = time.time() - STALE_STAGING_SECONDS
+        for path in candidates:
+            try:
+                # Staging proses lain yang masih berjalan jangan disentuh
+                if not path.name.startswith(TRASH_PREFIX) and path.stat().st_mtime > cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            self.schedule(path)
+            count += 1
+        return count
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Tunggu GC selesai (dipakai saat shutdown/testing)."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
@@ -0,0 +1,93 @@
+"""Chat Handler untuk Agent Pribadi (AG)
+
+Satu jalur pemrosesan command yang dipakai semua transport (HTTP
+/api/chat dan Unix domain socket): proses command dengan chat_rules,
+tambahkan timestamp, lalu simpan ke command history. Setiap command
+dijalankan dalam satu trace (core.tracing). Juga menyediakan
+daftar completion untuk REPL CLI.
+"""
+
+import time
+import logging
+from datetime import datetime
+from typing import Dict
+
+from core.chat_rules import process_command, INTENT_COMMANDS, TOOL_COMMANDS
+from core.metrics import COMMANDS, COMMAND_SECONDS
+from core import profiler, tracing
+from storage.db import get_db
+
+logger = logging.getLogger(__name__)
+
+
+def handle_chat(message: str, timing: bool = False) -> Dict:
+    """Proses satu pesan chat.
+
+    Args:
+        message: Command dari user
+        timing: Sertakan rincian span trace di field 'timing'
+
+    Returns:
+        Dict: Hasil process_command ditambah 'timestamp' (dan 'timing')
+    """
+    logger.debug("Processing command: %s", message)
+
+    with tracing.start_trace('chat', command=message[:200]) as root:
+        start = time.perf_counter()
+        token = profiler.begin('command')
+        command_type = None
+        try:
+            result = process_command(message)
+            command_type = result.get('command_type', 'unknown')
+        finally:
+            profiler.end(token, command_type)
+        COMMAND_SECONDS.observe(time.perf_counter() - start, command_type)
+        COMMANDS.inc(command_type, 'true' if result.get('success') else 'false')
+        root.set_attribute('command_type', command_type)
+        root.set_attribute('success', bool(result.get('success')))
+        result['timestamp'] = datetime.now().isoformat()
+
+        get_db().add_command_history(
+            command=message,
+            command_type=command_type,
+            success=result.get('success', False),
+            response_preview=result.get('message', ''),
+            data=result.get('data', None)
+        )
+
+        logger.info(
+            "Command processed: %s, success: %s", command_type, result.get('success'),
+            extra={
+                'sampled': True,
+                'command': message[:200],
+                'command_type': command_type,
+                'latency_ms': round((time.perf_counter() - start) * 1000, 3)
+            }
+        )
+
+    if timing and root.trace is not None:
+        result['timing'] = root.trace.timing()
+
+    return result
+
+
+def get_completions() -> Dict:
+    """Kandidat completion: registry intent plus tools tersedia/terinstall.
+
+    Returns:
+        Dict: {'intents': [...], 'tool_commands': [...],
+               'available': {tool: [versi]}, 'installed': {tool: [versi]}}
+    """
+    from core.tools_manager import get_tools_manager
+
+    manager = get_tools_manager()
+    installed: Dict[str, list] = {}
+    for entry in manager.list_installed_tools():
+        installed.setdefault(entry['tool'], []).append(entry['version'])
+
+    return {
+        'intents': list(INTENT_COMMANDS),
+        'tool_commands': list(TOOL_COMMANDS),
+        'available': manager.list_available_tools(),
+        'installed': installed
+    }
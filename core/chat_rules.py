@@ -5,6 +5,7 @@ Tidak menggunakan LLM - murni if-elif-else untuk stabilitas 100%.
 """
 
 from typing import Dict, Any
+from core.tracing import traced
 from core.persona import (
     format_response,
     format_unknown_command,
@@ -18,9 +19,42 @@ from core.system_monitor import (
     get_gpu_status,
     get_system_summary
 )
-from core.tools_manager import get_tools_manager
 
 
+# Registry intent: contoh command per rule (dipakai completion CLI/REPL)
+INTENT_COMMANDS = [
+    'halo',
+    'jam berapa',
+    'cek ram',
+    'cek cpu',
+    'cek gpu',
+    'cek sistem',
+    'list tools',
+    'tools installed',
+    'bantuan'
+]
+
+# Command tools yang diikuti "<tool> <versi>"
+TOOL_COMMANDS = ['setup', 'remove', 'use']
+
+
+def get_tools_manager():
+    """Import tools manager saat command tools pertama kali dipakai.
+
+    Command sistem (cek ram/cpu/gpu, jam) tidak perlu memuat requests, yaml,
+    tarfile, dan modul download/ekstraksi.
+    """
+    from core.tools_manager import get_tools_manager as _get_tools_manager
+    return _get_tools_manager()
+
+
+def get_install_scheduler():
+    """Import install scheduler saat batch setup pertama kali dipakai."""
+    from core.install_scheduler import get_install_scheduler as _get_install_scheduler
+    return _get_install_scheduler()
+
+
+@traced('chat_rules.process_command')
 def process_command(user_input: str) -> Dict[str, Any]:
     """Memproses command user dengan rule-based logic.
     
@@ -70,6 +104,10 @@ def process_command(user_input: str) -> Dict[str, Any]:
     if 'remove' in user_input or 'uninstall' in user_input:
         return _handle_tool_remove(user_input)
     
+    # Rule 6b: Tools Management - Switch Versi Aktif
+    if user_input.startswith('use '):
+        return _handle_tool_use(user_input)
+    
     # Rule 7: Status RAM
     if any(word in user_input for word in ['ram', 'memori', 'memory']):
         ram_data = get_ram_status()
@@ -188,9 +226,12 @@ def process_command(user_input: str) -> Dict[str, Any]:
             "  • 'jam berapa' - Melihat waktu saat ini\n\n"
             "🔧 Perintah Tools Manager:\n"
             "  • 'setup nginx 1.25.4' - Install tool\n"
+            "  • 'setup node latest' - Install versi terbaru\n"
+            "  • 'setup nginx 1.25.4 node 22.14.0' - Install beberapa tool paralel\n"
             "  • 'list tools' - Lihat tools tersedia\n"
             "  • 'tools installed' - Lihat tools terpasang\n"
-            "  • 'remove nginx 1.25.4' - Hapus tool\n\n"
+            "  • 'remove nginx 1.25.4' - Hapus tool\n"
+            "  • 'use node 20.18.0' - Ganti versi aktif (bin/<tool>/current)\n\n"
             "Silakan berikan perintah yang Anda inginkan."
         )
         return {
@@ -210,11 +251,14 @@ def process_command(user_input: str) -> Dict[str, Any]:
 def _handle_tool_setup(user_input: str) -> Dict[str, Any]:
     """Handle setup tool command.
     
-    Expected format: "setup <tool> <version>"
-    Example: "setup nginx 1.25.4"
+    Expected format: "setup <tool> <version> [<tool> <version> ...]"
+    Example: "setup nginx 1.25.4" atau "setup nginx 1.25.4 node 22.14.0"
     """
     parts = user_input.split()
     
+    if len(parts) > 3 and len(parts) % 2 == 1:
+        return _handle_batch_setup(list(zip(parts[1::2], parts[2::2])))
+    
     if len(parts) < 3:
         return {
             'success': False,
@@ -249,6 +293,42 @@ def _handle_tool_setup(user_input: str) -> Dict[str, Any]:
         }
 
 
+def _handle_batch_setup(items) -> Dict[str, Any]:
+    """Handle setup beberapa tool sekaligus lewat InstallScheduler.
+    
+    Download berjalan paralel (dengan batas bandwidth global) dan ekstraksi
+    di pool CPU terpisah.
+    """
+    try:
+        scheduler = get_install_scheduler()
+        job = scheduler.wait(scheduler.submit(items))
+        
+        success = all(item['status'] == 'done' for item in job['items'])
+        
+        message_lines = [
+            f"{get_greeting()}. Hasil batch install:\n" if success
+            else f"Mohon maaf, {MASTER_NAME}. Sebagian tools gagal diinstall:\n"
+        ]
+        for item in job['items']:
+            icon = '✅' if item['status'] == 'done' else '❌'
+            message_lines.append(f"{icon} {item['tool']} {item['version']} ({item['seconds']}s)")
+            message_lines.append(f"   {item['message']}")
+        
+        return {
+            'success': success,
+            'message': '\n'.join(message_lines),
+            'data': job,
+            'command_type': 'tool_setup'
+        }
+    
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f"Mohon maaf, {MASTER_NAME}. Terjadi error: {str(e)}",
+            'command_type': 'tool_setup'
+        }
+
+
 def _handle_list_available_tools() -> Dict[str, Any]:
     """Handle list available tools command."""
     try:
@@ -268,7 +348,7 @@ def _handle_list_available_tools() -> Dict[str, Any]:
             versions_str = ', '.join(str(v) for v in versions)
             message_lines.append(f"🔧 {tool}: {versions_str}")
         
-        message_lines.append(f"\nGunakan 'setup <tool> <version>' untuk menginstall.")
+        message_lines.append(f"\nGunakan 'setup <tool> <version>' (atau 'setup <tool> latest') untuk menginstall.")
         
         return {
             'success': True,
@@ -301,9 +381,20 @@ def _handle_list_installed_tools() -> Dict[str, Any]:
         message_lines = [f"{get_greeting()}. Tools yang terinstall:\n"]
         
         for item in installed:
-            message_lines.append(f"✅ {item['tool']} {item['version']}")
+            size_mb = item.get('size_bytes', 0) / (1024 * 1024)
+            current = " ⭐ current" if item.get('current') else ""
+            message_lines.append(f"✅ {item['tool']} {item['version']} ({size_mb:.1f} MB, {item.get('file_count', 0)} files){current}")
             message_lines.append(f"   📁 {item['path']}\n")
         
+        usage = tools_manager.get_disk_usage()
+        message_lines.append("💾 Disk usage per tool:")
+        for tool, tool_usage in usage['tools'].items():
+            disk_mb = tool_usage['disk_bytes'] / (1024 * 1024)
+            saved_mb = tool_usage['saved_bytes'] / (1024 * 1024)
+            message_lines.append(f"   • {tool}: {disk_mb:.1f} MB ({tool_usage['versions']} versi, hemat {saved_mb:.1f} MB)")
+        if usage['dedup'].get('enabled'):
+            message_lines.append(f"   Total dedup: hemat {usage['dedup']['saved_bytes'] / (1024 * 1024):.1f} MB")
+        
         return {
             'success': True,
             'message': '\n'.join(message_lines),
@@ -359,3 +450,45 @@ def _handle_tool_remove(user_input: str) -> Dict[str, Any]:
             'message': f"Mohon maaf, {MASTER_NAME}. Terjadi error: {str(e)}",
             'command_type': 'tool_remove'
         }
+
+
+def _handle_tool_use(user_input: str) -> Dict[str, Any]:
+    """Handle switch versi aktif tool.
+    
+    Expected format: "use <tool> <version>"
+    Example: "use node 20.18.0"
+    """
+    parts = user_input.split()
+    
+    if len(parts) < 3:
+        return {
+            'success': False,
+            'message': f"Mohon maaf, {MASTER_NAME}. Format command: 'use <tool> <version>'\nContoh: 'use node 20.18.0'",
+            'command_type': 'tool_use'
+        }
+    
+    tool = parts[1]
+    version = parts[2]
+    
+    try:
+        tools_manager = get_tools_manager()
+        success, message = tools_manager.use_tool(tool, version)
+        
+        formatted_message = f"{get_greeting()}. {message}" if success else f"Mohon maaf, {MASTER_NAME}. {message}"
+        
+        return {
+            'success': success,
+            'message': formatted_message,
+            'data': {
+                'tool': tool,
+                'version': version
+            },
+            'command_type': 'tool_use'
+        }
+    
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f"Mohon maaf, {MASTER_NAME}. Terjadi error: {str(e)}",
+            'command_type': 'tool_use'
+        }
@@ -5,33 +5,203 @@ Membantu Agent memiliki 'memory' dan awareness terhadap context:
 - System state trends
 - Time-based patterns
 - User preferences (future)
+
+Backend default (CONTEXT_BACKEND = 'file') memakai journal append-only (storage/context.journal, satu
+event JSON per baris) ditambah snapshot terkompaksi (storage/context.json)
+yang ditulis atomik (temp file + rename) setiap CONTEXT_SNAPSHOT_EVERY
+event. Saat load, snapshot dibaca lalu event journal dengan seq lebih baru
+di-replay. Untuk deployment multi-worker, CONTEXT_BACKEND = 'sqlite' memakai
+storage.context_store yang aman antar proses (SharedContextManager).
 """
 
+import os
 import json
-from datetime import datetime, timedelta
+import time
+import threading
+import logging
+from array import array
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from collections import defaultdict
 
-from config.settings import PROJECT_ROOT
+from config.settings import (
+    CONTEXT_BACKEND,
+    CONTEXT_SNAPSHOT_PATH,
+    CONTEXT_JOURNAL_PATH,
+    CONTEXT_SNAPSHOT_EVERY,
+    CONTEXT_STAT_CAPACITY,
+    CONTEXT_STAT_EWMA_ALPHA
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_LAST_COMMANDS = 10
+
+# Perubahan (%) sepanjang window yang dianggap tren naik/turun
+TREND_THRESHOLD_PERCENT = 5
+
+
+class StatSeries:
+    """Ring buffer kapasitas tetap untuk satu jenis stat.
+
+    Timestamp (epoch float) dan nilai disimpan di dua array('d'), jadi
+    memori per stat tetap 16 bytes x capacity. Jumlah, EWMA, dan jumlah
+    untuk regresi least-squares (sum t, v, t^2, t*v) di-update setiap append
+    sehingga mean, EWMA, dan slope dibaca dalam O(1).
+
+    Waktu di dalam sum relatif terhadap `_origin` agar t^2 tidak kehilangan
+    presisi; sum dihitung ulang (dan origin digeser) setiap buffer berputar
+    penuh untuk membuang drift floating point dari pengurangan berulang.
+    """
+
+    __slots__ = ('capacity', 'alpha', 'times', 'values', '_head', '_count', '_origin',
+                 '_sum_t', '_sum_v', '_sum_tt', '_sum_tv', 'ewma')
+
+    def __init__(self, capacity: int = CONTEXT_STAT_CAPACITY, alpha: float = CONTEXT_STAT_EWMA_ALPHA):
+        self.capacity = max(3, capacity)
+        self.alpha = alpha
+        self.times = array('d', bytes(8 * self.capacity))
+        self.values = array('d', bytes(8 * self.capacity))
+        self._head = 0
+        self._count = 0
+        self._origin = 0.0
+        self._sum_t = self._sum_v = self._sum_tt = self._sum_tv = 0.0
+        self.ewma: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, ts: float, value: float) -> None:
+        """Tambah sample (menimpa sample tertua jika penuh)."""
+        if self._count == 0:
+            self._origin = ts
+
+        if self._count == self.capacity:
+            old_t = self.times[self._head] - self._origin
+            old_v = self.values[self._head]
+            self._sum_t -= old_t
+            self._sum_v -= old_v
+            self._sum_tt -= old_t * old_t
+            self._sum_tv -= old_t * old_v
+        else:
+            self._count += 1
+
+        self.times[self._head] = ts
+        self.values[self._head] = value
+        t = ts - self._origin
+        self._sum_t += t
+        self._sum_v += value
+        self._sum_tt += t * t
+        self._sum_tv += t * value
+        self.ewma = value if self.ewma is None else self.alpha * value + (1 - self.alpha) * self.ewma
+
+        self._head = (self._head + 1) % self.capacity
+        if self._head == 0 and self._count == self.capacity:
+            self._recompute()
+
+    def _recompute(self) -> None:
+        """Hitung ulang sum secara eksak dengan origin = sample tertua."""
+        self._origin = self.times[self._head] if self._count == self.capacity else self.times[0]
+        self._sum_t = self._sum_v = self._sum_tt = self._sum_tv = 0.0
+        for i in range(self._count):
+            t = self.times[i] - self._origin
+            v = self.values[i]
+            self._sum_t += t
+            self._sum_v += v
+            self._sum_tt += t * t
+            self._sum_tv += t * v
+
+    def _index(self, age: int) -> int:
+        """Index array untuk sample ke-`age` dari yang terbaru (0 = terbaru)."""
+        return (self._head - 1 - age) % self.capacity
+
+    def last(self, n: int = 1) -> List[float]:
+        """n nilai terbaru (terlama lebih dulu)."""
+        n = min(n, self._count)
+        return [self.values[self._index(age)] for age in range(n - 1, -1, -1)]
+
+    @property
+    def oldest_time(self) -> float:
+        return self.times[self._index(self._count - 1)]
+
+    @property
+    def newest_time(self) -> float:
+        return self.times[self._index(0)]
+
+    @property
+    def mean(self) -> float:
+        return self._sum_v / self._count if self._count else 0.0
+
+    @property
+    def slope(self) -> float:
+        """Slope least-squares nilai terhadap waktu (unit per detik)."""
+        n = self._count
+        denominator = n * self._sum_tt - self._sum_t * self._sum_t
+        if n < 2 or denominator <= 0:
+            return 0.0
+        return (n * self._sum_tv - self._sum_t * self._sum_v) / denominator
+
+    def since(self, cutoff: float) -> 'StatSeries':
+        """Series baru berisi sample dengan timestamp > cutoff."""
+        recent = StatSeries(self._count, self.alpha)
+        for age in range(self._count - 1, -1, -1):
+            index = self._index(age)
+            if self.times[index] > cutoff:
+                recent.append(self.times[index], self.values[index])
+        return recent
+
+    def to_dict(self) -> Dict:
+        """Bentuk snapshot: sample terurut dari yang terlama plus EWMA."""
+        order = [self._index(age) for age in range(self._count - 1, -1, -1)]
+        return {
+            "t": [self.times[i] for i in order],
+            "v": [self.values[i] for i in order],
+            "ewma": self.ewma
+        }
+
+    @classmethod
+    def from_dict(cls, data, capacity: int = CONTEXT_STAT_CAPACITY) -> 'StatSeries':
+        """Load dari snapshot (juga format lama: list of {value, timestamp})."""
+        series = cls(capacity)
+        if isinstance(data, list):
+            for entry in data:
+                try:
+                    ts = datetime.fromisoformat(entry["timestamp"]).timestamp()
+                    series.append(ts, float(entry["value"]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            return series
+
+        for ts, value in zip(data.get("t", []), data.get("v", [])):
+            series.append(ts, value)
+        if data.get("ewma") is not None:
+            series.ewma = data["ewma"]
+        return series
 
 
 class ContextManager:
     """Manage conversation context and system awareness."""
     
-    def __init__(self):
-        self.context_file = PROJECT_ROOT / 'storage' / 'context.json'
+    def __init__(self, snapshot_path: Path = CONTEXT_SNAPSHOT_PATH, journal_path: Path = CONTEXT_JOURNAL_PATH,
+                 snapshot_every: int = CONTEXT_SNAPSHOT_EVERY):
+        """Inisialisasi context manager.
+
+        Args:
+            snapshot_path: Path snapshot terkompaksi
+            journal_path: Path journal event append-only
+            snapshot_every: Kompaksi journal ke snapshot tiap N event
+        """
+        self.context_file = snapshot_path
+        self.journal_file = journal_path
+        self.snapshot_every = max(1, snapshot_every)
+        self._lock = threading.Lock()
+        self._journal = None
+        self._seq = 0
+        self._journal_events = 0
         self.context_data = self._load_context()
         
-    def _load_context(self) -> Dict:
-        """Load context from file."""
-        if self.context_file.exists():
-            try:
-                with open(self.context_file, 'r') as f:
-                    return json.load(f)
-            except Exception:
-                pass
-        
+    def _empty_context(self) -> Dict:
         return {
             "last_commands": [],
             "system_stats": {},
@@ -39,54 +209,152 @@ class ContextManager:
             "preferences": {},
             "last_updated": None
         }
-    
-    def _save_context(self):
-        """Save context to file."""
+
+    def _load_context(self) -> Dict:
+        """Load snapshot lalu replay journal sejak snapshot tersebut."""
+        data = self._empty_context()
+        if self.context_file.exists():
+            try:
+                with open(self.context_file, 'r') as f:
+                    snapshot = json.load(f)
+                self._seq = snapshot.pop("seq", 0)
+                stats = snapshot.pop("system_stats", {})
+                data.update(snapshot)
+                data["system_stats"] = {
+                    stat_type: StatSeries.from_dict(series) for stat_type, series in stats.items()
+                }
+            except Exception as e:
+                logger.error(f"Error loading context snapshot: {e}")
+
+        replayed = 0
         try:
-            self.context_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.context_file, 'w') as f:
-                json.dump(self.context_data, f, indent=2)
-        except Exception:
+            with open(self.journal_file, 'rb') as f:
+                raw = f.read()
+            end = raw.rfind(b'\n') + 1
+            if end < len(raw):
+                # Baris terakhir terpotong (crash saat append): buang agar
+                # append berikutnya mulai di baris baru
+                os.truncate(self.journal_file, end)
+            for line in raw[:end].splitlines():
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                # Event yang sudah masuk snapshot dilewati
+                if event.get("seq", 0) <= self._seq:
+                    continue
+                self._apply(data, event)
+                self._seq = event["seq"]
+                replayed += 1
+        except FileNotFoundError:
             pass
+        except Exception as e:
+            logger.error(f"Error replaying context journal: {e}")
+
+        self._journal_events = replayed
+        if replayed:
+            logger.info(f"Replayed {replayed} context events from journal")
+        return data
+
+    @staticmethod
+    def _apply(data: Dict, event: Dict) -> None:
+        """Terapkan satu event ke context (dipakai live dan saat replay)."""
+        op = event.get("op")
+        if op == "command":
+            data["last_commands"].append({
+                "command": event["command"],
+                "type": event["type"],
+                "success": event["success"],
+                "timestamp": event["ts"]
+            })
+            # Keep only last 10 commands
+            if len(data["last_commands"]) > MAX_LAST_COMMANDS:
+                del data["last_commands"][:-MAX_LAST_COMMANDS]
+            data["interaction_count"] = data.get("interaction_count", 0) + 1
+            data["last_updated"] = event["ts"]
+        elif op == "stat":
+            series = data["system_stats"].get(event["stat"])
+            if series is None:
+                series = data["system_stats"][event["stat"]] = StatSeries()
+            ts = event["ts"]
+            if isinstance(ts, str):
+                # Journal format lama (timestamp ISO)
+                ts = datetime.fromisoformat(ts).timestamp()
+            series.append(ts, float(event["value"]))
+
+    def _record(self, event: Dict):
+        """Terapkan event lalu append ke journal; kompaksi jika sudah waktunya."""
+        with self._lock:
+            self._seq += 1
+            event["seq"] = self._seq
+            self._apply(self.context_data, event)
+            try:
+                if self._journal is None:
+                    self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+                    self._journal = open(self.journal_file, 'a')
+                self._journal.write(json.dumps(event, separators=(',', ':')) + '\n')
+                self._journal.flush()
+                self._journal_events += 1
+            except Exception as e:
+                logger.warning(f"Cannot append context journal: {e}")
+                return
+
+            if self._journal_events >= self.snapshot_every:
+                self._compact()
+
+    def _compact(self):
+        """Tulis snapshot atomik lalu kosongkan journal (harus memegang lock).
+
+        Jika crash terjadi di antara rename snapshot dan truncate journal,
+        event lama dilewati saat replay karena seq-nya <= seq snapshot.
+        """
+        try:
+            self.context_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.context_file.with_name(f"{self.context_file.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w') as f:
+                snapshot = dict(self.context_data, seq=self._seq)
+                snapshot["system_stats"] = {
+                    stat_type: series.to_dict() for stat_type, series in self.context_data["system_stats"].items()
+                }
+                json.dump(snapshot, f, separators=(',', ':'))
+            os.replace(tmp_path, self.context_file)
+
+            if self._journal is not None:
+                self._journal.close()
+            self._journal = open(self.journal_file, 'w')
+            self._journal_events = 0
+        except Exception as e:
+            logger.warning(f"Cannot compact context journal: {e}")
+
+    def flush(self):
+        """Paksa kompaksi journal ke snapshot (misal saat shutdown)."""
+        with self._lock:
+            if self._journal_events:
+                self._compact()
     
     def add_command(self, command: str, command_type: str, success: bool):
         """Add command to history (limited to last 10)."""
-        command_entry = {
+        self._record({
+            "op": "command",
             "command": command,
             "type": command_type,
             "success": success,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        self.context_data["last_commands"].append(command_entry)
-        
-        # Keep only last 10 commands
-        if len(self.context_data["last_commands"]) > 10:
-            self.context_data["last_commands"] = self.context_data["last_commands"][-10:]
-        
-        self.context_data["interaction_count"] += 1
-        self.context_data["last_updated"] = datetime.now().isoformat()
-        
-        self._save_context()
+            "ts": datetime.now().isoformat()
+        })
     
     def update_system_stats(self, stat_type: str, value: Any):
-        """Update system statistics for trend analysis."""
-        if stat_type not in self.context_data["system_stats"]:
-            self.context_data["system_stats"][stat_type] = []
-        
-        stat_entry = {
+        """Update system statistics for trend analysis (nilai numerik)."""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring non-numeric stat {stat_type}: {value!r}")
+            return
+        self._record({
+            "op": "stat",
+            "stat": stat_type,
             "value": value,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        self.context_data["system_stats"][stat_type].append(stat_entry)
-        
-        # Keep only last 50 stat entries per type
-        if len(self.context_data["system_stats"][stat_type]) > 50:
-            self.context_data["system_stats"][stat_type] = \
-                self.context_data["system_stats"][stat_type][-50:]
-        
-        self._save_context()
+            "ts": time.time()
+        })
     
     def get_recent_commands(self, limit: int = 5) -> List[Dict]:
         """Get recent commands."""
@@ -107,39 +375,49 @@ class ContextManager:
         """Check if user is frequent (> 100 interactions)."""
         return self.get_interaction_count() > 100
     
+    def get_stat_summary(self, stat_type: str) -> Optional[Dict]:
+        """Ringkasan rolling satu stat: count, last, mean, ewma, slope (per menit)."""
+        series = self.context_data["system_stats"].get(stat_type)
+        if not series:
+            return None
+        return {
+            "count": len(series),
+            "last": series.last(1)[0],
+            "mean": round(series.mean, 3),
+            "ewma": round(series.ewma, 3),
+            "slope_per_minute": round(series.slope * 60, 4)
+        }
+
     def get_system_trend(self, stat_type: str, minutes: int = 30) -> Optional[str]:
         """Analyze trend for a stat type in last N minutes.
         
+        Tren diambil dari slope least-squares yang di-maintain incremental:
+        perubahan prediksi sepanjang window dibanding mean. Jika seluruh
+        buffer masih di dalam window, query O(1); jika tidak, sample lama
+        dilewati dengan scan terbatas (maksimal capacity).
+
         Returns: 'increasing', 'decreasing', 'stable', or None
         """
-        if stat_type not in self.context_data["system_stats"]:
+        series = self.context_data["system_stats"].get(stat_type)
+        if series is None or len(series) < 3:
             return None
         
-        stats = self.context_data["system_stats"][stat_type]
-        if len(stats) < 3:
-            return None
-        
-        # Filter stats from last N minutes
-        cutoff_time = datetime.now() - timedelta(minutes=minutes)
-        recent_stats = [
-            s for s in stats
-            if datetime.fromisoformat(s["timestamp"]) > cutoff_time
-        ]
-        
-        if len(recent_stats) < 3:
-            return None
-        
-        # Simple trend analysis
-        values = [s["value"] for s in recent_stats]
-        first_half = sum(values[:len(values)//2]) / (len(values)//2)
-        second_half = sum(values[len(values)//2:]) / (len(values) - len(values)//2)
+        cutoff = time.time() - minutes * 60
+        if series.oldest_time > cutoff:
+            slope, mean = series.slope, series.mean
+            span = series.newest_time - series.oldest_time
+        else:
+            recent = series.since(cutoff)
+            if len(recent) < 3:
+                return None
+            slope, mean = recent.slope, recent.mean
+            span = recent.newest_time - recent.oldest_time
         
-        threshold = 5  # 5% change threshold
-        diff_percent = ((second_half - first_half) / first_half) * 100 if first_half > 0 else 0
+        diff_percent = (slope * span / mean) * 100 if mean > 0 else 0
         
-        if diff_percent > threshold:
+        if diff_percent > TREND_THRESHOLD_PERCENT:
             return "increasing"
-        elif diff_percent < -threshold:
+        elif diff_percent < -TREND_THRESHOLD_PERCENT:
             return "decreasing"
         else:
             return "stable"
@@ -161,28 +439,103 @@ class ContextManager:
     
     def should_suggest_action(self, stat_type: str, threshold: float) -> bool:
         """Check if should suggest action based on recent stats."""
-        if stat_type not in self.context_data["system_stats"]:
-            return False
-        
-        stats = self.context_data["system_stats"][stat_type]
-        if not stats:
-            return False
+        series = self.context_data["system_stats"].get(stat_type)
         
         # Check last 3 entries
-        recent = stats[-3:]
-        if len(recent) < 3:
+        if series is None or len(series) < 3:
             return False
         
         # All above threshold?
-        return all(s["value"] > threshold for s in recent)
+        return all(value > threshold for value in series.last(3))
+
+
+class SharedContextManager(ContextManager):
+    """Context bersama antar worker, disimpan di SQLite (storage.context_store).
+
+    Setiap proses menyimpan salinan context di memori. Sebelum dibaca,
+    salinan dicek terhadap `PRAGMA data_version`: jika worker lain sudah
+    commit, context dimuat ulang; jika tidak, pembacaan murni in-memory.
+    Counter di-update atomik di database, bukan di salinan lokal.
+    """
+
+    def __init__(self, store=None):
+        """Inisialisasi context bersama.
+
+        Args:
+            store: ContextStore (default: storage/context.db)
+        """
+        from storage.context_store import ContextStore
+
+        self.store = store or ContextStore()
+        self._lock = threading.Lock()
+        self._version = None
+        self._data = self._empty_context()
+        self._sync(force=True)
+
+    @property
+    def context_data(self) -> Dict:
+        self._sync()
+        return self._data
+
+    def _sync(self, force: bool = False) -> None:
+        """Muat ulang salinan lokal jika ada commit dari proses lain."""
+        try:
+            if not force and self.store.data_version() == self._version:
+                return
+            loaded = self.store.load()
+        except Exception as e:
+            logger.warning(f"Cannot load shared context: {e}")
+            return
+
+        self._version = loaded['data_version']
+        self._data = {
+            "last_commands": loaded['last_commands'],
+            "system_stats": {stat_type: StatSeries.from_dict(series) for stat_type, series in loaded['stats'].items()},
+            "interaction_count": loaded['interaction_count'],
+            "preferences": loaded['preferences'],
+            "last_updated": loaded['last_updated']
+        }
+
+    def _record(self, event: Dict):
+        """Tulis event ke store lalu perbarui salinan lokal."""
+        with self._lock:
+            try:
+                if event["op"] == "command":
+                    count = self.store.add_command(event["command"], event["type"], event["success"],
+                                                   event["ts"], keep=MAX_LAST_COMMANDS)
+                else:
+                    ewma = self.store.add_stat(event["stat"], event["ts"], event["value"],
+                                               keep=CONTEXT_STAT_CAPACITY, alpha=CONTEXT_STAT_EWMA_ALPHA)
+                version = self.store.data_version()
+            except Exception as e:
+                logger.warning(f"Cannot write shared context: {e}")
+                return
+
+            if version != self._version:
+                # Worker lain ikut menulis: muat ulang (sudah termasuk event ini)
+                self._sync(force=True)
+                return
+
+            # Hanya proses ini yang menulis: cukup terapkan event ke salinan lokal
+            self._apply(self._data, event)
+            if event["op"] == "command":
+                self._data["interaction_count"] = count
+            else:
+                self._data["system_stats"][event["stat"]].ewma = ewma
+
+    def flush(self):
+        """Tidak ada buffer: setiap event sudah di-commit."""
 
 
 # Global instance
 _context_manager = None
 
 def get_context_manager() -> ContextManager:
-    """Get global context manager instance."""
+    """Get global context manager instance (backend sesuai CONTEXT_BACKEND)."""
     global _context_manager
     if _context_manager is None:
-        _context_manager = ContextManager()
+        if CONTEXT_BACKEND == 'sqlite':
+            _context_manager = SharedContextManager()
+        else:
+            _context_manager = ContextManager()
     return _context_manager
\ No newline at end of file
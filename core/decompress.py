@@ -0,0 +1,256 @@
+"""Decompressor untuk Agent Pribadi (AG)
+
+Abstraksi dekompresi archive tools:
+- Deteksi format dari magic bytes (bukan dari suffix nama file)
+- Prioritaskan tool eksternal multi-thread jika tersedia
+  (`xz -T0`, `pigz`, `zstd -T0`, `lbzip2`/`pbzip2`)
+- Fallback ke stdlib (gzip/lzma/bz2) jika tool eksternal tidak ada
+- Laporan throughput dekompresi
+"""
+
+import io
+import bz2
+import gzip
+import lzma
+import time
+import shutil
+import tarfile
+import threading
+import subprocess
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from config.settings import TOOLS_DECOMPRESS_EXTERNAL
+
+logger = logging.getLogger(__name__)
+
+# Magic bytes per format (offset 0)
+_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+    (b'BZh', 'bzip2'),
+    (b'PK\x03\x04', 'zip'),
+)
+
+# Header yang dibutuhkan untuk deteksi (tar: "ustar" di offset 257)
+SNIFF_SIZE = 512
+
+# Backend eksternal per format, urut berdasarkan prioritas
+EXTERNAL_BACKENDS: Dict[str, List[List[str]]] = {
+    'xz': [['xz', '-T0', '-dc']],
+    'gzip': [['pigz', '-dc']],
+    'zstd': [['zstd', '-T0', '-dc']],
+    'bzip2': [['lbzip2', '-dc'], ['pbzip2', '-dc']],
+}
+
+_STDLIB_OPENERS = {
+    'gzip': lambda f: gzip.GzipFile(fileobj=f, mode='rb'),
+    'xz': lambda f: lzma.LZMAFile(f, mode='rb'),
+    'bzip2': lambda f: bz2.BZ2File(f, mode='rb'),
+    'tar': lambda f: f,
+}
+
+_COPY_BUFFER = 1024 * 1024
+
+
+def detect_format(header: bytes) -> Optional[str]:
+    """Deteksi format archive dari bytes awal file.
+
+    Args:
+        header: Minimal SNIFF_SIZE bytes pertama
+
+    Returns:
+        Optional[str]: 'gzip', 'xz', 'zstd', 'bzip2', 'zip', 'tar' atau None
+    """
+    for magic, fmt in _MAGIC:
+        if header.startswith(magic):
+            return fmt
+    if header[257:262] == b'ustar':
+        return 'tar'
+    return None
+
+
+def sniff_file(path: Path) -> Optional[str]:
+    """Deteksi format archive dari file di disk."""
+    with open(path, 'rb') as f:
+        return detect_format(f.read(SNIFF_SIZE))
+
+
+def select_backend(fmt: str) -> Tuple[str, Optional[List[str]]]:
+    """Pilih backend dekompresi untuk format tertentu.
+
+    Returns:
+        Tuple[str, Optional[List[str]]]: (nama backend, command eksternal
+        atau None untuk stdlib)
+
+    Raises:
+        ValueError: Jika format tidak didukung oleh backend manapun
+    """
+    if TOOLS_DECOMPRESS_EXTERNAL:
+        for cmd in EXTERNAL_BACKENDS.get(fmt, []):
+            if shutil.which(cmd[0]):
+                return ' '.join(cmd), cmd
+
+    if fmt in _STDLIB_OPENERS:
+        return 'stdlib', None
+
+    raise ValueError(f"No decompressor available for format: {fmt}")
+
+
+class _CountingReader(io.RawIOBase):
+    """Hitung bytes yang dibaca dari stream di bawahnya."""
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.count = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        data = self.raw.read(len(b))
+        n = len(data)
+        b[:n] = data
+        self.count += n
+        return n
+
+
+def _pump(source: BinaryIO, sink: BinaryIO, errors: List[BaseException]) -> None:
+    """Salin source ke stdin proses eksternal (thread terpisah)."""
+    try:
+        while True:
+            data = source.read(_COPY_BUFFER)
+            if not data:
+                break
+            sink.write(data)
+    except BrokenPipeError:
+        pass
+    except BaseException as e:
+        errors.append(e)
+    finally:
+        try:
+            sink.close()
+        except OSError:
+            pass
+
+
+@contextmanager
+def open_decompressed(source: BinaryIO, fmt: str, stats: Optional[Dict] = None) -> Iterator[BinaryIO]:
+    """Buka stream hasil dekompresi dari source.
+
+    Args:
+        source: Stream archive terkompresi (file atau stream network)
+        fmt: Format hasil detect_format()
+        stats: Dict opsional yang diisi 'backend' dan 'decompressed_bytes'
+
+    Yields:
+        BinaryIO: Stream bytes hasil dekompresi
+    """
+    backend, cmd = select_backend(fmt)
+    stats = stats if stats is not None else {}
+    stats['backend'] = backend
+
+    if cmd is None:
+        counter = _CountingReader(_STDLIB_OPENERS[fmt](source))
+        try:
+            yield io.BufferedReader(counter, buffer_size=_COPY_BUFFER)
+        finally:
+            stats['decompressed_bytes'] = counter.count
+        return
+
+    # File di disk bisa langsung jadi stdin; stream lain dipompa lewat thread
+    has_fileno = False
+    try:
+        source.fileno()
+        has_fileno = True
+    except (OSError, AttributeError, io.UnsupportedOperation):
+        pass
+
+    proc = subprocess.Popen(
+        cmd,
+        stdin=source if has_fileno else subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    errors: List[BaseException] = []
+    pump = None
+    if not has_fileno:
+        pump = threading.Thread(target=_pump, args=(source, proc.stdin, errors), daemon=True)
+        pump.start()
+
+    counter = _CountingReader(proc.stdout)
+    try:
+        yield io.BufferedReader(counter, buffer_size=_COPY_BUFFER)
+
+        # Habiskan output tersisa agar proses selesai normal
+        while counter.read(_COPY_BUFFER):
+            pass
+    finally:
+        stats['decompressed_bytes'] = counter.count
+        proc.stdout.close()
+        if pump is not None:
+            pump.join()
+        stderr = proc.stderr.read().decode('utf-8', 'replace').strip()
+        proc.stderr.close()
+        returncode = proc.wait()
+
+    if errors:
+        raise errors[0]
+    if returncode != 0:
+        raise IOError(f"{backend} failed with code {returncode}: {stderr}")
+
+
+def extract_tar(source: Union[Path, BinaryIO], dest_dir: Path) -> Dict:
+    """Ekstrak tar archive (terkompresi atau tidak) ke dest_dir.
+
+    Args:
+        source: Path archive, atau stream dengan peek() (misal BufferedReader)
+        dest_dir: Directory tujuan
+
+    Returns:
+        Dict: {'format', 'backend', 'compressed_bytes', 'decompressed_bytes',
+               'seconds', 'mb_per_sec'}
+    """
+    start = time.perf_counter()
+    stats: Dict = {}
+
+    if isinstance(source, Path):
+        fmt = sniff_file(source)
+        stream = open(source, 'rb')
+        compressed = None
+        reader = stream
+    else:
+        fmt = detect_format(source.peek(SNIFF_SIZE)[:SNIFF_SIZE])
+        stream = None
+        compressed = _CountingReader(source)
+        reader = io.BufferedReader(compressed, buffer_size=_COPY_BUFFER)
+
+    if fmt is None or fmt == 'zip':
+        if stream is not None:
+            stream.close()
+        raise ValueError(f"Not a tar archive (detected: {fmt})")
+
+    stats['format'] = fmt
+
+    try:
+        with open_decompressed(reader, fmt, stats) as data:
+            with tarfile.open(fileobj=data, mode='r|') as tar_ref:
+                tar_ref.extractall(dest_dir)
+    finally:
+        if stream is not None:
+            stream.close()
+
+    seconds = time.perf_counter() - start
+    stats['compressed_bytes'] = source.stat().st_size if isinstance(source, Path) else compressed.count
+    stats['seconds'] = round(seconds, 3)
+    stats['mb_per_sec'] = round(stats['decompressed_bytes'] / (1024 * 1024) / seconds, 1) if seconds > 0 else 0
+
+    logger.info(
+        f"Decompressed {stats['compressed_bytes'] // (1024 * 1024)} MB -> "
+        f"{stats['decompressed_bytes'] // (1024 * 1024)} MB in {stats['seconds']}s "
+        f"({stats['mb_per_sec']} MB/s, format={fmt}, backend={stats['backend']})"
+    )
+    return stats
@@ -0,0 +1,257 @@
+"""Dedup Store untuk Agent Pribadi (AG)
+
+Deduplikasi file antar versi tools yang terinstall berdampingan
+(misal node 20.18.0 dan 20.18.1). Setelah ekstraksi, file di-hash secara
+paralel lalu file dengan isi identik di-hardlink ke object store bersama:
+
+    bin/.objects/<sha[:2]>/<sha256>-<mode>
+
+Mode permission ikut menjadi key karena hardlink berbagi inode (dan mode).
+Object yang tidak lagi dipakai instalasi manapun (st_nlink == 1) dihapus
+oleh prune() setelah remove/reinstall.
+
+Catatan: file yang di-hardlink berbagi isi, jadi tree instalasi harus
+diperlakukan read-only (edit in-place akan terlihat di semua versi). File
+konfigurasi (is_config_file: etc/, conf/, config/, *.conf, *.ini, *.cnf)
+memang diedit per instalasi, jadi tidak pernah di-dedup.
+"""
+
+import os
+import stat
+import time
+import errno
+import hashlib
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+_HASH_BUFFER = 1024 * 1024
+
+# File konfigurasi: tetap salinan sendiri per instalasi
+CONFIG_DIRS = {'etc', 'conf', 'config'}
+CONFIG_SUFFIXES = {'.conf', '.ini', '.cnf'}
+
+
+def is_config_file(rel_path: Path) -> bool:
+    """Cek apakah path (relatif terhadap root instalasi) file konfigurasi."""
+    return rel_path.suffix in CONFIG_SUFFIXES or any(part in CONFIG_DIRS for part in rel_path.parts[:-1])
+
+
+def _hash_file(path: str) -> str:
+    """SHA256 isi file (hashlib melepas GIL untuk buffer besar)."""
+    hasher = hashlib.sha256()
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            data = f.read(_HASH_BUFFER)
+            if not data:
+                break
+            hasher.update(data)
+    return hasher.hexdigest()
+
+
+class DedupStore:
+    """Object store content-addressed untuk hardlink antar instalasi."""
+
+    def __init__(self, objects_dir: Path, workers: int = 4, min_size: int = 4096):
+        """Inisialisasi store.
+
+        Args:
+            objects_dir: Directory object store (harus satu filesystem dengan bin/)
+            workers: Jumlah thread hashing
+            min_size: File lebih kecil dari ini dilewati
+        """
+        self.objects_dir = objects_dir
+        self.workers = max(1, workers)
+        self.min_size = min_size
+        self.enabled = True
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str, mode: int) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}-{mode:o}"
+
+    def _collect(self, root: Path) -> List[Tuple[str, os.stat_result]]:
+        """Daftar file regular (bukan symlink, bukan konfigurasi) yang layak di-dedup."""
+        files = []
+        for dirpath, dirs, names in os.walk(root):
+            rel_dir = Path(dirpath).relative_to(root)
+            for name in names:
+                if is_config_file(rel_dir / name):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode) and st.st_size >= self.min_size:
+                    files.append((path, st))
+        return files
+
+    def dedupe_tree(self, root: Path) -> Dict:
+        """Hash semua file di root dan hardlink isi identik ke object store.
+
+        Args:
+            root: Directory hasil ekstraksi (sebelum dipublish)
+
+        Returns:
+            Dict: {'files', 'linked_files', 'saved_bytes', 'new_objects', 'seconds'}
+                  saved_bytes = bytes yang sudah ada di store (tidak menambah disk)
+        """
+        start = time.perf_counter()
+        stats = {'files': 0, 'linked_files': 0, 'saved_bytes': 0, 'new_objects': 0, 'seconds': 0.0}
+
+        if not self.enabled:
+            return stats
+
+        files = self._collect(root)
+        stats['files'] = len(files)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ag-dedup') as pool:
+            digests = list(pool.map(lambda item: _hash_file(item[0]), files))
+
+        # Lock: prune() tidak boleh menghapus object yang sedang di-link
+        with self._lock:
+            for (path, st), digest in zip(files, digests):
+                obj = self._object_path(digest, st.st_mode & 0o7777)
+                try:
+                    linked = self._link(path, obj)
+                except OSError as e:
+                    if e.errno in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                        # Filesystem tidak mendukung hardlink: matikan untuk proses ini
+                        logger.warning(f"Dedup disabled, hardlink not supported: {e}")
+                        self.enabled = False
+                        break
+                    raise
+                if linked:
+                    stats['linked_files'] += 1
+                    stats['saved_bytes'] += st.st_size
+                else:
+                    stats['new_objects'] += 1
+
+        stats['seconds'] = round(time.perf_counter() - start, 3)
+        logger.info(
+            f"Dedup {root}: {stats['files']} files, {stats['linked_files']} linked, "
+            f"{stats['saved_bytes'] // (1024 * 1024)} MB saved in {stats['seconds']}s"
+        )
+        return stats
+
+    def _link(self, path: str, obj: Path) -> bool:
+        """Hubungkan file dengan object.
+
+        Returns:
+            bool: True jika file diganti hardlink ke object yang sudah ada,
+                  False jika file menjadi object baru
+        """
+        obj.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            # Object belum ada: file ini menjadi object
+            os.link(path, obj)
+            return False
+        except FileExistsError:
+            pass
+
+        if os.path.samefile(path, obj):
+            return False
+
+        # Ganti file dengan hardlink ke object secara atomik
+        tmp = f"{path}.ag-dedup"
+        os.link(obj, tmp)
+        os.replace(tmp, path)
+        return True
+
+    def prune(self) -> Dict:
+        """Hapus object yang hanya direferensikan store (st_nlink == 1).
+
+        Returns:
+            Dict: {'removed', 'freed_bytes'}
+        """
+        removed = 0
+        freed = 0
+
+        with self._lock:
+            if not self.objects_dir.exists():
+                return {'removed': 0, 'freed_bytes': 0}
+
+            for bucket in self.objects_dir.iterdir():
+                if not bucket.is_dir():
+                    continue
+                for obj in bucket.iterdir():
+                    try:
+                        st = obj.stat()
+                        if st.st_nlink == 1:
+                            obj.unlink()
+                            removed += 1
+                            freed += st.st_size
+                    except FileNotFoundError:
+                        continue
+                try:
+                    bucket.rmdir()
+                except OSError:
+                    pass
+
+        if removed:
+            logger.info(f"Pruned {removed} unused objects ({freed // (1024 * 1024)} MB)")
+        return {'removed': removed, 'freed_bytes': freed}
+
+    def shared_usage(self, root: Path) -> Dict:
+        """Bagian tree yang berbagi object dengan file lain, dari st_nlink saat ini.
+
+        Object dengan st_nlink = n dipakai n - 1 file: setiap file dihitung
+        menempati 1/(n - 1) ukurannya, sisanya sebagai penghematan. Hasilnya
+        tidak bergantung urutan install, dan jumlah saved_bytes semua
+        instalasi sama dengan saved_bytes get_stats().
+
+        Args:
+            root: Directory instalasi
+
+        Returns:
+            Dict: {'linked_files', 'saved_bytes'}
+        """
+        linked = 0
+        saved = 0.0
+        for _, st in self._collect(root):
+            refs = st.st_nlink - 1
+            if refs >= 2:
+                linked += 1
+                saved += st.st_size * (refs - 1) / refs
+        return {'linked_files': linked, 'saved_bytes': int(saved)}
+
+    def get_stats(self) -> Dict:
+        """Ukur penghematan disk aktual dari isi object store.
+
+        Object dengan st_nlink = n dipakai n - 1 file instalasi, tapi hanya
+        menempati disk sekali.
+
+        Returns:
+            Dict: {'enabled', 'objects', 'object_bytes', 'referenced_bytes', 'saved_bytes'}
+        """
+        objects = 0
+        object_bytes = 0
+        referenced = 0
+        saved = 0
+
+        if self.objects_dir.exists():
+            for bucket in self.objects_dir.iterdir():
+                if not bucket.is_dir():
+                    continue
+                for obj in bucket.iterdir():
+                    try:
+                        st = obj.stat()
+                    except FileNotFoundError:
+                        continue
+                    objects += 1
+                    object_bytes += st.st_size
+                    referenced += st.st_size * max(st.st_nlink - 1, 0)
+                    saved += st.st_size * max(st.st_nlink - 2, 0)
+
+        return {
+            'enabled': self.enabled,
+            'objects': objects,
+            'object_bytes': object_bytes,
+            'referenced_bytes': referenced,
+            'saved_bytes': saved
+        }
@@ -0,0 +1,246 @@
+"""Download Cache untuk Agent Pribadi (AG)
+
+Cache archive tools yang content-addressed di `bin/.cache`:
+- Object disimpan per sha256 di `objects/<sha256>/<filename>`
+- Index URL -> sha256 agar reinstall tidak perlu menyentuh network
+- Eviction LRU dengan batas ukuran total (TOOLS_CACHE_MAX_BYTES)
+
+Archive tidak pernah diekstrak langsung dari `objects/`: lookup() dan add()
+mengembalikan hardlink di `leases/` milik pemanggil, jadi eviction oleh
+thread atau proses lain (embedded mode, socket server) hanya menghapus nama
+di cache, bukan file yang sedang diekstrak. Pemanggil menghapus lease dengan
+release() setelah selesai; lease proses yang sudah mati dibersihkan saat
+startup.
+
+Index dibaca ulang setiap kali file index.json diganti proses lain.
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from config.settings import TOOLS_CACHE_DIR, TOOLS_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveCache:
+    """Content-addressed archive cache dengan LRU eviction."""
+
+    def __init__(self, cache_dir: Path = TOOLS_CACHE_DIR, max_bytes: int = TOOLS_CACHE_MAX_BYTES):
+        """Inisialisasi cache.
+
+        Args:
+            cache_dir: Root directory cache
+            max_bytes: Budget ukuran total object (0 = tanpa batas)
+        """
+        self.cache_dir = cache_dir
+        self.objects_dir = cache_dir / 'objects'
+        self.leases_dir = cache_dir / 'leases'
+        self.index_path = cache_dir / 'index.json'
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index_signature = None
+        self._index = self._load_index()
+        self._sweep_leases()
+
+    def _signature(self) -> Optional[Tuple[int, int, int]]:
+        """Identitas file index (berubah setiap kali diganti os.replace)."""
+        try:
+            st = os.stat(self.index_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load_index(self) -> Dict:
+        """Load index cache dari disk."""
+        self._index_signature = self._signature()
+        if self._index_signature is not None:
+            try:
+                with open(self.index_path, 'r') as f:
+                    index = json.load(f)
+                if 'urls' in index and 'objects' in index:
+                    return index
+            except Exception as e:
+                logger.warning(f"Cache index unreadable, starting fresh: {e}")
+
+        return {'urls': {}, 'objects': {}}
+
+    def _refresh_index(self) -> None:
+        """Baca ulang index jika diganti proses lain (harus memegang lock)."""
+        if self._signature() != self._index_signature:
+            self._index = self._load_index()
+
+    def _save_index(self) -> None:
+        """Simpan index secara atomik (harus dipanggil saat memegang lock)."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+        self._index_signature = self._signature()
+
+    def _checkout(self, path: Path) -> Path:
+        """Hardlink object ke leases/ (nama unik milik proses ini)."""
+        self.leases_dir.mkdir(parents=True, exist_ok=True)
+        lease = self.leases_dir / f"{os.getpid()}-{uuid.uuid4().hex[:8]}-{path.name}"
+        try:
+            os.link(path, lease)
+        except OSError:
+            # Filesystem tanpa hardlink
+            shutil.copy2(path, lease)
+        return lease
+
+    def release(self, lease: Path) -> None:
+        """Hapus lease dari lookup()/add() setelah archive selesai dipakai."""
+        try:
+            lease.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _sweep_leases(self) -> None:
+        """Hapus lease milik proses yang sudah tidak berjalan."""
+        if not self.leases_dir.exists():
+            return
+        for lease in self.leases_dir.iterdir():
+            try:
+                pid = int(lease.name.split('-', 1)[0])
+                os.kill(pid, 0)
+                continue
+            except (ValueError, ProcessLookupError):
+                pass
+            except PermissionError:
+                # Proses masih ada (milik user lain)
+                continue
+            self.release(lease)
+
+    def _object_path(self, sha256: str, filename: str) -> Path:
+        return self.objects_dir / sha256 / filename
+
+    def has(self, url: str, expected_sha256: Optional[str] = None) -> bool:
+        """Cek apakah archive ada di cache tanpa mengambil lease."""
+        with self._lock:
+            self._refresh_index()
+            sha256 = expected_sha256.lower() if expected_sha256 else self._index['urls'].get(url)
+            entry = self._index['objects'].get(sha256) if sha256 else None
+            return entry is not None and self._object_path(sha256, entry['filename']).exists()
+
+    def lookup(self, url: str, expected_sha256: Optional[str] = None) -> Optional[Tuple[Path, str]]:
+        """Cari archive di cache.
+
+        Jika expected_sha256 diberikan, lookup langsung berdasarkan digest
+        (URL lain dengan isi sama juga cocok). Jika tidak, pakai index URL.
+
+        Args:
+            url: URL sumber archive
+            expected_sha256: Digest yang diharapkan (opsional)
+
+        Returns:
+            Optional[Tuple[Path, str]]: (lease, sha256) atau None jika miss.
+            Lease harus dilepas dengan release()
+        """
+        with self._lock:
+            self._refresh_index()
+            sha256 = expected_sha256.lower() if expected_sha256 else self._index['urls'].get(url)
+            if not sha256:
+                return None
+
+            entry = self._index['objects'].get(sha256)
+            if not entry:
+                return None
+
+            path = self._object_path(sha256, entry['filename'])
+            if not path.exists():
+                # Object hilang dari disk, bersihkan index
+                self._index['objects'].pop(sha256, None)
+                self._save_index()
+                return None
+
+            entry['last_used'] = time.time()
+            self._index['urls'][url] = sha256
+            self._save_index()
+            lease = self._checkout(path)
+
+        logger.info(f"Cache hit for {url} ({sha256[:12]})")
+        return lease, sha256
+
+    def add(self, url: str, path: Path, sha256: str, checkout: bool = True) -> Optional[Path]:
+        """Pindahkan archive yang sudah diverifikasi ke cache.
+
+        Args:
+            url: URL sumber archive
+            path: Path archive hasil download (akan dipindah)
+            sha256: Digest archive (sudah dihitung saat download)
+            checkout: Kembalikan lease untuk diekstrak pemanggil
+
+        Returns:
+            Optional[Path]: Lease archive (harus dilepas dengan release()),
+            None jika checkout False
+        """
+        sha256 = sha256.lower()
+        filename = path.name
+        target = self._object_path(sha256, filename)
+        # Lease diambil dari file download, sebelum object terlihat oleh
+        # eviction di thread/proses lain
+        lease = self._checkout(path) if checkout else None
+
+        with self._lock:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if target.exists():
+                path.unlink()
+            else:
+                os.replace(path, target)
+
+            self._refresh_index()
+            self._index['objects'][sha256] = {
+                'filename': filename,
+                'size': target.stat().st_size,
+                'last_used': time.time()
+            }
+            self._index['urls'][url] = sha256
+            self._evict(keep=sha256)
+            self._save_index()
+
+        return lease
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Hapus object paling lama tidak dipakai sampai total <= budget.
+
+        Harus dipanggil saat memegang lock.
+        """
+        if not self.max_bytes:
+            return
+
+        objects = self._index['objects']
+        total = sum(entry['size'] for entry in objects.values())
+
+        for sha256, entry in sorted(objects.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if sha256 == keep:
+                continue
+
+            shutil.rmtree(self.objects_dir / sha256, ignore_errors=True)
+            total -= entry['size']
+            del objects[sha256]
+            logger.info(f"Evicted cached archive {entry['filename']} ({sha256[:12]})")
+
+        live = set(objects)
+        self._index['urls'] = {u: s for u, s in self._index['urls'].items() if s in live}
+
+    def get_stats(self) -> Dict:
+        """Statistik cache: jumlah object dan total ukuran."""
+        with self._lock:
+            self._refresh_index()
+            objects = self._index['objects']
+            return {
+                'objects': len(objects),
+                'total_bytes': sum(entry['size'] for entry in objects.values()),
+                'max_bytes': self.max_bytes
+            }
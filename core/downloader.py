@@ -0,0 +1,599 @@
+"""Download Engine untuk Agent Pribadi (AG)
+
+Download file besar (archive tools) dengan:
+- HTTP Range segments yang di-fetch paralel lewat requests.Session (pooled)
+- Buffer besar dan preallocation file target
+- Resume dari state parsial yang disimpan di `<file>.part.json`
+- Fallback ke single stream jika server tidak mendukung Range
+- Hashing incremental (sha256) selama bytes masuk, tanpa pass baca kedua
+- Failover ke mirror berikutnya di tengah download (lanjut dari offset
+  terakhir dengan Range, tanpa mengulang bytes yang sudah diterima)
+"""
+
+import os
+import json
+import re
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import (
+    TOOLS_DOWNLOAD_TIMEOUT,
+    TOOLS_DOWNLOAD_SEGMENTS,
+    TOOLS_DOWNLOAD_CHUNK_SIZE,
+    TOOLS_DOWNLOAD_MIN_SEGMENT_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+_CONTENT_RANGE_RE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+# Simpan state parsial setiap kali segment maju sebanyak ini
+_STATE_SAVE_INTERVAL = 4 * 1024 * 1024
+
+
+def create_session(pool_size: int = TOOLS_DOWNLOAD_SEGMENTS) -> requests.Session:
+    """Buat requests.Session dengan connection pool yang cukup untuk semua segment.
+
+    Args:
+        pool_size: Jumlah koneksi maksimal per host
+
+    Returns:
+        requests.Session: Session yang bisa dipakai ulang antar download
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class RateLimiter:
+    """Token bucket global untuk membatasi total bandwidth download.
+
+    Satu instance dibagi ke semua Downloader/segment sehingga batas berlaku
+    untuk seluruh download yang berjalan bersamaan.
+    """
+
+    def __init__(self, bytes_per_second: int):
+        """Inisialisasi RateLimiter.
+
+        Args:
+            bytes_per_second: Batas bandwidth (0 = tanpa batas)
+        """
+        self.rate = bytes_per_second
+        self.capacity = max(bytes_per_second, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, nbytes: int) -> None:
+        """Tunggu sampai nbytes boleh dikirim (blocking)."""
+        if self.rate <= 0:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= nbytes
+            deficit = -self.tokens
+
+        if deficit > 0:
+            time.sleep(deficit / self.rate)
+
+
+class _Progress:
+    """Progress logger berbasis threshold (bukan modulo ukuran chunk)."""
+
+    def __init__(self, label: str, total: int, step_percent: int = 10):
+        self.label = label
+        self.total = total
+        self.step = max(1, total * step_percent // 100) if total else 1024 * 1024 * 10
+        self.done = 0
+        self.next_report = self.step
+        self.lock = threading.Lock()
+
+    def add(self, nbytes: int) -> None:
+        with self.lock:
+            self.done += nbytes
+            if self.done < self.next_report:
+                return
+            while self.next_report <= self.done:
+                self.next_report += self.step
+            done = self.done
+
+        if self.total:
+            logger.info(f"Downloaded {self.label}: {done * 100 / self.total:.1f}% "
+                        f"({done // (1024 * 1024)}/{self.total // (1024 * 1024)} MB)")
+        else:
+            logger.info(f"Downloaded {self.label}: {done // (1024 * 1024)} MB")
+
+
+class _MirrorPool:
+    """Daftar mirror untuk satu download; mirror yang gagal tidak dipakai lagi."""
+
+    def __init__(self, urls: List[str], reporter: Optional[Callable] = None):
+        self.urls = list(dict.fromkeys(urls))
+        # Skor hanya relevan jika ada pilihan mirror
+        self.reporter = reporter if len(self.urls) > 1 else None
+        self.dead = set()
+        self.lock = threading.Lock()
+
+    def alive(self) -> List[str]:
+        with self.lock:
+            return [url for url in self.urls if url not in self.dead]
+
+    def fail(self, url: str, error: Exception) -> None:
+        with self.lock:
+            if url in self.dead:
+                return
+            self.dead.add(url)
+            remaining = len(self.urls) - len(self.dead)
+        logger.warning(f"Mirror failed {url}: {error} ({remaining} mirror(s) left)")
+        if self.reporter is not None:
+            self.reporter(url, False)
+
+    def success(self, url: str, nbytes: int, seconds: float, latency: float) -> None:
+        if self.reporter is not None and nbytes and seconds > 0:
+            self.reporter(url, True, throughput=nbytes / seconds, latency=latency)
+
+
+class _OrderedHasher:
+    """Hash file yang ditulis paralel per segment, dalam urutan byte.
+
+    Chunk yang tepat berada di frontier hash di-update langsung dari memory.
+    Segment yang selesai lebih dulu dibaca dari page cache ketika frontier
+    mencapainya, sehingga hashing tetap berjalan bersamaan dengan download
+    dan tidak ada pass baca ulang setelah download selesai.
+    """
+
+    def __init__(self, hasher, part_path: Path, segments: List[List[int]]):
+        self.hasher = hasher
+        self.segments = segments
+        self.offset = 0
+        self.lock = threading.Lock()
+        self.reader = open(part_path, 'rb')
+
+    def _written_end(self) -> int:
+        """Offset akhir (eksklusif) data kontigu yang sudah ditulis dari frontier."""
+        for start, end, done in self.segments:
+            if start <= self.offset <= end:
+                return start + done
+        return self.offset
+
+    def _catch_up(self) -> None:
+        while True:
+            end = self._written_end()
+            if end <= self.offset:
+                return
+            self.reader.seek(self.offset)
+            while self.offset < end:
+                data = self.reader.read(min(end - self.offset, 1024 * 1024))
+                if not data:
+                    return
+                self.hasher.update(data)
+                self.offset += len(data)
+
+    def advance(self, pos: int, chunk: bytes) -> None:
+        """Laporkan chunk yang baru ditulis di offset pos."""
+        with self.lock:
+            if pos == self.offset:
+                self.hasher.update(chunk)
+                self.offset += len(chunk)
+            self._catch_up()
+
+    def finish(self) -> None:
+        with self.lock:
+            self._catch_up()
+        self.reader.close()
+
+
+class Downloader:
+    """Download engine dengan parallel ranged segments dan resume."""
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        segments: int = TOOLS_DOWNLOAD_SEGMENTS,
+        chunk_size: int = TOOLS_DOWNLOAD_CHUNK_SIZE,
+        min_segment_size: int = TOOLS_DOWNLOAD_MIN_SEGMENT_SIZE,
+        timeout: int = TOOLS_DOWNLOAD_TIMEOUT,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
+        """Inisialisasi Downloader.
+
+        Args:
+            session: Session yang dipakai (default: session pooled baru)
+            segments: Jumlah maksimal segment paralel
+            chunk_size: Ukuran buffer baca/tulis per chunk
+            min_segment_size: Ukuran minimal per segment; file lebih kecil
+                dari 2x nilai ini didownload dengan single stream
+            timeout: Timeout koneksi/baca dalam detik
+            rate_limiter: Token bucket bersama untuk batas bandwidth global
+        
+        Atribut `reporter` (opsional) dipanggil dengan hasil per mirror:
+        reporter(url, ok, throughput=..., latency=...).
+        """
+        self.session = session or create_session(segments)
+        self.segments = max(1, segments)
+        self.chunk_size = chunk_size
+        self.min_segment_size = min_segment_size
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.reporter: Optional[Callable] = None
+
+    # ------------------------------------------------------------------
+    # State parsial
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _part_path(target: Path) -> Path:
+        return target.with_name(target.name + '.part')
+
+    @staticmethod
+    def _state_path(target: Path) -> Path:
+        return target.with_name(target.name + '.part.json')
+
+    def _load_state(self, target: Path, url: str, size: int, validator: Optional[str]) -> Optional[Dict]:
+        """Load state parsial jika masih cocok dengan remote file."""
+        state_path = self._state_path(target)
+        part_path = self._part_path(target)
+
+        if not state_path.exists() or not part_path.exists():
+            return None
+
+        try:
+            with open(state_path, 'r') as f:
+                state = json.load(f)
+        except Exception:
+            return None
+
+        if state.get('url') != url or state.get('size') != size or state.get('validator') != validator:
+            logger.info(f"Partial download state outdated, restarting: {target.name}")
+            return None
+
+        return state
+
+    def _save_state(self, target: Path, state: Dict) -> None:
+        """Simpan state parsial secara atomik (temp file + rename)."""
+        state_path = self._state_path(target)
+        tmp_path = state_path.with_name(state_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+    def _plan_segments(self, size: int) -> List[List[int]]:
+        """Bagi file menjadi segment [start, end_inclusive, downloaded]."""
+        count = min(self.segments, max(1, size // self.min_segment_size))
+        seg_size = size // count
+        segments = []
+        for i in range(count):
+            start = i * seg_size
+            end = size - 1 if i == count - 1 else start + seg_size - 1
+            segments.append([start, end, 0])
+        return segments
+
+    # ------------------------------------------------------------------
+    # Probe
+    # ------------------------------------------------------------------
+
+    def _probe(self, url: str):
+        """Cek ukuran file dan dukungan Range dengan request `bytes=0-0`.
+
+        Returns:
+            Tuple[requests.Response, Optional[int], bool, Optional[str]]:
+            (response, size, supports_range, validator). Response 200 (tanpa
+            Range) dikembalikan dalam keadaan terbuka agar bisa dipakai
+            langsung sebagai single stream.
+        """
+        response = self.session.get(
+            url, headers={'Range': 'bytes=0-0'}, stream=True, timeout=self.timeout
+        )
+        response.raise_for_status()
+
+        validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+
+        if response.status_code == 206:
+            match = _CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+            response.close()
+            if match and match.group(3) != '*':
+                return None, int(match.group(3)), True, validator
+            # Range didukung tapi ukuran tidak diketahui -> single stream
+            return None, None, False, validator
+
+        size = int(response.headers.get('content-length', 0)) or None
+        return response, size, False, validator
+
+    def _probe_first(self, pool: _MirrorPool):
+        """Probe mirror sesuai urutan sampai ada yang merespons."""
+        last_error: Optional[Exception] = None
+        for url in pool.alive():
+            try:
+                return url, self._probe(url)
+            except (requests.RequestException, IOError) as e:
+                last_error = e
+                pool.fail(url, e)
+        raise IOError(f"All mirrors failed: {last_error}")
+
+    # ------------------------------------------------------------------
+    # Download
+    # ------------------------------------------------------------------
+
+    def _iter_chunks(self, response: requests.Response) -> Iterator[bytes]:
+        """Iterasi body response per chunk dengan batas bandwidth global."""
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            if chunk:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.consume(len(chunk))
+                yield chunk
+
+    def _open_at(self, pool: _MirrorPool, offset: int, size: Optional[int] = None) -> Tuple[str, requests.Response]:
+        """Buka response dari mirror hidup pertama, mulai dari offset.
+
+        Raises:
+            IOError: Jika semua mirror gagal
+        """
+        last_error: Optional[Exception] = None
+        for url in pool.alive():
+            headers = {'Range': f'bytes={offset}-'} if offset else {}
+            try:
+                response = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+                response.raise_for_status()
+                if offset:
+                    match = _CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+                    if response.status_code != 206 or not match or int(match.group(1)) != offset:
+                        response.close()
+                        raise IOError("mirror cannot resume at the current offset (no Range support)")
+                    if size is not None and match.group(3) != '*' and int(match.group(3)) != size:
+                        response.close()
+                        raise IOError(f"mirror serves a different file size ({match.group(3)} != {size})")
+                return url, response
+            except (requests.RequestException, IOError) as e:
+                last_error = e
+                pool.fail(url, e)
+        raise IOError(f"All mirrors failed: {last_error}")
+
+    def _iter_failover(self, pool: _MirrorPool, url: str, response: requests.Response,
+                       offset: int = 0, size: Optional[int] = None) -> Iterator[bytes]:
+        """Iterasi chunk; jika mirror putus di tengah jalan, lanjut dari
+        offset yang sama di mirror berikutnya.
+
+        Skor mirror: latency = waktu sampai header response diterima
+        (response.elapsed), throughput hanya dihitung dari waktu menunggu
+        chunk, bukan waktu yang dipakai consumer (misal extractor).
+        """
+        while True:
+            waited = 0.0
+            received = 0
+            try:
+                with response:
+                    chunks = self._iter_chunks(response)
+                    while True:
+                        wait_start = time.perf_counter()
+                        chunk = next(chunks, None)
+                        waited += time.perf_counter() - wait_start
+                        if chunk is None:
+                            break
+                        offset += len(chunk)
+                        received += len(chunk)
+                        yield chunk
+                pool.success(url, received, waited, response.elapsed.total_seconds())
+                return
+            except (requests.RequestException, IOError) as e:
+                pool.fail(url, e)
+                url, response = self._open_at(pool, offset, size)
+                logger.info(f"Failover to {url} at offset {offset}")
+
+    def open_stream(self, url: str, mirrors: Optional[List[str]] = None):
+        """Buka response streaming untuk pipeline download-to-extract.
+
+        Args:
+            url: URL utama
+            mirrors: Semua kandidat URL urut prioritas (default: [url]);
+                jika satu gagal, lanjut ke berikutnya
+
+        Returns:
+            Tuple[requests.Response, Iterator[bytes]]: Response pertama (harus
+            ditutup caller) dan iterator chunk yang sudah rate-limited dan
+            otomatis failover ke mirror berikutnya
+        """
+        pool = _MirrorPool(list(mirrors) if mirrors else [url], self.reporter)
+        active_url, response = self._open_at(pool, 0)
+        return response, self._iter_failover(pool, active_url, response)
+
+    def download(self, url: str, target: Path, hasher=None, mirrors: Optional[List[str]] = None) -> Path:
+        """Download url ke target.
+
+        Args:
+            url: URL sumber (identitas file untuk state resume)
+            target: Path file tujuan
+            hasher: Objek hashlib opsional yang di-update selama download
+            mirrors: Semua kandidat URL urut prioritas (default: [url]);
+                mirror berikutnya dipakai saat probe atau segment gagal
+
+        Returns:
+            Path: Path file yang sudah lengkap
+
+        Raises:
+            requests.RequestException: Jika download gagal
+            IOError: Jika ukuran hasil tidak sesuai
+        """
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        pool = _MirrorPool(list(mirrors) if mirrors else [url], self.reporter)
+        active_url, (response, size, supports_range, validator) = self._probe_first(pool)
+
+        if supports_range and size is not None and size >= 2 * self.min_segment_size:
+            self._download_segmented(url, target, size, validator, hasher, pool)
+        else:
+            if response is None:
+                active_url, response = self._open_at(pool, 0)
+            self._download_single(response, target, size, hasher, pool, active_url)
+
+        os.replace(self._part_path(target), target)
+        state_path = self._state_path(target)
+        if state_path.exists():
+            state_path.unlink()
+
+        logger.info(f"Download complete: {target}")
+        return target
+
+    def _download_single(self, response: requests.Response, target: Path, size: Optional[int], hasher=None,
+                         pool: Optional[_MirrorPool] = None, url: Optional[str] = None) -> None:
+        """Single stream download (server tanpa dukungan Range / file kecil)."""
+        part_path = self._part_path(target)
+        progress = _Progress(target.name, size or 0)
+
+        if pool is None:
+            pool = _MirrorPool([url or response.url], self.reporter)
+            url = pool.urls[0]
+
+        written = 0
+        with response, open(part_path, 'wb') as f:
+            for chunk in self._iter_failover(pool, url, response, 0, size):
+                f.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+                written += len(chunk)
+                progress.add(len(chunk))
+
+        if size is not None and written != size:
+            raise IOError(f"Incomplete download: {written}/{size} bytes")
+
+    def _download_segmented(self, url: str, target: Path, size: int, validator: Optional[str], hasher=None,
+                            mirror_pool: Optional[_MirrorPool] = None) -> None:
+        """Download paralel per segment dengan resume dan failover mirror."""
+        if mirror_pool is None:
+            mirror_pool = _MirrorPool([url], self.reporter)
+        part_path = self._part_path(target)
+        state = self._load_state(target, url, size, validator)
+
+        if state is None:
+            state = {
+                'url': url,
+                'size': size,
+                'validator': validator,
+                'segments': self._plan_segments(size)
+            }
+            with open(part_path, 'wb') as f:
+                _preallocate(f, size)
+            self._save_state(target, state)
+        else:
+            resumed = sum(seg[2] for seg in state['segments'])
+            logger.info(f"Resuming {target.name} from {resumed * 100 / size:.1f}%")
+
+        segments = state['segments']
+        progress = _Progress(target.name, size)
+        progress.add(sum(seg[2] for seg in segments))
+        state_lock = threading.Lock()
+
+        def save_progress():
+            with state_lock:
+                self._save_state(target, state)
+
+        ordered = _OrderedHasher(hasher, part_path, segments) if hasher is not None else None
+
+        pending = [seg for seg in segments if seg[0] + seg[2] <= seg[1]]
+        logger.info(f"Downloading {target.name} in {len(pending)} segment(s)")
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(pending) or 1) as pool:
+                futures = [
+                    pool.submit(self._fetch_segment, mirror_pool, size, part_path, seg, progress, save_progress, ordered)
+                    for seg in pending
+                ]
+                try:
+                    for future in futures:
+                        future.result()
+                finally:
+                    save_progress()
+        finally:
+            if ordered is not None:
+                ordered.finish()
+
+    def _fetch_segment(self, pool: _MirrorPool, size: int, part_path: Path, seg: List[int], progress: _Progress,
+                       save_progress, ordered: Optional[_OrderedHasher] = None) -> None:
+        """Fetch satu segment Range; jika mirror gagal, lanjut di mirror berikutnya."""
+        while True:
+            alive = pool.alive()
+            if not alive:
+                raise IOError(f"All mirrors failed for segment {seg[0]}-{seg[1]}")
+            url = alive[0]
+            try:
+                self._fetch_segment_from(url, pool, size, part_path, seg, progress, save_progress, ordered)
+                return
+            except (requests.RequestException, IOError) as e:
+                pool.fail(url, e)
+
+    def _fetch_segment_from(self, url: str, pool: _MirrorPool, size: int, part_path: Path, seg: List[int],
+                            progress: _Progress, save_progress, ordered: Optional[_OrderedHasher] = None) -> None:
+        """Fetch sisa satu segment dari satu mirror dan tulis di offset yang sesuai."""
+        start, end, done = seg
+        headers = {'Range': f'bytes={start + done}-{end}'}
+
+        began = time.perf_counter()
+        response = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+        response.raise_for_status()
+        latency = time.perf_counter() - began
+        if response.status_code != 206:
+            response.close()
+            raise IOError(f"Server ignored Range request for segment {start}-{end}")
+        match = _CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+        if match and match.group(3) != '*' and int(match.group(3)) != size:
+            response.close()
+            raise IOError(f"Mirror serves a different file size ({match.group(3)} != {size})")
+
+        since_save = 0
+        received = 0
+        # Unbuffered agar data langsung terlihat oleh _OrderedHasher
+        with response, open(part_path, 'r+b', buffering=0) as f:
+            f.seek(start + seg[2])
+            for chunk in self._iter_chunks(response):
+                remaining = end + 1 - (start + seg[2])
+                chunk = chunk[:remaining]
+                pos = start + seg[2]
+                _write_all(f, chunk)
+                seg[2] += len(chunk)
+                received += len(chunk)
+                if ordered is not None:
+                    ordered.advance(pos, chunk)
+                since_save += len(chunk)
+                progress.add(len(chunk))
+
+                if since_save >= _STATE_SAVE_INTERVAL:
+                    save_progress()
+                    since_save = 0
+
+                if start + seg[2] > end:
+                    break
+
+        if start + seg[2] <= end:
+            raise IOError(f"Segment {start}-{end} incomplete: {seg[2]} bytes")
+
+        pool.success(url, received, time.perf_counter() - began, latency)
+
+
+def _write_all(f, data: bytes) -> None:
+    """Tulis semua bytes ke file unbuffered (menangani short write)."""
+    view = memoryview(data)
+    while view:
+        written = f.write(view)
+        view = view[written:]
+
+
+def _preallocate(f, size: int) -> None:
+    """Alokasikan ruang file target di awal (fallocate jika tersedia)."""
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError:
+            pass
+    f.truncate(size)
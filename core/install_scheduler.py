@@ -0,0 +1,259 @@
+"""Install Scheduler untuk Agent Pribadi (AG)
+
+Batch install beberapa tools sekaligus dengan dua pool terpisah:
+- Network pool (TOOLS_DOWNLOAD_WORKERS) untuk download, dengan batas
+  bandwidth global dari RateLimiter milik ToolsManager
+- CPU pool (TOOLS_EXTRACT_WORKERS, default jumlah core) untuk ekstraksi
+  dan source build (output build terakhir ada di 'log' per item). Pada
+  streaming install thread network hanya menerima bytes, ekstraksinya
+  berjalan di CPU pool.
+
+Download tool berikutnya berjalan selama tool sebelumnya diekstrak, jadi
+total waktu mendekati install terlama, bukan jumlah semuanya.
+
+Setiap item memakai key single-flight yang sama dengan
+ToolsManager.setup_tool: item yang tool/versinya sedang di-setup (lewat
+chat atau batch lain) menunggu hasil setup tersebut, bukan menulis ke path
+download/staging yang sama. Sama seperti @coalesce, ini hanya berlaku jika
+'tool_setup' ada di COALESCED_COMMANDS.
+"""
+
+import time
+import uuid
+import threading
+import logging
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import COALESCED_COMMANDS, TOOLS_DOWNLOAD_WORKERS, TOOLS_EXTRACT_WORKERS
+from core.single_flight import get_single_flight
+from core.tools_manager import ToolsManager, get_tools_manager
+
+logger = logging.getLogger(__name__)
+
+# Jumlah job terakhir yang disimpan untuk query status
+MAX_JOBS = 50
+
+# Baris output build terakhir yang ditampilkan per item
+BUILD_LOG_TAIL = 20
+
+
+class InstallScheduler:
+    """Scheduler batch install dengan pool network dan CPU terpisah."""
+
+    def __init__(
+        self,
+        tools_manager: Optional[ToolsManager] = None,
+        download_workers: int = TOOLS_DOWNLOAD_WORKERS,
+        extract_workers: int = TOOLS_EXTRACT_WORKERS
+    ):
+        """Inisialisasi scheduler.
+
+        Args:
+            tools_manager: ToolsManager yang dipakai (default: singleton)
+            download_workers: Ukuran network pool
+            extract_workers: Ukuran CPU pool
+        """
+        self.tools_manager = tools_manager or get_tools_manager()
+        self.network_pool = ThreadPoolExecutor(max_workers=download_workers, thread_name_prefix='ag-download')
+        self.cpu_pool = ThreadPoolExecutor(max_workers=extract_workers, thread_name_prefix='ag-extract')
+        self._lock = threading.Lock()
+        self._jobs: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._events: Dict[str, threading.Event] = {}
+
+    def submit(self, items: List[Tuple[str, str]], force: bool = False) -> str:
+        """Jadwalkan batch install.
+
+        Args:
+            items: List (tool, version); 'latest' diresolusi, duplikat diabaikan
+            force: Force reinstall jika sudah ada
+
+        Returns:
+            str: Job ID
+        """
+        job_id = uuid.uuid4().hex[:12]
+        resolve = self.tools_manager.resolve_version
+        unique = list(OrderedDict.fromkeys((tool, resolve(tool, version)) for tool, version in items))
+
+        job = {
+            'id': job_id,
+            'status': 'running',
+            'created_at': datetime.now().isoformat(),
+            'finished_at': None,
+            'items': [
+                {
+                    'tool': tool,
+                    'version': version,
+                    'status': 'queued',
+                    'message': '',
+                    'seconds': None,
+                    'log': deque(maxlen=BUILD_LOG_TAIL)
+                }
+                for tool, version in unique
+            ]
+        }
+
+        with self._lock:
+            self._jobs[job_id] = job
+            self._events[job_id] = threading.Event()
+            while len(self._jobs) > MAX_JOBS:
+                old_id, _ = self._jobs.popitem(last=False)
+                self._events.pop(old_id, None)
+
+        logger.info(f"Batch install {job_id}: {', '.join(f'{t} {v}' for t, v in unique)}")
+
+        if not unique:
+            self._finish_job(job_id)
+
+        for item in job['items']:
+            self.network_pool.submit(self._run_network, job_id, item, force, time.perf_counter())
+
+        return job_id
+
+    def _update(self, item: Dict, **fields) -> None:
+        with self._lock:
+            item.update(fields)
+
+    def _build_logger(self, item: Dict):
+        """Callback output build: status 'building' + tail log di job status."""
+        def on_log(line: str) -> None:
+            with self._lock:
+                item['status'] = 'building'
+                item['log'].append(line)
+        return on_log
+
+    def _complete(self, job_id: str, item: Dict, started: float, success: bool, message: str,
+                  lease: Optional[Tuple] = None) -> None:
+        """Tandai satu item selesai dan tutup job jika semua item selesai.
+
+        Args:
+            lease: (key, call) single-flight milik item ini; pemanggil setup
+                yang sama (chat/batch lain) menerima (success, message)
+        """
+        if lease is not None:
+            get_single_flight().finish(*lease, result=(success, message))
+        self._update(
+            item,
+            status='done' if success else 'failed',
+            message=message,
+            seconds=round(time.perf_counter() - started, 2)
+        )
+        logger.info(f"Batch install {job_id}: {item['tool']} {item['version']} -> {item['status']}")
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            pending = job is not None and any(i['status'] not in ('done', 'failed') for i in job['items'])
+        if not pending:
+            self._finish_job(job_id)
+
+    def _finish_job(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] != 'running':
+                return
+            job['status'] = 'done'
+            job['finished_at'] = datetime.now().isoformat()
+            event = self._events.get(job_id)
+        if event is not None:
+            event.set()
+
+    def _run_network(self, job_id: str, item: Dict, force: bool, started: float) -> None:
+        """Fase network: validasi, lalu download (atau streaming install)."""
+        tm = self.tools_manager
+        tool, version = item['tool'], item['version']
+
+        lease = None
+        if 'tool_setup' in COALESCED_COMMANDS:
+            flight = get_single_flight()
+            key = f"tool_setup:{tm.setup_key(tool, version)}"
+            call, leader = flight.begin(key)
+            if not leader:
+                # Setup yang sama sedang berjalan: tunggu hasilnya. Leader tidak
+                # butuh network pool lagi (sudah di fase CPU, atau thread chat)
+                self._update(item, status='waiting')
+                try:
+                    success, message = flight.wait(call)
+                except Exception as e:
+                    success, message = False, f"Terjadi error: {str(e)}"
+                self._complete(job_id, item, started, success, message)
+                return
+            lease = (key, call)
+
+        try:
+            precheck = tm.check_setup(tool, version, force)
+            if precheck is not None:
+                self._complete(job_id, item, started, *precheck, lease=lease)
+                return
+
+            release = tm.get_release(tool, version)
+
+            if tm.should_stream(release):
+                self._update(item, status='streaming')
+                result = tm.stream_setup_result(tool, version, self._build_logger(item), extract_pool=self.cpu_pool)
+                self._complete(job_id, item, started, *result, lease=lease)
+                return
+
+            self._update(item, status='downloading')
+            archive_path = tm.fetch_archive(tool, version)
+            if not archive_path:
+                self._complete(job_id, item, started, False, "Gagal mendownload tool", lease=lease)
+                return
+
+            self._update(item, status='queued_extract')
+            self.cpu_pool.submit(self._run_extract, job_id, item, archive_path, started, lease)
+
+        except Exception as e:
+            logger.error(f"Batch install error for {tool} {version}: {e}")
+            self._complete(job_id, item, started, False, f"Terjadi error: {str(e)}", lease=lease)
+
+    def _run_extract(self, job_id: str, item: Dict, archive_path, started: float,
+                     lease: Optional[Tuple]) -> None:
+        """Fase CPU: ekstraksi archive (dan build untuk source tarball)."""
+        try:
+            self._update(item, status='extracting')
+            success, message = self.tools_manager.install_archive(
+                archive_path, item['tool'], item['version'], self._build_logger(item)
+            )
+            self._complete(job_id, item, started, success, message, lease=lease)
+        except Exception as e:
+            logger.error(f"Batch extract error for {item['tool']} {item['version']}: {e}")
+            self._complete(job_id, item, started, False, f"Terjadi error: {str(e)}", lease=lease)
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Snapshot status job (per-tool status ada di 'items')."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            snapshot['items'] = [dict(item, log=list(item['log'])) for item in job['items']]
+            return snapshot
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Tunggu job selesai lalu kembalikan status akhirnya."""
+        with self._lock:
+            event = self._events.get(job_id)
+        if event is not None:
+            event.wait(timeout)
+        return self.get_job(job_id)
+
+
+# Singleton instance
+_scheduler_instance = None
+_scheduler_lock = threading.Lock()
+
+
+def get_install_scheduler() -> InstallScheduler:
+    """Get singleton instance of InstallScheduler.
+
+    Returns:
+        InstallScheduler: Instance
+    """
+    global _scheduler_instance
+    if _scheduler_instance is None:
+        with _scheduler_lock:
+            if _scheduler_instance is None:
+                _scheduler_instance = InstallScheduler()
+    return _scheduler_instance
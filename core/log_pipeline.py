@@ -0,0 +1,194 @@
+"""Logging Pipeline untuk Agent Pribadi (AG)
+
+Thread request tidak pernah menulis ke disk: root logger hanya punya satu
+QueueHandler yang memasukkan LogRecord ke queue berukuran tetap, dan
+QueueListener di thread background yang memformat dan menulis ke:
+- LOG_FILE sebagai JSON lines (RotatingFileHandler, rotasi berdasarkan
+  ukuran LOG_MAX_BYTES, LOG_BACKUP_COUNT file lama)
+- stderr dalam format teks
+
+Record tidak diformat di thread request (pesan %-style baru digabung
+dengan args oleh listener). Jika queue penuh karena disk macet, record
+dibuang dan dihitung di ag_log_records_dropped_total, bukan memblokir
+request.
+
+Setiap record diberi request_id (X-Request-Id / per frame socket) dan
+trace_id command aktif. Log per request (extra={'sampled': True}) disampling
+dengan LOG_SAMPLE_RATE secara deterministik per request_id, jadi semua baris
+satu request ikut tersimpan atau ikut terbuang bersama; WARNING ke atas
+tidak pernah disampling.
+"""
+
+import os
+import sys
+import json
+import zlib
+import queue
+import random
+import atexit
+import logging
+import logging.handlers
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+
+from config.settings import (
+    LOG_FILE,
+    LOG_LEVEL,
+    LOG_FORMAT,
+    LOG_MAX_BYTES,
+    LOG_BACKUP_COUNT,
+    LOG_QUEUE_SIZE,
+    LOG_SAMPLE_RATE
+)
+from core import tracing
+from core.metrics import REGISTRY, register_collector
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+DROPPED = REGISTRY.counter('ag_log_records_dropped_total', 'Log record dibuang karena queue penuh')
+
+_request_id: ContextVar[Optional[str]] = ContextVar('ag_request_id', default=None)
+
+# Atribut bawaan LogRecord; sisanya (dari `extra`) ditulis sebagai field JSON
+_RESERVED = set(logging.LogRecord('', 0, '', 0, '', (), None).__dict__) | {'message', 'asctime', 'sampled'}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def new_request_id() -> str:
+    return os.urandom(8).hex()
+
+
+def set_request_id(request_id: Optional[str] = None):
+    """Set request id untuk context saat ini.
+
+    Args:
+        request_id: Id dari client (misal header X-Request-Id), atau None
+            untuk membuat id baru
+
+    Returns:
+        Token untuk reset_request_id()
+    """
+    return _request_id.set(request_id or new_request_id())
+
+
+def reset_request_id(token) -> None:
+    _request_id.reset(token)
+
+
+def get_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class ContextFilter(logging.Filter):
+    """Tambahkan request_id dan trace_id (dijalankan di thread pemanggil)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        record.trace_id = tracing.current_trace_id()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Sampling record ber-flag `sampled` di bawah WARNING."""
+
+    def __init__(self, rate: float = LOG_SAMPLE_RATE):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or record.levelno >= logging.WARNING or not getattr(record, 'sampled', False):
+            return True
+        key = getattr(record, 'request_id', None) or getattr(record, 'trace_id', None)
+        if key is None:
+            return random.random() < self.rate
+        return (zlib.crc32(key.encode()) & 0xFFFFFFFF) / 0x100000000 < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Satu objek JSON per baris: ts, level, logger, msg, plus field extra."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler yang membuang record saat queue penuh (tidak pernah blok).
+
+    prepare() tidak memformat pesan di thread pemanggil: listener berjalan
+    di proses yang sama sehingga record tidak perlu dipickle. Args logging
+    diharapkan immutable (string/angka).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DROPPED.inc()
+
+
+def _collect_metrics():
+    listener = _listener
+    depth = listener.queue.qsize() if listener is not None else 0
+    return [('ag_log_queue_depth', 'gauge', 'Log record menunggu ditulis', [({}, depth)])]
+
+
+register_collector(_collect_metrics)
+
+
+def setup_logging() -> None:
+    """Pasang pipeline di root logger dan mulai listener (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+    )
+    file_handler.setFormatter(JsonFormatter() if LOG_FORMAT == 'json' else logging.Formatter(TEXT_FORMAT))
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, LOG_LEVEL))
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    # Access log Werkzeug diganti access log terstruktur agent_service
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Tulis sisa record di queue lalu hentikan listener."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
@@ -0,0 +1,288 @@
+"""Metrics untuk Agent Pribadi (AG)
+
+Counter dan histogram in-process yang dirender ke format teks Prometheus
+(exposition format 0.0.4) oleh GET /metrics.
+
+Hot path (inc/observe) tidak mengambil lock: setiap thread menulis ke shard
+miliknya sendiri (threading.local) dan lock hanya dipakai sekali per thread
+saat shard didaftarkan. Penjumlahan antar shard dan formatting teks hanya
+dilakukan saat scrape. Shard milik thread yang sudah selesai (Werkzeug
+membuat thread per request) digabung ke shard "retired" saat thread baru
+mendaftar, jadi jumlah shard mengikuti jumlah thread yang hidup.
+
+Nilai yang sudah dihitung modul lain (coalescing, gauge host) diekspor
+lewat collector yang dipanggil saat scrape (register_collector).
+
+Metrics bersifat per proses: dengan beberapa worker WSGI setiap worker
+di-scrape/dijumlahkan sendiri oleh Prometheus.
+"""
+
+import bisect
+import math
+import threading
+import time
+import logging
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from config.settings import METRICS_ENABLED, METRICS_LATENCY_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Family dari collector: (name, type, help, [(labels, value), ...])
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class _Timer:
+    """Context manager: observe durasi blok ke histogram."""
+
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram: 'Histogram', labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class _Metric:
+    """Basis metric dengan shard per thread."""
+
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            pass
+
+        values: dict = {}
+        with self._lock:
+            alive = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    self._merge(self._retired, shard)
+            alive.append((threading.current_thread(), values))
+            self._shards = alive
+        self._local.values = values
+        return values
+
+    def _snapshot(self) -> dict:
+        """Jumlah semua shard (dipanggil saat scrape)."""
+        total: dict = {}
+        with self._lock:
+            self._merge(total, self._retired)
+            for _, shard in self._shards:
+                self._merge(total, shard)
+        return total
+
+    def _merge(self, total: dict, shard: dict) -> None:
+        raise NotImplementedError
+
+    def _label_dict(self, labels: tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, labels))
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Counter monoton, label berupa argumen posisi sesuai labelnames."""
+
+    kind = 'counter'
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        if not METRICS_ENABLED:
+            return
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, total: dict, shard: dict) -> None:
+        # dict.copy() atomik terhadap thread pemilik shard (GIL)
+        for labels, value in shard.copy().items():
+            total[labels] = total.get(labels, 0) + value
+
+    def render(self) -> List[str]:
+        return [
+            f'{self.name}{_format_labels(self._label_dict(labels))} {_format_value(value)}'
+            for labels, value in sorted(self._snapshot().items())
+        ]
+
+
+class Histogram(_Metric):
+    """Histogram bucket tetap; per label disimpan [count per bucket..., +Inf, sum]."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Iterable[float] = METRICS_LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def observe(self, value: float, *labels) -> None:
+        if not METRICS_ENABLED:
+            return
+        shard = self._shard()
+        data = shard.get(labels)
+        if data is None:
+            data = shard[labels] = [0] * (len(self.buckets) + 2)
+        # bisect_left: bucket pertama dengan batas >= value (le inklusif)
+        data[bisect.bisect_left(self.buckets, value)] += 1
+        data[-1] += value
+
+    def time(self, *labels) -> _Timer:
+        """Context manager untuk mengukur durasi blok (detik)."""
+        return _Timer(self, labels)
+
+    def _merge(self, total: dict, shard: dict) -> None:
+        for labels, data in shard.copy().items():
+            current = total.get(labels)
+            if current is None:
+                total[labels] = list(data)
+            else:
+                for i, value in enumerate(data):
+                    current[i] += value
+
+    def render(self) -> List[str]:
+        lines = []
+        bounds = [_format_value(b) for b in self.buckets] + ['+Inf']
+        for labels, data in sorted(self._snapshot().items()):
+            label_dict = self._label_dict(labels)
+            cumulative = 0
+            for bound, count in zip(bounds, data[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_format_labels({**label_dict, "le": bound})} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(label_dict)} {_format_value(data[-1])}')
+            lines.append(f'{self.name}_count{_format_labels(label_dict)} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Kumpulan metric dan collector yang dirender bersama."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Iterable[float] = METRICS_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """Daftarkan fungsi yang mengembalikan family metric saat scrape."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render semua metric ke format teks Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.render())
+
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'ag_http_requests_total', 'HTTP request per route, method, dan status', ('route', 'method', 'status'))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'ag_http_request_duration_seconds', 'Latency HTTP request per route', ('route', 'method'))
+COMMANDS = REGISTRY.counter(
+    'ag_commands_total', 'Command chat per command_type (HTTP dan Unix socket)', ('command_type', 'success'))
+COMMAND_SECONDS = REGISTRY.histogram(
+    'ag_command_duration_seconds', 'Latency pemrosesan command per command_type', ('command_type',))
+DB_OPERATION_SECONDS = REGISTRY.histogram(
+    'ag_db_operation_duration_seconds', 'Durasi operasi SQLite per operasi', ('operation',))
+MONITOR_CACHE = REGISTRY.counter(
+    'ag_monitor_cache_requests_total', 'Lookup cache system monitor (hit/miss) per key', ('key', 'result'))
+COLLECTOR_SECONDS = REGISTRY.histogram(
+    'ag_collector_duration_seconds', 'Durasi sampling collector host (psutil, nvidia-smi)', ('collector',))
+
+
+def register_collector(collector: Callable[[], Iterable[Family]]) -> None:
+    """Daftarkan collector ke registry default."""
+    REGISTRY.register_collector(collector)
+
+
+def timed(histogram: Histogram, *labels):
+    """Decorator: observe durasi fungsi ke histogram dengan label tetap."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(*labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def render() -> str:
+    """Render registry default (body GET /metrics)."""
+    return REGISTRY.render()
@@ -0,0 +1,178 @@
+"""Mirror Selector untuk Agent Pribadi (AG)
+
+Memilih mirror tercepat untuk download tools:
+- Semua mirror di-probe bersamaan dengan ranged request kecil
+  (TOOLS_MIRROR_PROBE_BYTES) untuk mengukur latency dan throughput
+- Skor disimpan per host di SQLite (tabel mirror_scores, EWMA) sehingga
+  run berikutnya tidak perlu probe ulang selama skor masih segar
+- Hasil download sebenarnya (per segment) ikut meng-update skor, dan
+  kegagalan menurunkan peringkat mirror
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from config.settings import (
+    TOOLS_MIRROR_PROBE_BYTES,
+    TOOLS_MIRROR_PROBE_TIMEOUT,
+    TOOLS_MIRROR_SCORE_TTL
+)
+from storage.db import get_db
+
+logger = logging.getLogger(__name__)
+
+# Ukuran referensi untuk estimasi waktu download saat ranking
+_REFERENCE_BYTES = 64 * 1024 * 1024
+
+
+def mirror_host(url: str) -> str:
+    """Key skor mirror: scheme://netloc (dipakai ulang antar versi/tool)."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def estimate_seconds(score: Optional[Dict]) -> float:
+    """Estimasi waktu download file referensi dari skor mirror.
+
+    Mirror tanpa skor atau yang belum pernah berhasil diletakkan paling
+    akhir; rasio kegagalan memperbesar estimasi.
+    """
+    if not score or not score.get('successes') or score.get('throughput', 0) <= 0:
+        return float('inf')
+    seconds = score['latency'] + _REFERENCE_BYTES / score['throughput']
+    attempts = score['successes'] + score['failures']
+    return seconds * (1 + 2 * score['failures'] / attempts)
+
+
+class MirrorSelector:
+    """Ranking mirror berdasarkan throughput/latency terukur."""
+
+    def __init__(self, session: requests.Session, db=None, probe_bytes: int = TOOLS_MIRROR_PROBE_BYTES,
+                 probe_timeout: float = TOOLS_MIRROR_PROBE_TIMEOUT, score_ttl: int = TOOLS_MIRROR_SCORE_TTL):
+        """Inisialisasi selector.
+
+        Args:
+            session: Session HTTP untuk probe
+            db: AgentDatabase untuk skor persisten (default: get_db())
+            probe_bytes: Ukuran ranged request probe
+            probe_timeout: Timeout probe per mirror
+            score_ttl: Umur skor (detik) yang masih dipercaya tanpa probe
+        """
+        self.session = session
+        self._db = db
+        self.probe_bytes = probe_bytes
+        self.probe_timeout = probe_timeout
+        self.score_ttl = score_ttl
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = get_db()
+        return self._db
+
+    def probe(self, url: str) -> Dict:
+        """Ukur latency (time to first byte) dan throughput satu mirror.
+
+        Returns:
+            Dict: {'url', 'ok', 'latency', 'throughput', 'error'}
+        """
+        result = {'url': url, 'ok': False, 'latency': None, 'throughput': None, 'error': None}
+        start = time.perf_counter()
+        try:
+            response = self.session.get(
+                url,
+                headers={'Range': f'bytes=0-{self.probe_bytes - 1}'},
+                stream=True,
+                timeout=self.probe_timeout
+            )
+            with response:
+                response.raise_for_status()
+                received = 0
+                first_byte = None
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    if first_byte is None:
+                        first_byte = time.perf_counter()
+                    received += len(chunk)
+                    if received >= self.probe_bytes:
+                        break
+                    if time.perf_counter() - start > self.probe_timeout:
+                        break
+            end = time.perf_counter()
+
+            if not received:
+                raise IOError("empty response")
+            result['latency'] = round(first_byte - start, 4)
+            transfer = max(end - first_byte, 1e-6)
+            result['throughput'] = received / transfer
+            result['ok'] = True
+        except (requests.RequestException, IOError) as e:
+            result['error'] = str(e)
+
+        self.report(url, result['ok'], throughput=result['throughput'] or 0.0, latency=result['latency'] or 0.0)
+        return result
+
+    def report(self, url: str, ok: bool, throughput: float = 0.0, latency: float = 0.0) -> None:
+        """Catat hasil probe/download ke skor persisten."""
+        try:
+            self.db.record_mirror_result(mirror_host(url), ok, throughput, latency)
+        except Exception as e:
+            logger.warning(f"Cannot record mirror score for {url}: {e}")
+
+    def _fresh(self, score: Optional[Dict]) -> bool:
+        if not score:
+            return False
+        try:
+            updated = datetime.fromisoformat(score['updated_at'])
+        except (KeyError, ValueError):
+            return False
+        return datetime.now() - updated < timedelta(seconds=self.score_ttl)
+
+    def rank(self, urls: List[str], force_probe: bool = False) -> List[str]:
+        """Urutkan mirror dari yang diperkirakan paling cepat.
+
+        Mirror yang belum punya skor segar di-probe bersamaan; sisanya
+        memakai skor tersimpan.
+
+        Args:
+            urls: Kandidat URL (URL utama lebih dulu)
+            force_probe: Probe semua mirror meskipun skor masih segar
+
+        Returns:
+            List[str]: URL terurut (mirror gagal/tanpa skor di akhir)
+        """
+        urls = list(dict.fromkeys(urls))
+        if len(urls) <= 1:
+            return urls
+
+        hosts = [mirror_host(url) for url in urls]
+        scores = self._load_scores(hosts)
+
+        stale = [url for url, host in zip(urls, hosts) if force_probe or not self._fresh(scores.get(host))]
+        if stale:
+            with ThreadPoolExecutor(max_workers=len(stale), thread_name_prefix='ag-mirror-probe') as pool:
+                results = list(pool.map(self.probe, stale))
+            for result in results:
+                if result['ok']:
+                    logger.info(f"Mirror probe {result['url']}: {result['latency'] * 1000:.0f} ms, "
+                                f"{result['throughput'] / (1024 * 1024):.2f} MB/s")
+                else:
+                    logger.warning(f"Mirror probe failed {result['url']}: {result['error']}")
+            scores = self._load_scores(hosts)
+
+        # sorted() stabil: urutan config dipertahankan untuk skor yang sama
+        ranked = sorted(urls, key=lambda url: estimate_seconds(scores.get(mirror_host(url))))
+        logger.info(f"Mirror ranking: {ranked}")
+        return ranked
+
+    def _load_scores(self, hosts: List[str]) -> Dict[str, Dict]:
+        try:
+            return self.db.get_mirror_scores(hosts)
+        except Exception as e:
+            logger.warning(f"Cannot load mirror scores: {e}")
+            return {}
@@ -0,0 +1,264 @@
+"""Profiler On-Demand untuk Agent Pribadi (AG)
+
+Profiling selama N detik lewat POST /api/admin/profile, untuk semua
+thread yang sedang melayani request (HTTP maupun command Unix socket):
+- 'collapsed': thread sampler membaca sys._current_frames() setiap
+  PROFILER_INTERVAL_MS dan menghitung stack dalam format collapsed
+  (`frame;frame;frame count`), siap untuk flamegraph.pl / speedscope
+- 'pstats': cProfile dinyalakan di setiap request selama sesi, hasilnya
+  digabung menjadi satu dump pstats (`python -m pstats`, snakeviz). Di
+  Python 3.12+ hanya satu cProfile boleh aktif per interpreter: region
+  yang berjalan bersamaan dengan region lain tidak bisa diprofile dan
+  dihitung sebagai `skipped` (bukan `matched`)
+- 'text': ringkasan pstats (top fungsi berdasarkan waktu kumulatif)
+
+Dengan command_type hanya command chat dengan tipe tersebut yang masuk
+hasil. Tipe command baru diketahui setelah process_command selesai, jadi
+sample/profil ditampung per thread dan dibuang jika tipenya tidak cocok.
+
+Request ditandai dengan begin()/end(). Saat tidak ada sesi aktif begin()
+hanya mengecek satu variabel global dan end(None) langsung kembali.
+"""
+
+import io
+import os
+import sys
+import time
+import marshal
+import pstats
+import cProfile
+import threading
+import logging
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from config.settings import PROJECT_ROOT, PROFILER_INTERVAL_MS, PROFILER_MAX_SECONDS
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('collapsed', 'pstats', 'text')
+TEXT_TOP_FUNCTIONS = 40
+BUSY_MESSAGE = "Sesi profiling lain sedang berjalan"
+
+_PROJECT_PREFIX = str(PROJECT_ROOT) + os.sep
+
+
+class _Region:
+    """Satu request/command yang sedang diprofile di sebuah thread."""
+
+    __slots__ = ('samples', 'profile')
+
+    def __init__(self):
+        self.samples: Counter = Counter()
+        self.profile: Optional[cProfile.Profile] = None
+
+
+class ProfileSession:
+    """Satu sesi profiling (hanya satu sesi aktif dalam satu waktu)."""
+
+    def __init__(self, mode: str = 'collapsed', command_type: Optional[str] = None,
+                 interval: float = PROFILER_INTERVAL_MS / 1000):
+        self.mode = mode
+        self.command_type = command_type
+        self.interval = interval
+        self.closed = False
+        self.stacks: Counter = Counter()
+        self.stats: Optional[pstats.Stats] = None
+        self.samples = 0
+        self.requests = 0
+        self.matched = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._regions: Dict[int, _Region] = {}
+        self._labels: Dict[object, str] = {}
+
+    def begin(self, kind: str) -> Optional[Tuple['ProfileSession', int]]:
+        # Dengan filter command_type hanya region 'command' yang relevan;
+        # region bersarang (command di dalam request HTTP) ikut region luar
+        if self.command_type and kind != 'command':
+            return None
+        tid = threading.get_ident()
+        region = _Region()
+        with self._lock:
+            if self.closed or tid in self._regions:
+                return None
+            self._regions[tid] = region
+
+        if self.mode != 'collapsed':
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                region.profile = profile
+            except ValueError:
+                # Python 3.12+: hanya satu cProfile aktif per interpreter
+                pass
+        return self, tid
+
+    def end(self, tid: int, command_type: Optional[str] = None) -> None:
+        """Tutup region (dipanggil di thread yang sama dengan begin())."""
+        with self._lock:
+            region = self._regions.pop(tid, None)
+        if region is None:
+            return
+        if region.profile is not None:
+            region.profile.disable()
+
+        matched = self.command_type is None or command_type == self.command_type
+        with self._lock:
+            if self.closed:
+                return
+            self.requests += 1
+            if not matched:
+                return
+            if self.mode != 'collapsed' and region.profile is None:
+                # cProfile tidak bisa dinyalakan (profiler lain sedang aktif)
+                self.skipped += 1
+                return
+            self.matched += 1
+            self.stacks.update(region.samples)
+            if region.profile is not None:
+                if self.stats is None:
+                    self.stats = pstats.Stats(region.profile)
+                else:
+                    self.stats.add(region.profile)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if filename.startswith(_PROJECT_PREFIX):
+                filename = filename[len(_PROJECT_PREFIX):]
+            else:
+                filename = os.path.basename(filename)
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = f"{name} ({filename}:{code.co_firstlineno})".replace(';', ':')
+            self._labels[code] = label
+        return label
+
+    def _collapse(self, frame) -> str:
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return ';'.join(labels)
+
+    def sample(self) -> None:
+        """Ambil satu sample stack dari semua thread yang sedang di region."""
+        frames = sys._current_frames()
+        with self._lock:
+            for tid, region in self._regions.items():
+                frame = frames.get(tid)
+                if frame is not None:
+                    region.samples[self._collapse(frame)] += 1
+                    self.samples += 1
+
+    def run(self, seconds: float) -> None:
+        """Jalankan sesi selama seconds (blocking di thread pemanggil)."""
+        deadline = time.monotonic() + seconds
+        if self.mode == 'collapsed':
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(self.interval, remaining))
+                self.sample()
+        else:
+            time.sleep(seconds)
+
+        # Region yang belum selesai saat sesi berakhir tidak dihitung, tapi
+        # tetap dimatikan end() di thread pemiliknya: disable() dari thread
+        # lain tidak melepas hook profiler thread tersebut
+        with self._lock:
+            self.closed = True
+
+    def render_collapsed(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def render_pstats(self) -> bytes:
+        """Format file yang sama dengan pstats.Stats.dump_stats()."""
+        return marshal.dumps(self.stats.stats if self.stats is not None else {})
+
+    def render_text(self) -> str:
+        skipped = ''
+        if self.skipped:
+            skipped = f"{self.skipped} request tidak diprofile (bersamaan dengan request lain).\n"
+        if self.stats is None:
+            return "Tidak ada request yang diprofile.\n" + skipped
+        output = io.StringIO(skipped)
+        output.seek(0, io.SEEK_END)
+        self.stats.stream = output
+        self.stats.sort_stats('cumulative').print_stats(TEXT_TOP_FUNCTIONS)
+        return output.getvalue()
+
+
+# Sesi aktif (None = profiler mati, jalur request hanya mengecek ini)
+_session: Optional[ProfileSession] = None
+_session_lock = threading.Lock()
+
+
+def begin(kind: str = 'request') -> Optional[Tuple[ProfileSession, int]]:
+    """Tandai awal request/command di thread ini.
+
+    Args:
+        kind: 'request' (HTTP) atau 'command' (handle_chat)
+
+    Returns:
+        Token untuk end(), atau None jika tidak ada sesi aktif
+    """
+    session = _session
+    if session is None:
+        return None
+    return session.begin(kind)
+
+
+def end(token: Optional[Tuple[ProfileSession, int]], command_type: Optional[str] = None) -> None:
+    """Tandai akhir region dari begin().
+
+    Args:
+        token: Hasil begin()
+        command_type: Tipe command (untuk filter command_type sesi)
+    """
+    if token is None:
+        return
+    session, tid = token
+    session.end(tid, command_type)
+
+
+def profile(seconds: float, mode: str = 'collapsed', command_type: Optional[str] = None,
+            interval_ms: Optional[float] = None) -> Tuple[bool, object]:
+    """Jalankan sesi profiling dan kembalikan hasilnya.
+
+    Args:
+        seconds: Durasi sesi (dibatasi PROFILER_MAX_SECONDS)
+        mode: 'collapsed', 'pstats', atau 'text'
+        command_type: Hanya profile command chat dengan tipe ini
+        interval_ms: Interval sampling mode collapsed
+
+    Returns:
+        Tuple[bool, object]: (True, ProfileSession) atau (False, pesan error)
+    """
+    global _session
+
+    if mode not in FORMATS:
+        return False, f"Format tidak dikenal: {mode} (pilihan: {', '.join(FORMATS)})"
+    if not 0 < seconds <= PROFILER_MAX_SECONDS:
+        return False, f"Durasi harus antara 0 dan {PROFILER_MAX_SECONDS} detik"
+
+    interval = (interval_ms or PROFILER_INTERVAL_MS) / 1000
+    session = ProfileSession(mode, command_type or None, max(interval, 0.001))
+    with _session_lock:
+        if _session is not None:
+            return False, BUSY_MESSAGE
+        _session = session
+
+    logger.info(f"Profiling {seconds}s (mode: {mode}, command_type: {command_type or '*'})")
+    try:
+        session.run(seconds)
+    finally:
+        with _session_lock:
+            _session = None
+
+    logger.info(f"Profiling selesai: {session.matched}/{session.requests} request, "
+                f"{session.skipped} skipped, {session.samples} sample")
+    return True, session
@@ -0,0 +1,197 @@
+"""Single-Flight untuk Agent Pribadi (AG)
+
+Menggabungkan (coalesce) eksekusi yang identik dan berjalan bersamaan:
+jika dua client mengirim "setup node 22.14.0" pada saat yang sama, hanya
+satu eksekusi yang berjalan dan semua pemanggil menerima hasil yang sama.
+"""
+
+import copy
+import threading
+import logging
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.settings import COALESCED_COMMANDS
+from core.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """Satu eksekusi yang sedang berjalan (in-flight)."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalescing layer berbasis key.
+
+    Pemanggil pertama untuk sebuah key menjadi "leader" dan mengeksekusi
+    fungsi; pemanggil lain dengan key yang sama menunggu dan menerima hasil
+    (atau exception) yang sama.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, group: str, field: str) -> None:
+        """Increment counter (harus dipanggil saat memegang lock)."""
+        stats = self._stats.setdefault(group, {'executions': 0, 'coalesced': 0})
+        stats[field] += 1
+
+    def begin(self, key: str, group: Optional[str] = None) -> Tuple[_Call, bool]:
+        """Daftarkan eksekusi key yang hasilnya dilaporkan lewat finish().
+
+        Untuk eksekusi yang berpindah thread (batch install: fase network
+        lalu fase CPU di pool berbeda) sehingga tidak bisa dibungkus satu
+        fungsi seperti do().
+
+        Args:
+            key: Key normalisasi
+            group: Nama grup untuk counter (default: prefix key sebelum ':')
+
+        Returns:
+            Tuple[_Call, bool]: (call, leader) - leader wajib memanggil
+            finish(key, call, ...); selain leader menunggu dengan wait(call)
+        """
+        group = group or key.split(':', 1)[0]
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._count(group, 'coalesced')
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            self._count(group, 'executions')
+            return call, True
+
+    def finish(self, key: str, call: _Call, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """Selesaikan eksekusi leader dan bangunkan semua yang menunggu."""
+        call.result = result
+        call.error = error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.done.set()
+
+    @staticmethod
+    def wait(call: _Call) -> Any:
+        """Tunggu hasil leader (exception leader ikut di-raise)."""
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key: str, fn: Callable[[], Any], group: Optional[str] = None) -> Tuple[Any, bool]:
+        """Jalankan fn sekali untuk semua pemanggil bersamaan dengan key sama.
+
+        Args:
+            key: Key normalisasi (misal "tool_setup:node:22.14.0")
+            fn: Fungsi tanpa argumen yang akan dieksekusi
+            group: Nama grup untuk counter (default: prefix key sebelum ':')
+
+        Returns:
+            Tuple[Any, bool]: (result, shared) - shared True jika hasil
+            berasal dari eksekusi pemanggil lain
+        """
+        call, leader = self.begin(key, group)
+
+        if not leader:
+            logger.debug("Coalesced call for key: %s", key)
+            return self.wait(call), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result)
+        return result, False
+
+    def in_flight(self) -> int:
+        """Jumlah key yang sedang dieksekusi."""
+        with self._lock:
+            return len(self._calls)
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Counter per grup: {group: {'executions': int, 'coalesced': int}}."""
+        with self._lock:
+            return {group: dict(stats) for group, stats in self._stats.items()}
+
+
+# Singleton instance
+_single_flight_instance = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Get singleton instance of SingleFlight.
+
+    Returns:
+        SingleFlight: Instance
+    """
+    global _single_flight_instance
+    if _single_flight_instance is None:
+        with _single_flight_lock:
+            if _single_flight_instance is None:
+                _single_flight_instance = SingleFlight()
+    return _single_flight_instance
+
+
+def _collect_metrics():
+    """Counter coalescing per grup untuk /metrics."""
+    single_flight = get_single_flight()
+    samples = []
+    for group, stats in sorted(single_flight.get_stats().items()):
+        samples.append(({'group': group, 'result': 'executed'}, stats['executions']))
+        samples.append(({'group': group, 'result': 'coalesced'}, stats['coalesced']))
+    return [
+        ('ag_coalescing_calls_total', 'counter', 'Pemanggilan single-flight per grup (executed/coalesced)', samples),
+        ('ag_coalescing_in_flight', 'gauge', 'Key yang sedang dieksekusi', [({}, single_flight.in_flight())])
+    ]
+
+
+register_collector(_collect_metrics)
+
+
+def coalesce(group: str, key_func: Optional[Callable[..., str]] = None):
+    """Decorator opt-in untuk coalescing sebuah handler.
+
+    Args:
+        group: Nama grup/command (juga dipakai sebagai prefix key)
+        key_func: Fungsi yang menerima argumen handler dan mengembalikan
+            key normalisasi. Default: gabungan argumen posisi.
+
+    Coalescing hanya aktif jika group terdaftar di COALESCED_COMMANDS.
+    Hasil dict disalin (shallow copy) untuk pemanggil yang ikut menumpang
+    agar modifikasi oleh caller (misal menambah 'timestamp') tidak saling
+    mempengaruhi.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if group not in COALESCED_COMMANDS:
+                return func(*args, **kwargs)
+
+            if key_func is not None:
+                suffix = key_func(*args, **kwargs)
+            else:
+                suffix = ' '.join(str(a) for a in args)
+            key = f"{group}:{suffix}"
+
+            result, shared = get_single_flight().do(
+                key, lambda: func(*args, **kwargs), group=group
+            )
+            if isinstance(result, (dict, list)):
+                return copy.copy(result)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,226 @@
+"""Unix Socket Server untuk Agent Pribadi (AG)
+
+Jalur cepat untuk CLI lokal (`ag`): selain HTTP, service mendengarkan di
+Unix domain socket (SOCKET_PATH) dengan protokol frame ringkas:
+
+    [4 byte panjang payload, big-endian][payload JSON UTF-8]
+
+Satu koneksi boleh mengirim banyak frame request secara berurutan; setiap
+request dibalas tepat satu frame response. Request:
+
+    {"op": "chat", "message": "cek ram"}  -> hasil handle_chat()
+    {"op": "chat", ..., "timing": true}   -> plus field timing (span trace)
+
+Field opsional "request_id" dipakai sebagai request_id di log (default: id baru).
+    {"op": "ping"}                        -> {"success": true, "message": "pong"}
+    {"op": "complete"}                    -> kandidat completion REPL
+
+Dengan `"reply": "text"` response berupa teks UTF-8 `<status>\n<message>`
+(status 0 = sukses, 1 = gagal) agar client CLI tidak perlu decode JSON.
+
+Socket dibuat dengan permission 0600 (hanya user pemilik service).
+"""
+
+import os
+import json
+import errno
+import socket
+import struct
+import socketserver
+import threading
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from config.settings import SOCKET_PATH, SOCKET_MAX_FRAME
+from core.log_pipeline import set_request_id, reset_request_id
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct('>I')
+
+
+class FrameError(Exception):
+    """Frame tidak valid (terlalu besar atau koneksi terputus di tengah frame)."""
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Baca tepat size bytes. None jika koneksi ditutup sebelum byte pertama."""
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            if not buf:
+                return None
+            raise FrameError("connection closed mid-frame")
+        buf += chunk
+    return bytes(buf)
+
+
+def read_frame(sock: socket.socket, max_size: int = SOCKET_MAX_FRAME) -> Optional[Dict]:
+    """Baca satu frame JSON. None jika peer menutup koneksi."""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > max_size:
+        raise FrameError(f"frame too large ({size} bytes)")
+    payload = _recv_exact(sock, size) if size else b''
+    if payload is None:
+        raise FrameError("connection closed mid-frame")
+    return json.loads(payload)
+
+
+def write_frame(sock: socket.socket, message: Dict, text: bool = False) -> None:
+    """Kirim satu frame (header dan payload dalam satu sendall).
+
+    Args:
+        sock: Socket tujuan
+        message: Response dict
+        text: Kirim sebagai `<status>\n<message>` alih-alih JSON
+    """
+    if text:
+        body = message.get('message')
+        ok = bool(body) and message.get('success') is not False
+        if not body:
+            body = f"Raw Response: {json.dumps(message, indent=2, ensure_ascii=False)}"
+        payload = f"{0 if ok else 1}\n{body}".encode('utf-8')
+    else:
+        payload = json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _op_chat(request: Dict) -> Dict:
+    from core.chat_handler import handle_chat
+
+    message = request.get('message')
+    if not isinstance(message, str) or not message.strip():
+        return {'success': False, 'message': 'Invalid request. Field "message" required.'}
+    return handle_chat(message, timing=bool(request.get('timing')))
+
+
+def _op_ping(request: Dict) -> Dict:
+    return {'success': True, 'message': 'pong'}
+
+
+def _op_complete(request: Dict) -> Dict:
+    from core.chat_handler import get_completions
+
+    return {'success': True, 'message': 'ok', 'data': get_completions()}
+
+
+# Operasi yang bisa dipanggil lewat socket (op -> handler)
+OPERATIONS: Dict[str, Callable[[Dict], Dict]] = {
+    'chat': _op_chat,
+    'ping': _op_ping,
+    'complete': _op_complete
+}
+
+
+class _FrameHandler(socketserver.BaseRequestHandler):
+    """Satu thread per koneksi: loop request/response sampai client menutup."""
+
+    def handle(self):
+        sock = self.request
+        while True:
+            try:
+                request = read_frame(sock)
+            except (FrameError, ValueError, OSError) as e:
+                logger.warning("Socket client error: %s", e)
+                return
+            if request is None:
+                return
+
+            if not isinstance(request, dict):
+                request = {'op': None}
+            handler = OPERATIONS.get(request.get('op', 'chat'))
+            if handler is None:
+                response = {'success': False, 'message': f"Unknown op: {request.get('op')}"}
+            else:
+                token = set_request_id(request.get('request_id'))
+                try:
+                    response = handler(request)
+                except Exception as e:
+                    logger.error("Error processing socket request: %s", e, exc_info=True)
+                    response = {'success': False, 'message': f'Internal server error: {e}'}
+                finally:
+                    reset_request_id(token)
+
+            try:
+                write_frame(sock, response, text=request.get('reply') == 'text')
+            except OSError:
+                return
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class AgentSocketServer:
+    """Unix domain socket server yang berjalan di background thread."""
+
+    def __init__(self, path: Path = SOCKET_PATH):
+        """Inisialisasi server.
+
+        Args:
+            path: Path socket file
+        """
+        self.path = Path(path)
+        self._server: Optional[_ThreadingUnixServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _clear_stale(self) -> bool:
+        """Hapus socket file sisa proses mati. False jika server lain masih aktif."""
+        if not os.path.lexists(self.path):
+            return True
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.path))
+            return False
+        except OSError as e:
+            if e.errno not in (errno.ECONNREFUSED, errno.ENOENT, errno.ENOTSOCK):
+                raise
+        finally:
+            probe.close()
+        os.unlink(self.path)
+        return True
+
+    def start(self) -> bool:
+        """Bind socket dan mulai melayani di background.
+
+        Returns:
+            bool: False jika platform tidak mendukung atau socket dipakai proses lain
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            logger.info("Unix sockets not supported on this platform")
+            return False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if not self._clear_stale():
+                logger.warning(f"Socket {self.path} already served by another process")
+                return False
+            old_umask = os.umask(0o177)
+            try:
+                self._server = _ThreadingUnixServer(str(self.path), _FrameHandler)
+            finally:
+                os.umask(old_umask)
+        except OSError as e:
+            logger.error(f"Cannot start socket server on {self.path}: {e}")
+            return False
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name='ag-socket', daemon=True)
+        self._thread.start()
+        logger.info(f"Socket server listening on {self.path}")
+        return True
+
+    def stop(self) -> None:
+        """Hentikan server dan hapus socket file."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
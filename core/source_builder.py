@@ -0,0 +1,327 @@
+"""Source Builder untuk Agent Pribadi (AG)
+
+Build stage untuk tools berupa source tarball (nginx, apache, php,
+postgresql): `./configure --prefix=<target>` -> `make -j<jobs>` ->
+`make install DESTDIR=<staging>`.
+
+- ccache dipakai otomatis jika terinstall (TOOLS_BUILD_CCACHE)
+- Hasil install di-cache di bin/.builds/cache/<key> dengan key
+  sha256(source archive, flag configure, prefix, toolchain). Build ulang
+  konfigurasi yang sama cukup copy tree dari cache. Cache dan instalasi
+  tidak berbagi inode: edit in-place di instalasi tidak mengubah cache, dan
+  st_nlink object dedup (bin/.objects) hanya menghitung instalasi. Cache
+  dibatasi TOOLS_BUILD_CACHE_MAX_BYTES (entry paling lama tidak dipakai
+  dihapus)
+- Setiap langkah build dibatasi TOOLS_BUILD_TIMEOUT (watchdog membunuh
+  process group, juga saat build tidak mengeluarkan output)
+- Output build di-stream per baris ke callback (status job) dan ke
+  bin/.builds/logs/<tool>-<version>.log
+"""
+
+import os
+import json
+import time
+import shutil
+import signal
+import hashlib
+import platform
+import threading
+import subprocess
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from config.settings import (
+    TOOLS_BUILD_DIR,
+    TOOLS_BUILD_CACHE_MAX_BYTES,
+    TOOLS_BUILD_JOBS,
+    TOOLS_BUILD_CONCURRENCY,
+    TOOLS_BUILD_CCACHE,
+    TOOLS_BUILD_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+LogCallback = Callable[[str], None]
+
+
+class BuildError(Exception):
+    """Build gagal (configure/make/make install exit code != 0)."""
+
+
+def _first_line(cmd: List[str]) -> str:
+    """Baris pertama output command (untuk identitas toolchain)."""
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        return (result.stdout or result.stderr).splitlines()[0].strip()
+    except (OSError, IndexError, subprocess.SubprocessError):
+        return 'missing'
+
+
+def _tree_size(path: Path) -> int:
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+class SourceBuilder:
+    """Build source tarball dengan build cache."""
+
+    def __init__(self, build_dir: Path = TOOLS_BUILD_DIR, jobs: int = TOOLS_BUILD_JOBS,
+                 concurrency: int = TOOLS_BUILD_CONCURRENCY, use_ccache: bool = TOOLS_BUILD_CCACHE,
+                 max_cache_bytes: int = TOOLS_BUILD_CACHE_MAX_BYTES, timeout: float = TOOLS_BUILD_TIMEOUT):
+        """Inisialisasi builder.
+
+        Args:
+            build_dir: Root build cache dan log
+            jobs: Jumlah job make paralel (-j)
+            concurrency: Jumlah build yang boleh berjalan bersamaan
+            use_ccache: Pakai ccache jika tersedia
+            max_cache_bytes: Budget ukuran build cache (0 = tanpa batas)
+            timeout: Batas waktu per langkah build (detik)
+        """
+        self.build_dir = build_dir
+        self.max_cache_bytes = max_cache_bytes
+        self.timeout = timeout
+        self.jobs = max(1, jobs)
+        self.ccache = shutil.which('ccache') if use_ccache else None
+        self._slots = threading.Semaphore(max(1, concurrency))
+        self._lock = threading.Lock()
+        self._toolchain: Optional[str] = None
+        self._stats = {'builds': 0, 'cache_hits': 0, 'failures': 0, 'build_seconds': 0.0, 'evictions': 0}
+
+    @property
+    def cache_dir(self) -> Path:
+        return self.build_dir / 'cache'
+
+    @property
+    def log_dir(self) -> Path:
+        return self.build_dir / 'logs'
+
+    def toolchain_id(self) -> str:
+        """Identitas toolchain (compiler, make, arsitektur) untuk key cache."""
+        if self._toolchain is None:
+            self._toolchain = ' | '.join([
+                _first_line(['cc', '--version']),
+                _first_line(['make', '--version']),
+                platform.machine()
+            ])
+        return self._toolchain
+
+    def cache_key(self, source_sha256: str, flags: List[str], prefix: Path) -> str:
+        """Key build cache: (source hash, flag configure, prefix, toolchain)."""
+        payload = json.dumps([source_sha256, list(flags), str(prefix), self.toolchain_id()])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _env(self) -> Dict[str, str]:
+        env = dict(os.environ)
+        if self.ccache:
+            env.setdefault('CC', f"{self.ccache} {env.get('CC', 'cc')}")
+            env.setdefault('CXX', f"{self.ccache} {env.get('CXX', 'c++')}")
+        return env
+
+    def _run(self, cmd: List[str], cwd: Path, env: Dict[str, str], log_file, on_log: Optional[LogCallback]) -> None:
+        """Jalankan satu langkah build, stream output per baris.
+
+        Watchdog membunuh seluruh process group (make dan turunannya) setelah
+        self.timeout detik, jadi build yang macet tanpa output tetap berhenti.
+        """
+        header = f"$ {' '.join(cmd)}"
+        log_file.write(header + '\n')
+        if on_log:
+            on_log(header)
+
+        proc = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors='replace',
+            bufsize=1,
+            start_new_session=True
+        )
+        timed_out = threading.Event()
+
+        def kill() -> None:
+            timed_out.set()
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+        watchdog = threading.Timer(self.timeout, kill)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            for line in proc.stdout:
+                log_file.write(line)
+                if on_log:
+                    on_log(line.rstrip('\n'))
+        finally:
+            proc.stdout.close()
+            returncode = proc.wait()
+            watchdog.cancel()
+
+        if timed_out.is_set():
+            raise BuildError(f"Timeout after {self.timeout:g}s: {' '.join(cmd)}")
+        if returncode != 0:
+            raise BuildError(f"'{' '.join(cmd)}' exited with code {returncode}")
+
+    def build(self, tool: str, version: str, source_dir: Path, prefix: Path, staging_dir: Path,
+              flags: List[str], source_sha256: Optional[str] = None,
+              on_log: Optional[LogCallback] = None) -> Dict:
+        """Build source_dir dan install hasilnya ke staging_dir.
+
+        Args:
+            tool: Nama tool
+            version: Versi tool
+            source_dir: Directory source hasil ekstraksi
+            prefix: Prefix install final (bin/<tool>/<version>)
+            staging_dir: Directory kosong untuk hasil install (publish atomik)
+            flags: Flag tambahan untuk ./configure
+            source_sha256: Digest archive sumber (None = tanpa build cache)
+            on_log: Callback per baris output build
+
+        Returns:
+            Dict: {'cache_hit', 'seconds', 'key', 'log'}
+
+        Raises:
+            BuildError: Jika salah satu langkah build gagal
+        """
+        start = time.perf_counter()
+        key = self.cache_key(source_sha256, flags, prefix) if source_sha256 else None
+        cached = self.cache_dir / key if key else None
+
+        if cached is not None and self._checkout(cached, staging_dir):
+            seconds = round(time.perf_counter() - start, 3)
+            with self._lock:
+                self._stats['cache_hits'] += 1
+            if on_log:
+                on_log(f"Build cache hit ({key[:12]})")
+            logger.info(f"Build cache hit for {tool} {version} ({key[:12]})")
+            return {'cache_hit': True, 'seconds': seconds, 'key': key, 'log': None}
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        log_path = self.log_dir / f"{tool}-{version}.log"
+        env = self._env()
+        destdir = staging_dir / '.destdir'
+
+        try:
+            with self._slots, open(log_path, 'w') as log_file:
+                log_file.write(f"# {tool} {version} | toolchain: {self.toolchain_id()} | ccache: {bool(self.ccache)}\n")
+                if (source_dir / 'configure').exists():
+                    self._run(['./configure', f'--prefix={prefix}', *flags], source_dir, env, log_file, on_log)
+                elif not (source_dir / 'Makefile').exists():
+                    raise BuildError("No configure script or Makefile in source tree")
+                self._run(['make', f'-j{self.jobs}'], source_dir, env, log_file, on_log)
+                self._run(['make', 'install', f'DESTDIR={destdir}'], source_dir, env, log_file, on_log)
+        except Exception:
+            with self._lock:
+                self._stats['failures'] += 1
+            raise
+
+        # make install DESTDIR=X menulis ke X/<prefix absolut>
+        installed = destdir / prefix.relative_to(prefix.anchor)
+        if not installed.is_dir():
+            raise BuildError(f"make install did not create {prefix}")
+        for item in installed.iterdir():
+            os.rename(item, staging_dir / item.name)
+        shutil.rmtree(destdir)
+
+        if cached is not None:
+            self._store(staging_dir, cached)
+
+        seconds = round(time.perf_counter() - start, 3)
+        with self._lock:
+            self._stats['builds'] += 1
+            self._stats['build_seconds'] = round(self._stats['build_seconds'] + seconds, 3)
+        logger.info(f"Built {tool} {version} in {seconds}s (jobs={self.jobs}, ccache={bool(self.ccache)})")
+        return {'cache_hit': False, 'seconds': seconds, 'key': key, 'log': str(log_path)}
+
+    def _checkout(self, cached: Path, staging_dir: Path) -> bool:
+        """Salin tree dari cache ke staging_dir (tanpa compile).
+
+        Returns:
+            bool: False jika entry tidak ada atau hilang saat disalin (evict)
+        """
+        if not cached.is_dir():
+            return False
+        try:
+            shutil.copytree(cached, staging_dir, symlinks=True, dirs_exist_ok=True)
+        except (OSError, shutil.Error) as e:
+            logger.warning(f"Build cache {cached.name[:12]} unusable, rebuilding: {e}")
+            for item in staging_dir.iterdir():
+                if item.is_dir() and not item.is_symlink():
+                    shutil.rmtree(item, ignore_errors=True)
+                else:
+                    item.unlink(missing_ok=True)
+            return False
+        # mtime directory entry = terakhir dipakai (urutan LRU)
+        try:
+            os.utime(cached)
+        except OSError:
+            pass
+        return True
+
+    def _store(self, staging_dir: Path, cached: Path) -> None:
+        """Simpan copy hasil build ke cache (publish dengan rename), lalu evict."""
+        tmp = cached.with_name(f".tmp-{cached.name}-{os.getpid()}")
+        try:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copytree(staging_dir, tmp, symlinks=True)
+            os.rename(tmp, cached)
+        except OSError as e:
+            logger.warning(f"Cannot store build cache {cached.name[:12]}: {e}")
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self._evict(keep=cached.name)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Hapus entry cache paling lama tidak dipakai sampai total <= budget."""
+        if not self.max_cache_bytes:
+            return
+
+        entries = []
+        for entry in self.cache_dir.iterdir():
+            if entry.name.startswith('.') or not entry.is_dir():
+                continue
+            try:
+                entries.append((entry.stat().st_mtime, entry, _tree_size(entry)))
+            except OSError:
+                continue
+        total = sum(size for _, _, size in entries)
+
+        for _, entry, size in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_cache_bytes:
+                break
+            if entry.name == keep:
+                continue
+            # Rename dulu: build lain tidak lagi melihat entry setengah terhapus
+            trash = entry.with_name(f".evict-{entry.name}-{os.getpid()}")
+            try:
+                os.rename(entry, trash)
+            except OSError:
+                continue
+            shutil.rmtree(trash, ignore_errors=True)
+            total -= size
+            with self._lock:
+                self._stats['evictions'] += 1
+            logger.info(f"Evicted build cache {entry.name[:12]} ({size} bytes)")
+
+    def get_stats(self) -> Dict:
+        """Statistik build: jumlah build, cache hit rate, total waktu build."""
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats['builds'] + stats['cache_hits']
+        stats['hit_rate'] = round(stats['cache_hits'] / total, 3) if total else 0.0
+        stats['jobs'] = self.jobs
+        stats['ccache'] = bool(self.ccache)
+        stats['cache_max_bytes'] = self.max_cache_bytes
+        return stats
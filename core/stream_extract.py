@@ -0,0 +1,159 @@
+"""Streaming Extract untuk Agent Pribadi (AG)
+
+Pipeline download-to-extract: HTTP response langsung diumpankan ke
+`tarfile` stream mode (lewat core.decompress) sehingga ekstraksi berjalan
+bersamaan dengan download, tanpa file archive perantara di `bin/.downloads`.
+Bytes yang lewat bisa di-hash dan (opsional) di-tee ke file untuk archive
+cache.
+
+Dengan ChunkPipe, thread network hanya menerima bytes dan ekstraksi
+berjalan di thread lain (CPU pool batch install).
+"""
+
+import io
+import queue
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from core.decompress import extract_tar
+
+logger = logging.getLogger(__name__)
+
+# Archive yang bisa di-stream (zip butuh seek ke central directory di akhir file)
+STREAMABLE_SUFFIXES = ('.tar.gz', '.tgz', '.tar.xz', '.txz', '.tar.bz2', '.tar.zst', '.tar')
+
+# Chunk (TOOLS_DOWNLOAD_CHUNK_SIZE) yang boleh menunggu di ChunkPipe
+PIPE_MAX_CHUNKS = 16
+
+_PIPE_END = object()
+
+
+def is_streamable(url: str) -> bool:
+    """Cek apakah archive di URL bisa diekstrak secara streaming."""
+    return url.lower().endswith(STREAMABLE_SUFFIXES)
+
+
+class ChunkPipe:
+    """Queue chunk berbatas dari thread network (feed) ke thread ekstraksi.
+
+    Consumer mengiterasi pipe seperti iterator chunk biasa. Error di sisi
+    network diteruskan ke consumer; jika consumer berhenti lebih dulu
+    (close()), feed() berhenti membaca response.
+    """
+
+    def __init__(self, max_chunks: int = PIPE_MAX_CHUNKS):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self._closed = threading.Event()
+
+    def _put(self, item) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def feed(self, chunks: Iterable[bytes]) -> None:
+        """Pindahkan semua chunk ke pipe (dipanggil di thread network)."""
+        try:
+            for chunk in chunks:
+                if not self._put(chunk):
+                    return
+        except Exception as e:
+            self._put(e)
+            return
+        self._put(_PIPE_END)
+
+    def close(self) -> None:
+        """Tandai consumer selesai (dipanggil di thread ekstraksi)."""
+        self._closed.set()
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            item = self._queue.get()
+            if item is _PIPE_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+class TeeReader(io.RawIOBase):
+    """File-like read-only di atas iterator chunk.
+
+    Setiap chunk yang dibaca di-update ke hasher dan ditulis ke tee file
+    (jika ada), jadi satu aliran bytes melayani ekstraksi, checksum dan
+    cache sekaligus.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], hasher=None, tee=None):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+        self.hasher = hasher
+        self.tee = tee
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _next_chunk(self) -> bytes:
+        for chunk in self._chunks:
+            if chunk:
+                if self.hasher is not None:
+                    self.hasher.update(chunk)
+                if self.tee is not None:
+                    self.tee.write(chunk)
+                self.bytes_read += len(chunk)
+                return chunk
+        return b''
+
+    def readinto(self, b) -> int:
+        if not self._buffer:
+            self._buffer = self._next_chunk()
+            if not self._buffer:
+                return 0
+
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def drain(self) -> None:
+        """Baca sisa stream (padding tar) agar hash dan tee lengkap."""
+        self._buffer = b''
+        while self._next_chunk():
+            pass
+
+
+def stream_extract(chunks: Iterable[bytes], dest_dir: Path, hasher=None, tee_path: Optional[Path] = None) -> int:
+    """Ekstrak tar stream ke dest_dir sambil menerima bytes.
+
+    Args:
+        chunks: Iterator bytes (misal response.iter_content())
+        dest_dir: Directory tujuan ekstraksi
+        hasher: Objek hashlib opsional untuk checksum archive
+        tee_path: Path opsional untuk menyimpan salinan archive (cache)
+
+    Returns:
+        int: Jumlah bytes archive yang diterima
+    """
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    tee = open(tee_path, 'wb') if tee_path is not None else None
+
+    try:
+        reader = TeeReader(chunks, hasher=hasher, tee=tee)
+        stream = io.BufferedReader(reader, buffer_size=1024 * 1024)
+
+        # Dekompresi lewat backend multi-thread jika tersedia (tar stream mode)
+        extract_tar(stream, dest_dir)
+
+        reader.drain()
+        logger.info(f"Stream-extracted {reader.bytes_read // (1024 * 1024)} MB to {dest_dir}")
+        return reader.bytes_read
+
+    finally:
+        if tee is not None:
+            tee.close()
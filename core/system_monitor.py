@@ -5,18 +5,31 @@ Mengumpulkan data real-time dari sistem operasi:
 - CPU (psutil)
 - GPU (nvidia-smi)
 - Temperature (sensors/nvidia-smi)
+
+Hit/miss cache dan durasi sampling dicatat ke core.metrics (dan sebagai
+span/atribut di trace command yang aktif, lihat core.tracing); sample
+terakhir diekspor sebagai gauge host di /metrics tanpa memicu sampling
+baru (kecuali RAM yang murah).
 """
 
+import os
 import psutil
 import subprocess
 import platform
-from typing import Dict, Union
+from typing import Dict, Optional, Union
 from datetime import datetime, timedelta
 from config.settings import MONITOR_CACHE_SECONDS, GPU_ENABLED
+from core.single_flight import coalesce
+from core.metrics import MONITOR_CACHE, COLLECTOR_SECONDS, register_collector
+from core import tracing
 
 # Cache untuk menghindari overhead monitoring yang terlalu sering
 _cache = {}
 _cache_timestamp = {}
+# Versi per key: naik hanya jika hasil sampling berbeda dari sebelumnya
+_cache_version = {}
+# Prefix versi snapshot unik per proses (counter mulai dari 0 setelah restart)
+_SNAPSHOT_PREFIX = os.urandom(4).hex()
 
 
 def _is_cache_valid(key: str) -> bool:
@@ -28,11 +41,14 @@ def _is_cache_valid(key: str) -> bool:
     Returns:
         bool: True jika cache masih valid
     """
-    if key not in _cache_timestamp:
-        return False
+    valid = False
+    if key in _cache_timestamp:
+        elapsed = (datetime.now() - _cache_timestamp[key]).total_seconds()
+        valid = elapsed < MONITOR_CACHE_SECONDS
     
-    elapsed = (datetime.now() - _cache_timestamp[key]).total_seconds()
-    return elapsed < MONITOR_CACHE_SECONDS
+    MONITOR_CACHE.inc(key, 'hit' if valid else 'miss')
+    tracing.set_attribute('cache', 'hit' if valid else 'miss')
+    return valid
 
 
 def _set_cache(key: str, value: any) -> None:
@@ -42,10 +58,32 @@ def _set_cache(key: str, value: any) -> None:
         key: Key cache
         value: Nilai yang akan di-cache
     """
+    if _cache.get(key) != value:
+        _cache_version[key] = _cache_version.get(key, 0) + 1
     _cache[key] = value
     _cache_timestamp[key] = datetime.now()
 
 
+def get_snapshot_version() -> Optional[str]:
+    """Versi snapshot status (RAM/CPU/GPU) yang sedang di cache.
+    
+    Dipakai sebagai ETag /api/status: versi sama berarti data sama, dan
+    bisa dicek tanpa sampling ulang.
+    
+    Returns:
+        Optional[str]: Versi gabungan, atau None jika ada sample yang sudah
+        kedaluwarsa (pemanggilan status berikutnya akan sampling ulang)
+    """
+    keys = ['ram_status', 'cpu_status'] + (['gpu_status'] if GPU_ENABLED else [])
+    now = datetime.now()
+    for key in keys:
+        timestamp = _cache_timestamp.get(key)
+        if timestamp is None or (now - timestamp).total_seconds() >= MONITOR_CACHE_SECONDS:
+            return None
+    return _SNAPSHOT_PREFIX + '-' + '-'.join(str(_cache_version[key]) for key in keys)
+
+
+@tracing.traced('system_monitor.ram')
 def get_ram_status() -> Dict[str, Union[float, str]]:
     """Mengambil status RAM sistem saat ini.
     
@@ -63,7 +101,8 @@ def get_ram_status() -> Dict[str, Union[float, str]]:
         return _cache[cache_key]
     
     try:
-        mem = psutil.virtual_memory()
+        with COLLECTOR_SECONDS.time('psutil_ram'), tracing.span('collector.psutil_ram'):
+            mem = psutil.virtual_memory()
         result = {
             'total_gb': round(mem.total / (1024**3), 2),
             'used_gb': round(mem.used / (1024**3), 2),
@@ -83,6 +122,7 @@ def get_ram_status() -> Dict[str, Union[float, str]]:
         }
 
 
+@tracing.traced('system_monitor.cpu')
 def get_cpu_status() -> Dict[str, Union[float, int, str]]:
     """Mengambil status CPU sistem saat ini.
     
@@ -100,8 +140,9 @@ def get_cpu_status() -> Dict[str, Union[float, int, str]]:
         return _cache[cache_key]
     
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        cpu_freq = psutil.cpu_freq()
+        with COLLECTOR_SECONDS.time('psutil_cpu'), tracing.span('collector.psutil_cpu'):
+            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_freq = psutil.cpu_freq()
         
         result = {
             'percent': round(cpu_percent, 1),
@@ -122,6 +163,7 @@ def get_cpu_status() -> Dict[str, Union[float, int, str]]:
         }
 
 
+@tracing.traced('system_monitor.gpu')
 def get_gpu_status() -> Dict[str, Union[float, str]]:
     """Mengambil status GPU menggunakan nvidia-smi.
     
@@ -135,10 +177,6 @@ def get_gpu_status() -> Dict[str, Union[float, str]]:
             'status': str
         }
     """
-    cache_key = 'gpu_status'
-    if _is_cache_valid(cache_key):
-        return _cache[cache_key]
-    
     if not GPU_ENABLED:
         return {
             'name': 'N/A',
@@ -149,6 +187,10 @@ def get_gpu_status() -> Dict[str, Union[float, str]]:
             'status': 'disabled'
         }
     
+    cache_key = 'gpu_status'
+    if _is_cache_valid(cache_key):
+        return _cache[cache_key]
+    
     try:
         # Query nvidia-smi untuk data GPU
         cmd = [
@@ -157,11 +199,12 @@ def get_gpu_status() -> Dict[str, Union[float, str]]:
             '--format=csv,noheader,nounits'
         ]
         
-        output = subprocess.check_output(
-            cmd,
-            stderr=subprocess.DEVNULL,
-            timeout=5
-        ).decode('utf-8').strip()
+        with COLLECTOR_SECONDS.time('nvidia_smi'), tracing.span('collector.nvidia_smi'):
+            output = subprocess.check_output(
+                cmd,
+                stderr=subprocess.DEVNULL,
+                timeout=5
+            ).decode('utf-8').strip()
         
         # Parse output
         parts = [p.strip() for p in output.split(',')]
@@ -178,7 +221,8 @@ def get_gpu_status() -> Dict[str, Union[float, str]]:
         return result
         
     except FileNotFoundError:
-        return {
+        # Kondisi tetap (tanpa driver NVIDIA): di-cache agar tidak spawn tiap request
+        result = {
             'name': 'N/A',
             'temperature_c': 0,
             'utilization_percent': 0,
@@ -186,6 +230,8 @@ def get_gpu_status() -> Dict[str, Union[float, str]]:
             'memory_total_mb': 0,
             'status': 'nvidia-smi not found'
         }
+        _set_cache(cache_key, result)
+        return result
     except subprocess.TimeoutExpired:
         return {
             'name': 'N/A',
@@ -206,9 +252,14 @@ def get_gpu_status() -> Dict[str, Union[float, str]]:
         }
 
 
+@tracing.traced('system_monitor.summary')
+@coalesce('system_summary')
 def get_system_summary() -> Dict[str, any]:
     """Mengambil ringkasan lengkap status sistem.
     
+    Request status yang bersamaan berbagi satu sampling (cpu_percent
+    memblokir 1 detik) melalui single-flight.
+    
     Returns:
         dict: {
             'platform': str,
@@ -225,3 +276,47 @@ def get_system_summary() -> Dict[str, any]:
         'gpu': get_gpu_status(),
         'timestamp': datetime.now().isoformat()
     }
+
+
+def _collect_metrics():
+    """Gauge host untuk /metrics dari sample yang sudah diambil agent.
+    
+    RAM dibaca langsung (psutil.virtual_memory murah); CPU dan GPU memakai
+    sample terakhir di cache karena cpu_percent memblokir 1 detik dan
+    nvidia-smi menjalankan proses baru.
+    """
+    mem = psutil.virtual_memory()
+    families = [
+        ('ag_host_memory_total_bytes', 'gauge', 'Total RAM', [({}, mem.total)]),
+        ('ag_host_memory_used_bytes', 'gauge', 'RAM terpakai', [({}, mem.used)]),
+        ('ag_host_memory_available_bytes', 'gauge', 'RAM tersedia', [({}, mem.available)]),
+        ('ag_host_memory_percent', 'gauge', 'Persentase RAM terpakai', [({}, mem.percent)])
+    ]
+    
+    now = datetime.now()
+    ages = [({'collector': key}, (now - timestamp).total_seconds())
+            for key, timestamp in list(_cache_timestamp.items())]
+    
+    cpu = _cache.get('cpu_status')
+    if cpu and cpu.get('status') == 'ok':
+        families.append(('ag_host_cpu_percent', 'gauge', 'Utilisasi CPU (sample terakhir)', [({}, cpu['percent'])]))
+        families.append(('ag_host_cpu_cores', 'gauge', 'Jumlah core CPU', [
+            ({'kind': 'physical'}, cpu['cores_physical'] or 0),
+            ({'kind': 'logical'}, cpu['cores_logical'] or 0)
+        ]))
+    
+    gpu = _cache.get('gpu_status')
+    if gpu and gpu.get('status') == 'ok':
+        labels = {'gpu': gpu['name']}
+        families.extend([
+            ('ag_host_gpu_temperature_celsius', 'gauge', 'Suhu GPU (sample terakhir)', [(labels, gpu['temperature_c'])]),
+            ('ag_host_gpu_utilization_percent', 'gauge', 'Utilisasi GPU (sample terakhir)', [(labels, gpu['utilization_percent'])]),
+            ('ag_host_gpu_memory_used_bytes', 'gauge', 'Memory GPU terpakai', [(labels, gpu['memory_used_mb'] * 1024 * 1024)]),
+            ('ag_host_gpu_memory_total_bytes', 'gauge', 'Total memory GPU', [(labels, gpu['memory_total_mb'] * 1024 * 1024)])
+        ])
+    
+    families.append(('ag_host_sample_age_seconds', 'gauge', 'Umur sample terakhir per collector', ages))
+    return families
+
+
+register_collector(_collect_metrics)
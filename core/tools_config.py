@@ -0,0 +1,340 @@
+"""Tools Config untuk Agent Pribadi (AG)
+
+Loader `config/tools/packages.yaml` yang:
+- Memakai loader C libyaml (CBaseLoader) jika tersedia. BaseLoader membuat
+  semua scalar tetap string, jadi versi seperti `8.4` tidak menjadi float
+- Menyimpan hasil parse dalam bentuk marshal di storage/, dengan key mtime
+  dan sha256 file YAML, sehingga proses/worker baru tidak parse ulang
+- Hot reload saat file berubah (cek mtime paling sering tiap
+  TOOLS_CONFIG_CHECK_SECONDS) tanpa restart
+- Validasi ke record ToolRelease dengan index versi terurut, jadi lookup
+  versi dan resolusi "latest" cukup dictionary hit
+
+Entry versi bisa punya `mirrors` (list URL alternatif untuk file yang
+sama). Key `build` (di level tool atau per versi) menandai source tarball yang
+harus di-build setelah ekstraksi; nilainya list flag configure, atau
+`yes`/`no`.
+"""
+
+import os
+import re
+import sys
+import shlex
+import time
+import hashlib
+import marshal
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from config.settings import TOOLS_CONFIG_PATH, TOOLS_CONFIG_CACHE_PATH, TOOLS_CONFIG_CHECK_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Naikkan jika struktur record berubah (cache lama otomatis diabaikan)
+CACHE_FORMAT = 3
+_CACHE_TAG = f"{CACHE_FORMAT}:{sys.version_info[0]}.{sys.version_info[1]}"
+
+LATEST = 'latest'
+
+# Key reserved di mapping tool (bukan versi)
+BUILD_KEY = 'build'
+
+_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class ToolRelease(NamedTuple):
+    """Satu versi tool yang bisa diinstall."""
+    tool: str
+    version: str
+    url: str
+    sha256: Optional[str] = None
+    # Flag configure untuk source build; None = cukup diekstrak
+    build: Optional[Tuple[str, ...]] = None
+    # URL alternatif untuk file yang sama (lihat core.mirrors)
+    mirrors: Tuple[str, ...] = ()
+
+    @property
+    def urls(self) -> Tuple[str, ...]:
+        """URL utama diikuti semua mirror."""
+        return (self.url,) + self.mirrors
+
+
+def version_key(version: str) -> Tuple:
+    """Key sorting versi: '1.25.10' > '1.25.4', angka sebelum suffix teks."""
+    parts = []
+    for part in re.split(r'[.\-_+]', version):
+        if part.isdigit():
+            parts.append((1, int(part), ''))
+        else:
+            parts.append((0, 0, part))
+    return tuple(parts)
+
+
+def _load_yaml(data: bytes) -> Dict:
+    """Parse YAML dengan loader C jika ada (semua scalar tetap string)."""
+    import yaml
+    loader = getattr(yaml, 'CBaseLoader', yaml.BaseLoader)
+    return yaml.load(data, Loader=loader) or {}
+
+
+def _parse_build(value) -> Optional[Tuple[str, ...]]:
+    """Normalisasi nilai `build` menjadi tuple flag configure atau None."""
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return tuple(str(flag) for flag in value)
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ('', 'no', 'false', 'off'):
+            return None
+        if lowered in ('yes', 'true', 'on', 'default'):
+            return ()
+        return tuple(shlex.split(value))
+    raise ValueError(f"invalid build value: {value!r}")
+
+
+def _validate(raw: Dict) -> Dict[str, List[Tuple]]:
+    """Validasi hasil parse menjadi {tool: [(version, url, sha256, build, mirrors), ...]}.
+
+    Entry yang tidak valid dilewati dengan warning; versi diurutkan dari
+    yang terbaru.
+    """
+    records: Dict[str, List[Tuple]] = {}
+
+    if not isinstance(raw, dict):
+        logger.error("Invalid tools config: top level must be a mapping")
+        return records
+
+    for tool, versions in raw.items():
+        if not isinstance(versions, dict):
+            logger.warning(f"Invalid config format for tool '{tool}'")
+            continue
+
+        try:
+            tool_build = _parse_build(versions.get(BUILD_KEY))
+        except ValueError as e:
+            logger.warning(f"Invalid build config for tool '{tool}': {e}")
+            tool_build = None
+
+        entries = []
+        for version, entry in versions.items():
+            if version == BUILD_KEY:
+                continue
+
+            build = tool_build
+            mirrors = ()
+            if isinstance(entry, dict):
+                url = entry.get('url')
+                sha256 = entry.get('sha256')
+                raw_mirrors = entry.get('mirrors') or []
+                if isinstance(raw_mirrors, str):
+                    raw_mirrors = [raw_mirrors]
+                mirrors = tuple(m for m in raw_mirrors if isinstance(m, str) and m and m != url)
+                if BUILD_KEY in entry:
+                    try:
+                        build = _parse_build(entry[BUILD_KEY])
+                    except ValueError as e:
+                        logger.warning(f"Invalid build config for {tool} {version}: {e}")
+                        continue
+            else:
+                url, sha256 = entry, None
+
+            if not isinstance(url, str) or not url:
+                logger.warning(f"Missing url for {tool} {version}")
+                continue
+            if sha256 is not None:
+                sha256 = sha256.lower()
+                if not _SHA256_RE.match(sha256):
+                    logger.warning(f"Invalid sha256 for {tool} {version}, ignored")
+                    sha256 = None
+            if version == LATEST:
+                logger.warning(f"'{LATEST}' is reserved, skipped for tool '{tool}'")
+                continue
+
+            entries.append((version, url, sha256, build, mirrors))
+
+        entries.sort(key=lambda e: version_key(e[0]), reverse=True)
+        records[tool] = entries
+
+    return records
+
+
+class ToolsConfig:
+    """Index release tools dari packages.yaml dengan cache dan hot reload."""
+
+    def __init__(self, path: Path = TOOLS_CONFIG_PATH, cache_path: Optional[Path] = TOOLS_CONFIG_CACHE_PATH,
+                 check_seconds: float = TOOLS_CONFIG_CHECK_SECONDS):
+        """Inisialisasi config.
+
+        Args:
+            path: Path packages.yaml
+            cache_path: Path cache hasil parse (None = tanpa cache)
+            check_seconds: Interval minimum cek perubahan file
+        """
+        self.path = path
+        self.cache_path = cache_path
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._digest: Optional[str] = None
+        self._checked_at = 0.0
+        self._stats = {'loads': 0, 'cache_hits': 0, 'parses': 0, 'parse_seconds': 0.0}
+
+        # (releases, latest) di-swap sekaligus saat reload
+        self._releases: Dict[str, Dict[str, ToolRelease]] = {}
+        self._latest: Dict[str, str] = {}
+
+        self.reload()
+
+    def _read_cache(self, stamp: Tuple[int, int], digest: Optional[str]) -> Optional[Dict]:
+        """Baca cache jika cocok dengan stamp (mtime, size) atau digest."""
+        if self.cache_path is None:
+            return None
+        try:
+            with open(self.cache_path, 'rb') as f:
+                cached = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        if not isinstance(cached, dict) or cached.get('tag') != _CACHE_TAG:
+            return None
+        if tuple(cached.get('stamp', ())) == stamp or (digest and cached.get('sha256') == digest):
+            return cached
+        return None
+
+    def _write_cache(self, stamp: Tuple[int, int], digest: str, records: Dict) -> None:
+        if self.cache_path is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                marshal.dump({'tag': _CACHE_TAG, 'stamp': stamp, 'sha256': digest, 'records': records}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Cannot write tools config cache: {e}")
+
+    def reload(self, force: bool = False) -> bool:
+        """Load ulang config jika file berubah.
+
+        Args:
+            force: Abaikan stamp dan cache, parse ulang YAML
+
+        Returns:
+            bool: True jika index diganti
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                st = self.path.stat()
+            except FileNotFoundError:
+                if self._stamp is not None or not self._releases:
+                    logger.error(f"Config file not found: {self.path}")
+                self._stamp = None
+                self._set_records({})
+                return True
+
+            stamp = (st.st_mtime_ns, st.st_size)
+            if not force and stamp == self._stamp:
+                return False
+
+            cached = None if force else self._read_cache(stamp, None)
+            if cached is None:
+                data = self.path.read_bytes()
+                digest = hashlib.sha256(data).hexdigest()
+                if not force and digest == self._digest:
+                    # File di-touch tanpa perubahan isi
+                    self._stamp = stamp
+                    return False
+                cached = None if force else self._read_cache(stamp, digest)
+                if cached is None:
+                    start = time.perf_counter()
+                    try:
+                        records = _validate(_load_yaml(data))
+                    except Exception as e:
+                        # Config rusak: pertahankan index lama
+                        logger.error(f"Error loading config: {e}")
+                        return False
+                    self._stats['parses'] += 1
+                    self._stats['parse_seconds'] = round(time.perf_counter() - start, 4)
+                    self._write_cache(stamp, digest, records)
+                    cached = {'sha256': digest, 'records': records}
+                else:
+                    self._stats['cache_hits'] += 1
+                    if tuple(cached['stamp']) != stamp:
+                        self._write_cache(stamp, digest, cached['records'])
+            else:
+                self._stats['cache_hits'] += 1
+
+            self._stamp = stamp
+            self._digest = cached['sha256']
+            self._stats['loads'] += 1
+            self._set_records(cached['records'])
+
+        logger.info(f"Loaded tools config: {len(self._releases)} tools available")
+        return True
+
+    def _set_records(self, records: Dict) -> None:
+        releases = {
+            tool: {
+                version: ToolRelease(tool, version, url, sha256, build, mirrors)
+                for version, url, sha256, build, mirrors in entries
+            }
+            for tool, entries in records.items()
+        }
+        latest = {tool: entries[0][0] for tool, entries in records.items() if entries}
+        self._releases, self._latest = releases, latest
+
+    def _maybe_reload(self) -> None:
+        """Cek perubahan file maksimal sekali per check_seconds."""
+        if time.monotonic() - self._checked_at >= self.check_seconds:
+            self.reload()
+
+    def resolve_version(self, tool: str, version: str) -> Optional[str]:
+        """Resolusi versi ('latest' -> versi terbaru). None jika tidak ada."""
+        self._maybe_reload()
+        if version == LATEST:
+            return self._latest.get(tool)
+        return version if version in self._releases.get(tool, {}) else None
+
+    def get(self, tool: str, version: str) -> Optional[ToolRelease]:
+        """Ambil release tool/versi (mendukung 'latest')."""
+        self._maybe_reload()
+        if version == LATEST:
+            version = self._latest.get(tool)
+        return self._releases.get(tool, {}).get(version)
+
+    def has_tool(self, tool: str) -> bool:
+        self._maybe_reload()
+        return tool in self._releases
+
+    def tools(self) -> Dict[str, List[str]]:
+        """{tool: [versi terbaru ... terlama]}."""
+        self._maybe_reload()
+        return {tool: list(versions) for tool, versions in self._releases.items()}
+
+    def get_stats(self) -> Dict:
+        """Statistik loader (jumlah load, cache hit, waktu parse terakhir)."""
+        with self._lock:
+            return dict(self._stats, tools=len(self._releases))
+
+
+# Singleton instance
+_config_instance = None
+_config_lock = threading.Lock()
+
+
+def get_tools_config() -> ToolsConfig:
+    """Get singleton instance of ToolsConfig.
+
+    Returns:
+        ToolsConfig: Instance
+    """
+    global _config_instance
+    if _config_instance is None:
+        with _config_lock:
+            if _config_instance is None:
+                _config_instance = ToolsConfig()
+    return _config_instance
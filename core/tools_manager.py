@@ -2,21 +2,44 @@
 
 Mengelola download, installation, dan maintenance dari development tools.
 Mendukung: Nginx, PHP, MySQL, PostgreSQL, Node.js, MongoDB, Go, dll.
+
+Dependency berat di-import saat pertama dipakai: requests (downloader dan
+mirror) saat download pertama, tarfile/zipfile/lzma saat ekstraksi. Listing
+tools tidak memuat keduanya.
 """
 
 import os
-import yaml
-import requests
-import tarfile
-import zipfile
+import hashlib
 import shutil
-import subprocess
+import threading
+import contextvars
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
 from datetime import datetime
 
-from config.settings import PROJECT_ROOT, TOOLS_CONFIG_PATH, BIN_DIR
+from config.settings import (
+    BIN_DIR,
+    TOOLS_CACHE_ENABLED,
+    TOOLS_BANDWIDTH_LIMIT,
+    TOOLS_MANIFEST_PATH,
+    TOOLS_STREAM_EXTRACT,
+    TOOLS_STREAM_TEE_CACHE,
+    TOOLS_EXTRACT_WORKERS,
+    TOOLS_DEDUP_ENABLED,
+    TOOLS_DEDUP_DIR,
+    TOOLS_DEDUP_MIN_SIZE,
+    TOOLS_BUILD_ENABLED
+)
+from core.single_flight import coalesce
+from core import tracing
+from core.download_cache import ArchiveCache
+from core.tools_manifest import ToolsManifest
+from core.tools_config import get_tools_config
+from core.atomic_fs import BackgroundGC, make_staging_dir, publish_dir, swap_symlink, trash_path
+from core.dedup_store import DedupStore
+from core.source_builder import BuildError, LogCallback, SourceBuilder
 
 logger = logging.getLogger(__name__)
 
@@ -26,72 +49,117 @@ class ToolsManager:
     
     def __init__(self):
         """Inisialisasi Tools Manager."""
-        self.config_path = TOOLS_CONFIG_PATH
         self.bin_dir = BIN_DIR
-        self.tools_config = self._load_config()
+        # Index release dari packages.yaml (cached + hot reload)
+        self.config = get_tools_config()
+        # Downloader + mirror selector dibuat saat download pertama (lihat _init_network)
+        self._network_lock = threading.Lock()
+        self._downloader = None
+        self._mirrors = None
+        self.cache = ArchiveCache() if TOOLS_CACHE_ENABLED else None
+        # Digest archive yang diserahkan ke install_archive (path -> sha256):
+        # download tanpa cache atau lease dari archive cache
+        self._archive_digests: Dict[str, str] = {}
         
         # Ensure bin directory exists
         self.bin_dir.mkdir(parents=True, exist_ok=True)
-    
-    def _load_config(self) -> Dict:
-        """Load tools configuration dari YAML file.
         
-        Returns:
-            Dict: Tools configuration
-        """
-        try:
-            if not self.config_path.exists():
-                logger.error(f"Config file not found: {self.config_path}")
-                return {}
-            
-            with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            
-            logger.info(f"Loaded tools config: {len(config)} tools available")
-            return config
+        # Manifest tools terinstall + deteksi drift saat startup
+        self.manifest = ToolsManifest(TOOLS_MANIFEST_PATH)
+        self.manifest.reconcile(self.bin_dir)
         
-        except Exception as e:
-            logger.error(f"Error loading config: {e}")
-            return {}
+        # Build stage untuk source tarball (entry `build:` di packages.yaml)
+        self.builder = SourceBuilder() if TOOLS_BUILD_ENABLED else None
+        
+        # Hardlink file identik antar versi ke bin/.objects
+        self.dedup = DedupStore(TOOLS_DEDUP_DIR, TOOLS_EXTRACT_WORKERS, TOOLS_DEDUP_MIN_SIZE) if TOOLS_DEDUP_ENABLED else None
+        
+        # Directory lama (reinstall/remove) dihapus di background, lalu
+        # object dedup yang tidak terpakai lagi di-prune
+        self.gc = BackgroundGC(on_collected=self._after_gc if self.dedup else None)
+        self.gc.sweep(self.bin_dir)
+    
+    def _init_network(self) -> None:
+        """Buat downloader dan mirror selector (import requests) sekali saja."""
+        with self._network_lock:
+            if self._downloader is not None:
+                return
+            from core.downloader import Downloader, RateLimiter
+            from core.mirrors import MirrorSelector
+            
+            # Satu token bucket untuk semua download (termasuk batch install paralel)
+            downloader = Downloader(rate_limiter=RateLimiter(TOOLS_BANDWIDTH_LIMIT))
+            # Ranking mirror + skor persisten dari hasil download
+            self._mirrors = MirrorSelector(downloader.session)
+            downloader.reporter = self._mirrors.report
+            self._downloader = downloader
+    
+    @property
+    def downloader(self):
+        if self._downloader is None:
+            self._init_network()
+        return self._downloader
+    
+    @property
+    def mirrors(self):
+        if self._mirrors is None:
+            self._init_network()
+        return self._mirrors
     
     def list_available_tools(self) -> Dict[str, List[str]]:
         """List semua tools yang tersedia di config.
         
         Returns:
-            Dict: {tool_name: [versions]}
+            Dict: {tool_name: [versions]} (versi terbaru lebih dulu)
         """
-        result = {}
-        for tool_name, versions in self.tools_config.items():
-            if isinstance(versions, dict):
-                result[tool_name] = list(versions.keys())
-        return result
+        return self.config.tools()
+    
+    def resolve_version(self, tool: str, version: str) -> str:
+        """Resolusi alias versi ('latest') ke versi di config.
+        
+        Returns:
+            str: Versi sebenarnya, atau input apa adanya jika tidak dikenal
+        """
+        return self.config.resolve_version(tool, version) or version
     
     def list_installed_tools(self) -> List[Dict[str, str]]:
         """List semua tools yang sudah terinstall.
         
+        Dibaca dari manifest (bin/manifest.json), bukan scan directory,
+        sehingga jumlah filesystem call konstan berapapun tools terinstall.
+        
         Returns:
-            List[Dict]: [{tool: str, version: str, path: str}]
+            List[Dict]: [{tool, version, path, size_bytes, file_count,
+                          installed_at, source_sha256, saved_bytes, disk_bytes}]
+                        disk_bytes = bagian disk instalasi ini (object yang
+                        di-share dibagi rata antar pemakainya, lihat
+                        _refresh_shared_usage)
         """
-        installed = []
-        
-        if not self.bin_dir.exists():
-            return installed
-        
-        # Scan bin directory
-        for tool_dir in self.bin_dir.iterdir():
-            if tool_dir.is_dir() and not tool_dir.name.startswith('.'):
-                tool_name = tool_dir.name
-                
-                # Scan versions
-                for version_dir in tool_dir.iterdir():
-                    if version_dir.is_dir():
-                        installed.append({
-                            'tool': tool_name,
-                            'version': version_dir.name,
-                            'path': str(version_dir)
-                        })
-        
-        return installed
+        entries = self.manifest.list_entries()
+        for entry in entries:
+            entry.setdefault('saved_bytes', 0)
+            entry['disk_bytes'] = entry.get('size_bytes', 0) - entry['saved_bytes']
+        return entries
+    
+    def get_disk_usage(self) -> Dict:
+        """Ringkasan disk usage per tool dan penghematan dedup.
+        
+        Returns:
+            Dict: {'tools': {tool: {versions, size_bytes, disk_bytes, saved_bytes}},
+                   'dedup': stats object store (penghematan terukur)}
+        """
+        tools: Dict[str, Dict] = {}
+        for entry in self.list_installed_tools():
+            usage = tools.setdefault(entry['tool'], {'versions': 0, 'size_bytes': 0, 'disk_bytes': 0, 'saved_bytes': 0})
+            usage['versions'] += 1
+            usage['size_bytes'] += entry.get('size_bytes', 0)
+            usage['disk_bytes'] += entry['disk_bytes']
+            usage['saved_bytes'] += entry['saved_bytes']
+        
+        return {
+            'tools': tools,
+            'dedup': self.dedup.get_stats() if self.dedup else {'enabled': False}
+        }
     
     def get_tool_path(self, tool: str, version: str) -> Optional[Path]:
         """Get path ke installed tool.
@@ -103,10 +171,10 @@ class ToolsManager:
         Returns:
             Optional[Path]: Path ke tool atau None jika tidak ada
         """
-        tool_path = self.bin_dir / tool / version
+        entry = self.manifest.get(tool, version)
         
-        if tool_path.exists() and tool_path.is_dir():
-            return tool_path
+        if entry:
+            return Path(entry['path'])
         
         return None
     
@@ -122,35 +190,65 @@ class ToolsManager:
         """
         return self.get_tool_path(tool, version) is not None
     
-    def get_download_url(self, tool: str, version: str) -> Optional[str]:
-        """Get download URL untuk tool tertentu.
+    def get_release(self, tool: str, version: str) -> Optional[Dict[str, Optional[str]]]:
+        """Get info release (URL + digest opsional) untuk tool tertentu.
+        
+        Entry versi di packages.yaml bisa berupa URL langsung, atau mapping:
+            22.14.0:
+              url: https://...
+              sha256: <hex digest>
+              mirrors: [https://..., ...]
         
         Args:
             tool: Nama tool
             version: Versi tool
         
         Returns:
-            Optional[str]: URL atau None jika tidak ditemukan
+            Optional[Dict]: {'url': str, 'sha256': Optional[str],
+                             'mirrors': List[str]} atau None
         """
-        if tool not in self.tools_config:
-            logger.warning(f"Tool '{tool}' not found in config")
-            return None
+        release = self.config.get(tool, version)
         
-        tool_versions = self.tools_config[tool]
-        
-        if not isinstance(tool_versions, dict):
-            logger.warning(f"Invalid config format for tool '{tool}'")
+        if release is None:
+            if not self.config.has_tool(tool):
+                logger.warning(f"Tool '{tool}' not found in config")
+            else:
+                logger.warning(f"Version '{version}' not found for tool '{tool}'")
             return None
         
-        if version not in tool_versions:
-            logger.warning(f"Version '{version}' not found for tool '{tool}'")
+        return {'url': release.url, 'sha256': release.sha256, 'mirrors': list(release.mirrors)}
+    
+    def rank_mirrors(self, release: Dict) -> Optional[List[str]]:
+        """Urutkan URL utama + mirror dari yang tercepat (None jika tanpa mirror)."""
+        if not release.get('mirrors'):
             return None
+        return self.mirrors.rank([release['url']] + release['mirrors'])
+    
+    def get_download_url(self, tool: str, version: str) -> Optional[str]:
+        """Get download URL untuk tool tertentu.
+        
+        Args:
+            tool: Nama tool
+            version: Versi tool
         
-        return tool_versions[version]
+        Returns:
+            Optional[str]: URL atau None jika tidak ditemukan
+        """
+        release = self.get_release(tool, version)
+        return release['url'] if release else None
     
+    @tracing.traced('tools.download')
     def download_tool(self, tool: str, version: str) -> Optional[Path]:
         """Download tool dari URL.
         
+        Menggunakan Downloader (parallel ranged segments). Download yang
+        terputus dilanjutkan dari state parsial pada pemanggilan berikutnya.
+        Jika release punya mirror, mirror tercepat dipakai lebih dulu dan
+        mirror lain menjadi failover.
+        Digest sha256 dihitung selama download; jika config mencantumkan
+        sha256 dan tidak cocok, file dibuang. Archive yang valid disimpan
+        ke archive cache dan yang dikembalikan adalah lease milik pemanggil.
+        
         Args:
             tool: Nama tool
             version: Versi tool
@@ -158,11 +256,13 @@ class ToolsManager:
         Returns:
             Optional[Path]: Path ke downloaded file atau None jika gagal
         """
-        url = self.get_download_url(tool, version)
+        release = self.get_release(tool, version)
         
-        if not url:
+        if not release:
             return None
         
+        url = release['url']
+        
         # Determine filename from URL
         filename = url.split('/')[-1]
         download_path = self.bin_dir / f".downloads" / filename
@@ -172,124 +272,336 @@ class ToolsManager:
         
         try:
             logger.info(f"Downloading {tool} {version} from {url}")
+            hasher = hashlib.sha256()
+            self.downloader.download(url, download_path, hasher=hasher, mirrors=self.rank_mirrors(release))
+            digest = hasher.hexdigest()
+            tracing.set_attribute('bytes', download_path.stat().st_size)
             
-            response = requests.get(url, stream=True, timeout=300)
-            response.raise_for_status()
+            expected = release['sha256']
+            if expected and digest != expected.lower():
+                logger.error(f"Checksum mismatch for {tool} {version}: expected {expected}, got {digest}")
+                download_path.unlink()
+                return None
             
-            total_size = int(response.headers.get('content-length', 0))
+            if self.cache is not None:
+                download_path = self.cache.add(url, download_path, digest)
             
-            with open(download_path, 'wb') as f:
-                if total_size == 0:
-                    f.write(response.content)
-                else:
-                    downloaded = 0
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            progress = (downloaded / total_size) * 100
-                            if downloaded % (1024 * 1024) == 0:  # Log every MB
-                                logger.info(f"Downloaded: {progress:.1f}%")
-            
-            logger.info(f"Download complete: {download_path}")
+            self._archive_digests[str(download_path)] = digest
             return download_path
         
-        except requests.RequestException as e:
+        except IOError as e:
+            # requests.RequestException adalah subclass IOError
             logger.error(f"Download error: {e}")
             return None
         except Exception as e:
             logger.error(f"Unexpected error during download: {e}")
             return None
     
-    def extract_tool(self, archive_path: Path, tool: str, version: str) -> bool:
-        """Extract archive ke bin directory.
+    @tracing.traced('tools.extract')
+    def extract_tool(self, archive_path: Path, tool: str, version: str, source_sha256: Optional[str] = None,
+                     on_log: Optional[LogCallback] = None) -> bool:
+        """Extract archive ke bin directory (dan build jika release punya `build`).
         
         Args:
             archive_path: Path ke archive file
             tool: Nama tool
             version: Versi tool
+            source_sha256: Digest archive untuk dicatat di manifest
+            on_log: Callback per baris output build
         
         Returns:
             bool: True jika berhasil
+        
+        Raises:
+            BuildError: Jika build stage gagal
         """
+        from core.decompress import extract_tar, sniff_file
+        
         target_dir = self.bin_dir / tool / version
-        temp_extract_dir = self.bin_dir / f".extract_{tool}_{version}"
+        temp_extract_dir = None
         
         try:
-            # Create temp extract directory
-            temp_extract_dir.mkdir(parents=True, exist_ok=True)
+            # Staging sebagai sibling target (filesystem sama -> publish atomik)
+            temp_extract_dir = make_staging_dir(self.bin_dir / tool, version)
             
             logger.info(f"Extracting {archive_path} to {temp_extract_dir}")
             
-            # Detect archive type and extract
-            if archive_path.suffix == '.zip':
+            # Detect archive type from magic bytes and extract
+            archive_format = sniff_file(archive_path)
+            
+            if archive_format == 'zip':
+                import zipfile
                 with zipfile.ZipFile(archive_path, 'r') as zip_ref:
                     zip_ref.extractall(temp_extract_dir)
             
-            elif archive_path.suffix in ['.gz', '.xz', '.tgz']:
-                with tarfile.open(archive_path, 'r:*') as tar_ref:
-                    tar_ref.extractall(temp_extract_dir)
+            elif archive_format in ['gzip', 'xz', 'zstd', 'bzip2', 'tar']:
+                extract_tar(archive_path, temp_extract_dir)
             
             else:
-                logger.error(f"Unsupported archive format: {archive_path.suffix}")
+                logger.error(f"Unsupported archive format: {archive_path.name}")
                 return False
             
-            # Move extracted content to target directory
-            # Handle case where archive contains a single root directory
-            extracted_items = list(temp_extract_dir.iterdir())
-            
-            if len(extracted_items) == 1 and extracted_items[0].is_dir():
-                # Archive has single root dir, move its contents
-                source_dir = extracted_items[0]
-            else:
-                # Archive has multiple items at root, use temp dir itself
-                source_dir = temp_extract_dir
-            
-            # Ensure target parent exists
-            target_dir.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Move to final location
-            if target_dir.exists():
-                shutil.rmtree(target_dir)
+            self._publish_extracted(temp_extract_dir, target_dir, tool, version, source_sha256, on_log)
+            return True
+        
+        except Exception as e:
+            logger.error(f"Extraction error: {e}")
             
-            shutil.move(str(source_dir), str(target_dir))
+            # Cleanup on failure
+            if temp_extract_dir is not None and temp_extract_dir.exists():
+                shutil.rmtree(temp_extract_dir)
             
-            logger.info(f"Extracted successfully to {target_dir}")
+            if isinstance(e, BuildError):
+                raise
+            return False
+    
+    def _publish_extracted(self, temp_extract_dir: Path, target_dir: Path, tool: str, version: str,
+                           source_sha256: Optional[str] = None, on_log: Optional[LogCallback] = None) -> None:
+        """Publish hasil ekstraksi ke target directory dan catat di manifest.
+        
+        Release dengan `build` di-build dulu (lihat core.source_builder) dan
+        yang dipublish adalah hasil `make install`, bukan source tree.
+        
+        Publish dilakukan dengan rename atomik: saat force reinstall, versi
+        lama tetap utuh sampai ditukar dengan versi baru, lalu dihapus di
+        background. Tool yang belum punya versi aktif otomatis mendapat
+        symlink `current`.
+        
+        Args:
+            temp_extract_dir: Directory staging hasil ekstraksi
+            target_dir: Directory instalasi final (bin/<tool>/<version>)
+            tool: Nama tool
+            version: Versi tool
+            source_sha256: Digest archive sumber
+            on_log: Callback per baris output build
+        """
+        # Handle case where archive contains a single root directory
+        extracted_items = list(temp_extract_dir.iterdir())
+        
+        if len(extracted_items) == 1 and extracted_items[0].is_dir():
+            # Archive has single root dir, publish its contents
+            source_dir = extracted_items[0]
+        else:
+            # Archive has multiple items at root, use staging dir itself
+            source_dir = temp_extract_dir
+        
+        build_info = None
+        release = self.config.get(tool, version)
+        if self.builder is not None and release is not None and release.build is not None:
+            build_dir = make_staging_dir(self.bin_dir / tool, f"{version}-build")
+            try:
+                with tracing.span('tools.build'):
+                    build_info = self.builder.build(
+                        tool, version, source_dir, target_dir, build_dir,
+                        list(release.build), source_sha256, on_log
+                    )
+            except Exception:
+                shutil.rmtree(build_dir, ignore_errors=True)
+                raise
             
-            # Cleanup temp directory
-            if temp_extract_dir.exists():
-                shutil.rmtree(temp_extract_dir)
+            # Source tree tidak dibutuhkan lagi, yang dipublish hasil install
+            self.gc.schedule(temp_extract_dir)
+            temp_extract_dir = source_dir = build_dir
+        
+        dedup_stats = {}
+        if self.dedup is not None:
+            try:
+                with tracing.span('tools.dedup'):
+                    dedup_stats = self.dedup.dedupe_tree(source_dir)
+            except Exception as e:
+                # Dedup hanya optimasi disk, install tetap dilanjutkan
+                logger.warning(f"Dedup failed for {tool} {version}: {e}")
+        
+        with tracing.span('tools.publish'):
+            old_dir = publish_dir(source_dir, target_dir)
+        if old_dir is not None:
+            self.gc.schedule(old_dir)
+        if temp_extract_dir.exists():
+            self.gc.schedule(temp_extract_dir)
+        
+        logger.info(f"Extracted successfully to {target_dir}")
+        
+        # Manifest ditulis terakhir: install hanya terlihat setelah lengkap
+        self.manifest.record(tool, version, target_dir, source_sha256, build=build_info)
+        if dedup_stats:
+            # Versi lain yang sekarang berbagi object ikut berubah
+            self._refresh_shared_usage()
+        
+        if self.manifest.get_current(tool) is None:
+            self.use_tool(tool, version)
+    
+    def _refresh_shared_usage(self) -> None:
+        """Hitung ulang linked_files/saved_bytes semua entry manifest dari st_nlink.
+        
+        Dijalankan setelah install dan setelah GC remove/reinstall, jadi
+        penghematan tidak membeku di nilai saat install.
+        """
+        updates = {}
+        for entry in self.manifest.list_entries():
+            path = Path(entry['path'])
+            if path.is_dir():
+                updates[(entry['tool'], entry['version'])] = self.dedup.shared_usage(path)
+        self.manifest.update_many(updates)
+    
+    def _after_gc(self) -> None:
+        """Callback GC: prune object store lalu hitung ulang penghematan."""
+        self.dedup.prune()
+        self._refresh_shared_usage()
+    
+    @tracing.traced('tools.stream_install')
+    def stream_install_tool(self, tool: str, version: str, on_log: Optional[LogCallback] = None,
+                            extract_pool: Optional[Executor] = None) -> bool:
+        """Download dan extract sekaligus tanpa file archive perantara.
+        
+        Response HTTP diumpankan langsung ke tarfile stream mode sehingga
+        network dan dekompresi berjalan overlap, dan peak disk usage hanya
+        sebesar hasil instalasi. Jika archive cache aktif, bytes di-tee ke
+        cache dan baru dimasukkan setelah checksum valid.
+        
+        Args:
+            tool: Nama tool
+            version: Versi tool
+            on_log: Callback per baris output build
+            extract_pool: Executor untuk ekstraksi, build, dan publish; thread
+                pemanggil hanya menerima bytes lewat ChunkPipe (None = semua
+                di thread pemanggil)
+        
+        Returns:
+            bool: True jika berhasil
+        """
+        release = self.get_release(tool, version)
+        if not release:
+            return False
+        
+        url = release['url']
+        filename = url.split('/')[-1]
+        temp_extract_dir = make_staging_dir(self.bin_dir / tool, version)
+        tee_path = None
+        if self.cache is not None and TOOLS_STREAM_TEE_CACHE:
+            tee_path = self.bin_dir / ".downloads" / filename
+            tee_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        from core.stream_extract import ChunkPipe
+        
+        try:
+            logger.info(f"Streaming {tool} {version} from {url}")
+            response, chunks = self.downloader.open_stream(url, mirrors=self.rank_mirrors(release))
             
+            with response:
+                if extract_pool is None:
+                    self._finish_stream(chunks, release, tool, version, temp_extract_dir, tee_path, on_log)
+                else:
+                    pipe = ChunkPipe()
+                    
+                    def consume():
+                        try:
+                            self._finish_stream(pipe, release, tool, version, temp_extract_dir, tee_path, on_log)
+                        finally:
+                            pipe.close()
+                    
+                    future = extract_pool.submit(contextvars.copy_context().run, consume)
+                    pipe.feed(chunks)
+                    future.result()
             return True
         
         except Exception as e:
-            logger.error(f"Extraction error: {e}")
+            logger.error(f"Streaming install error for {tool} {version}: {e}")
             
-            # Cleanup on failure
             if temp_extract_dir.exists():
                 shutil.rmtree(temp_extract_dir)
             
+            if isinstance(e, BuildError):
+                raise
             return False
+        
+        finally:
+            if tee_path is not None and tee_path.exists():
+                tee_path.unlink()
+    
+    def _finish_stream(self, chunks: Iterable[bytes], release: Dict, tool: str, version: str,
+                       temp_extract_dir: Path, tee_path: Optional[Path], on_log: Optional[LogCallback]) -> None:
+        """Ekstrak stream, verifikasi checksum, simpan ke cache, lalu publish."""
+        from core.stream_extract import stream_extract
+        
+        hasher = hashlib.sha256()
+        stream_extract(chunks, temp_extract_dir, hasher=hasher, tee_path=tee_path)
+        digest = hasher.hexdigest()
+        
+        expected = release['sha256']
+        if expected and digest != expected.lower():
+            raise IOError(f"Checksum mismatch: expected {expected}, got {digest}")
+        
+        if tee_path is not None:
+            self.cache.add(release['url'], tee_path, digest, checkout=False)
+        
+        self._publish_extracted(temp_extract_dir, self.bin_dir / tool / version, tool, version, digest, on_log)
+    
+    def setup_key(self, tool: str, version: str) -> str:
+        """Key single-flight setup untuk tool/versi.
+        
+        Versi diresolusi dulu ('latest' dan versi eksplisit yang sama
+        mendapat key sama) dan force tidak ikut: semua setup tool/versi yang
+        sama menulis ke path download dan staging yang sama.
+        """
+        return f"{tool}:{self.resolve_version(tool, version)}"
     
+    @coalesce('tool_setup', key_func=lambda self, tool, version, force=False: self.setup_key(tool, version))
     def setup_tool(self, tool: str, version: str, force: bool = False) -> Tuple[bool, str]:
         """Setup tool: download + extract.
         
+        Setup bersamaan untuk tool/versi yang sama digabung menjadi satu
+        eksekusi (lihat core.single_flight) agar tidak download dua kali
+        ke path yang sama. Pemanggil yang menumpang menerima hasil eksekusi
+        yang sedang berjalan, termasuk jika force-nya berbeda.
+        
         Args:
             tool: Nama tool
-            version: Versi tool
+            version: Versi tool (atau 'latest')
             force: Force reinstall jika sudah ada
         
         Returns:
             Tuple[bool, str]: (success, message)
         """
+        version = self.resolve_version(tool, version)
+        precheck = self.check_setup(tool, version, force)
+        if precheck is not None:
+            return precheck
+        
+        logger.info(f"Setting up {tool} {version}")
+        release = self.get_release(tool, version)
+        
+        # Streaming mode: download + extract overlap, tanpa archive perantara
+        if self.should_stream(release):
+            return self.stream_setup_result(tool, version)
+        
+        # Download (atau ambil dari cache)
+        archive_path = self.fetch_archive(tool, version)
+        if not archive_path:
+            return False, "Gagal mendownload tool"
+        
+        # Extract
+        return self.install_archive(archive_path, tool, version)
+    
+    def check_setup(self, tool: str, version: str, force: bool = False) -> Optional[Tuple[bool, str]]:
+        """Validasi sebelum setup.
+        
+        Args:
+            tool: Nama tool
+            version: Versi tool
+            force: Force reinstall jika sudah ada
+        
+        Returns:
+            Optional[Tuple[bool, str]]: Hasil final jika setup tidak perlu
+            dijalankan (sudah terinstall / tidak ada di config), None jika
+            setup harus dilanjutkan
+        """
         # Check if already installed
         if self.is_tool_installed(tool, version) and not force:
             path = self.get_tool_path(tool, version)
             return True, f"{tool} {version} sudah terinstall di {path}"
         
         # Check if tool exists in config
-        url = self.get_download_url(tool, version)
-        if not url:
+        if not self.get_release(tool, version):
             available = self.list_available_tools()
             if tool in available:
                 versions = ', '.join(available[tool])
@@ -297,26 +609,102 @@ class ToolsManager:
             else:
                 return False, f"Tool '{tool}' tidak ditemukan dalam konfigurasi"
         
-        logger.info(f"Setting up {tool} {version}")
+        return None
+    
+    def should_stream(self, release: Dict) -> bool:
+        """Cek apakah release diinstall lewat streaming mode (cache miss + tar)."""
+        from core.stream_extract import is_streamable
         
-        # Download
-        archive_path = self.download_tool(tool, version)
-        if not archive_path:
-            return False, "Gagal mendownload tool"
+        if not TOOLS_STREAM_EXTRACT or not is_streamable(release['url']):
+            return False
+        if self.cache is not None and self.cache.has(release['url'], release['sha256']):
+            return False
+        return True
+    
+    def stream_setup_result(self, tool: str, version: str, on_log: Optional[LogCallback] = None,
+                            extract_pool: Optional[Executor] = None) -> Tuple[bool, str]:
+        """Jalankan stream_install_tool dan format hasilnya seperti setup_tool."""
+        try:
+            if not self.stream_install_tool(tool, version, on_log, extract_pool):
+                return False, "Gagal mendownload dan mengekstrak tool"
+        except BuildError as e:
+            return False, self._build_failed_message(tool, version, e)
+        return True, self._setup_message(tool, version)
+    
+    def _setup_message(self, tool: str, version: str) -> str:
+        """Pesan sukses setup (dengan info build jika tool di-build)."""
+        entry = self.manifest.get(tool, version) or {}
+        message = f"Berhasil setup {tool} {version} di {entry.get('path')}"
+        build = entry.get('build')
+        if build:
+            message += " (build cache hit)" if build['cache_hit'] else f" (build {build['seconds']}s)"
+        return message
+    
+    def _build_failed_message(self, tool: str, version: str, error: Exception) -> str:
+        log_path = self.builder.log_dir / f"{tool}-{version}.log" if self.builder else None
+        return f"Build {tool} {version} gagal: {error}. Log: {log_path}"
+    
+    @tracing.traced('tools.fetch')
+    def fetch_archive(self, tool: str, version: str) -> Optional[Path]:
+        """Ambil archive dari cache, atau download jika cache miss.
         
-        # Extract
-        if not self.extract_tool(archive_path, tool, version):
-            return False, "Gagal mengekstrak tool"
+        Args:
+            tool: Nama tool
+            version: Versi tool
         
-        # Cleanup download
-        try:
-            archive_path.unlink()
-        except:
-            pass
+        Returns:
+            Optional[Path]: Path archive milik pemanggil (dihapus oleh
+            install_archive) atau None jika gagal
+        """
+        release = self.get_release(tool, version)
+        if not release:
+            return None
         
-        tool_path = self.get_tool_path(tool, version)
-        return True, f"Berhasil setup {tool} {version} di {tool_path}"
+        # Reinstall dari cache tanpa menyentuh network
+        if self.cache is not None:
+            hit = self.cache.lookup(release['url'], release['sha256'])
+            tracing.set_attribute('cache', 'hit' if hit else 'miss')
+            if hit:
+                archive_path, digest = hit
+                self._archive_digests[str(archive_path)] = digest
+                return archive_path
+        
+        return self.download_tool(tool, version)
     
+    def install_archive(self, archive_path: Path, tool: str, version: str,
+                        on_log: Optional[LogCallback] = None) -> Tuple[bool, str]:
+        """Extract (dan build) archive lalu hapus file download / lease cache.
+        
+        Args:
+            archive_path: Path archive (hasil fetch_archive, milik pemanggil)
+            tool: Nama tool
+            version: Versi tool
+            on_log: Callback per baris output build
+        
+        Returns:
+            Tuple[bool, str]: (success, message)
+        """
+        source_sha256 = self._archive_digests.pop(str(archive_path), None)
+        
+        try:
+            if not self.extract_tool(archive_path, tool, version, source_sha256, on_log):
+                return False, "Gagal mengekstrak tool"
+        except BuildError as e:
+            return False, self._build_failed_message(tool, version, e)
+        finally:
+            # Archive di cache tetap disimpan, yang dihapus hanya salinan ini
+            try:
+                archive_path.unlink()
+            except OSError:
+                pass
+        
+        return True, self._setup_message(tool, version)
+    
+    def get_build_stats(self) -> Dict:
+        """Statistik source build (jumlah build, hit rate cache, waktu)."""
+        return self.builder.get_stats() if self.builder else {'enabled': False}
+    
+    @coalesce('tool_remove', key_func=lambda self, tool, version: f"{tool}:{version}")
     def remove_tool(self, tool: str, version: str) -> Tuple[bool, str]:
         """Remove installed tool.
         
@@ -333,13 +721,53 @@ class ToolsManager:
             return False, f"{tool} {version} tidak ditemukan"
         
         try:
-            shutil.rmtree(tool_path)
+            was_current = self.manifest.get_current(tool) == version
+            self.manifest.remove(tool, version)
+            
+            # Rename ke trash (atomik), hapus isinya di background. Yang
+            # dihapus hanya hardlink milik versi ini; object dedup yang masih
+            # dipakai versi lain tetap ada, sisanya di-prune setelah GC.
+            if tool_path.exists():
+                trash = trash_path(tool_path.parent, tool_path.name)
+                os.rename(tool_path, trash)
+                self.gc.schedule(trash)
+            
+            if was_current:
+                current_link = tool_path.parent / 'current'
+                if current_link.is_symlink():
+                    current_link.unlink()
+            
             logger.info(f"Removed {tool} {version} from {tool_path}")
             return True, f"Berhasil menghapus {tool} {version}"
         
         except Exception as e:
             logger.error(f"Error removing tool: {e}")
             return False, f"Gagal menghapus tool: {str(e)}"
+    
+    def use_tool(self, tool: str, version: str) -> Tuple[bool, str]:
+        """Jadikan versi tertentu sebagai versi aktif (bin/<tool>/current).
+        
+        Switch berupa satu swap symlink atomik, jadi tidak pernah ada saat
+        `current` menunjuk ke tree yang belum lengkap.
+        
+        Args:
+            tool: Nama tool
+            version: Versi tool
+        
+        Returns:
+            Tuple[bool, str]: (success, message)
+        """
+        tool_path = self.get_tool_path(tool, version)
+        
+        if not tool_path:
+            return False, f"{tool} {version} belum terinstall"
+        
+        if not swap_symlink(tool_path.parent / 'current', version):
+            return False, f"Gagal membuat symlink current untuk {tool}"
+        
+        self.manifest.set_current(tool, version)
+        logger.info(f"Switched {tool} current -> {version}")
+        return True, f"{tool} sekarang menggunakan versi {version} ({tool_path.parent / 'current'})"
 
 
 # Singleton instance
@@ -0,0 +1,246 @@
+"""Installed Tools Manifest untuk Agent Pribadi (AG)
+
+Menyimpan daftar tools terinstall di `bin/manifest.json` sehingga listing
+tidak perlu scan directory. Manifest ditulis atomik (temp file + rename)
+di akhir setiap install dan hanya dibaca ulang jika file berubah (mtime).
+"""
+
+import os
+import json
+import threading
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def measure_tree(path: Path) -> Tuple[int, int]:
+    """Hitung total ukuran (bytes) dan jumlah file dalam sebuah directory.
+
+    Returns:
+        Tuple[int, int]: (size_bytes, file_count)
+    """
+    size = 0
+    count = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+                count += 1
+            except OSError:
+                pass
+    return size, count
+
+
+class ToolsManifest:
+    """Manifest tools terinstall (tool -> version -> metadata)."""
+
+    def __init__(self, path: Path):
+        """Inisialisasi manifest.
+
+        Args:
+            path: Path file manifest (bin/manifest.json)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._tools: Dict[str, Dict[str, Dict]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Load manifest dari disk (harus dipanggil saat memegang lock atau saat init)."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._tools = {}
+            self._mtime = None
+            return
+
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self._tools = data.get('tools', {})
+            self._mtime = stat.st_mtime_ns
+        except Exception as e:
+            logger.error(f"Error loading manifest {self.path}: {e}")
+            self._tools = {}
+
+    def _refresh(self) -> None:
+        """Reload jika manifest diubah proses lain (satu stat call)."""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._mtime:
+            self._load()
+
+    def _save(self) -> None:
+        """Tulis manifest secara atomik (harus dipanggil saat memegang lock)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'tools': self._tools}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._mtime = self.path.stat().st_mtime_ns
+
+    def record(self, tool: str, version: str, path: Path, source_sha256: Optional[str] = None, **fields) -> Dict:
+        """Catat instalasi yang sudah selesai.
+
+        Args:
+            tool: Nama tool
+            version: Versi tool
+            path: Directory instalasi final
+            source_sha256: Digest archive sumber (jika diketahui)
+            **fields: Field tambahan (misal statistik dedup)
+
+        Returns:
+            Dict: Entry manifest yang disimpan
+        """
+        size, file_count = measure_tree(path)
+        entry = {
+            'path': str(path),
+            'size_bytes': size,
+            'file_count': file_count,
+            'installed_at': datetime.now().isoformat(),
+            'source_sha256': source_sha256,
+            'current': False
+        }
+        entry.update(fields)
+
+        with self._lock:
+            self._refresh()
+            previous = self._tools.get(tool, {}).get(version)
+            if previous:
+                entry['current'] = previous.get('current', False)
+            self._tools.setdefault(tool, {})[version] = entry
+            self._save()
+
+        return entry
+
+    def update(self, tool: str, version: str, **fields) -> None:
+        """Update field entry yang sudah ada."""
+        with self._lock:
+            self._refresh()
+            entry = self._tools.get(tool, {}).get(version)
+            if entry is None:
+                return
+            entry.update(fields)
+            self._save()
+
+    def update_many(self, updates: Dict[Tuple[str, str], Dict]) -> None:
+        """Update field beberapa entry sekaligus (satu kali tulis).
+
+        Args:
+            updates: {(tool, version): fields}; entry yang sudah dihapus dilewati
+        """
+        with self._lock:
+            self._refresh()
+            changed = False
+            for (tool, version), fields in updates.items():
+                entry = self._tools.get(tool, {}).get(version)
+                if entry is not None and any(entry.get(key) != value for key, value in fields.items()):
+                    entry.update(fields)
+                    changed = True
+            if changed:
+                self._save()
+
+    def set_current(self, tool: str, version: Optional[str]) -> None:
+        """Tandai versi aktif (target symlink `current`) untuk sebuah tool."""
+        with self._lock:
+            self._refresh()
+            for name, entry in self._tools.get(tool, {}).items():
+                entry['current'] = name == version
+            self._save()
+
+    def get_current(self, tool: str) -> Optional[str]:
+        """Versi aktif sebuah tool, atau None."""
+        with self._lock:
+            self._refresh()
+            for name, entry in self._tools.get(tool, {}).items():
+                if entry.get('current'):
+                    return name
+            return None
+
+    def remove(self, tool: str, version: str) -> None:
+        """Hapus entry dari manifest."""
+        with self._lock:
+            self._refresh()
+            versions = self._tools.get(tool, {})
+            if versions.pop(version, None) is None:
+                return
+            if not versions:
+                self._tools.pop(tool, None)
+            self._save()
+
+    def get(self, tool: str, version: str) -> Optional[Dict]:
+        """Ambil entry manifest untuk tool/versi tertentu."""
+        with self._lock:
+            self._refresh()
+            entry = self._tools.get(tool, {}).get(version)
+            return dict(entry) if entry else None
+
+    def list_entries(self) -> List[Dict]:
+        """List semua entry: [{tool, version, path, size_bytes, ...}]."""
+        with self._lock:
+            self._refresh()
+            return [
+                dict(entry, tool=tool, version=version)
+                for tool, versions in sorted(self._tools.items())
+                for version, entry in sorted(versions.items())
+            ]
+
+    def reconcile(self, bin_dir: Path) -> Dict[str, List[str]]:
+        """Deteksi drift antara manifest dan isi bin directory.
+
+        - Entry yang directory-nya hilang dihapus dari manifest
+        - Directory versi yang valid tapi belum tercatat (instalasi lama)
+          diadopsi ke manifest
+        - Directory sisa (`.extract_*`, dot-dir) tidak pernah dianggap install
+
+        Returns:
+            Dict: {'removed': [...], 'adopted': [...]} berisi "tool version"
+        """
+        removed, adopted = [], []
+
+        with self._lock:
+            self._refresh()
+
+            for tool, versions in list(self._tools.items()):
+                for version, entry in list(versions.items()):
+                    if not Path(entry['path']).is_dir():
+                        del versions[version]
+                        removed.append(f"{tool} {version}")
+                if not versions:
+                    del self._tools[tool]
+
+            if bin_dir.exists():
+                for tool_dir in bin_dir.iterdir():
+                    if not tool_dir.is_dir() or tool_dir.name.startswith('.'):
+                        continue
+                    for version_dir in tool_dir.iterdir():
+                        if version_dir.name.startswith('.') or version_dir.is_symlink() or not version_dir.is_dir():
+                            continue
+                        if version_dir.name in self._tools.get(tool_dir.name, {}):
+                            continue
+                        size, file_count = measure_tree(version_dir)
+                        self._tools.setdefault(tool_dir.name, {})[version_dir.name] = {
+                            'path': str(version_dir),
+                            'size_bytes': size,
+                            'file_count': file_count,
+                            'installed_at': datetime.fromtimestamp(version_dir.stat().st_mtime).isoformat(),
+                            'source_sha256': None,
+                            'current': False
+                        }
+                        adopted.append(f"{tool_dir.name} {version_dir.name}")
+
+            if removed or adopted or not self.path.exists():
+                self._save()
+
+        if removed or adopted:
+            logger.warning(f"Manifest drift fixed - removed: {removed}, adopted: {adopted}")
+
+        return {'removed': removed, 'adopted': adopted}
@@ -0,0 +1,269 @@
+"""Tracing untuk Agent Pribadi (AG)
+
+Span ringan per command chat (HTTP /api/chat maupun Unix socket): setiap
+command mendapat trace id, dan span dicatat untuk intent dispatch, setiap
+collector system monitor (dengan atribut cache hit/miss), operasi SQLite,
+serta fase download/extract/build/publish tools.
+
+Span aktif disimpan di contextvars sehingga modul lain cukup memanggil
+span()/traced() tanpa meneruskan objek trace. Di luar trace (CLI, thread
+worker batch install) span() mengembalikan no-op bersama, jadi biaya
+instrumentasi hanya satu ContextVar.get().
+
+Trace yang selesai disimpan di ring buffer (TRACE_BUFFER_SIZE, lihat
+GET /api/debug/traces) dan, jika TRACE_EXPORT_PATH diset, ditambahkan ke
+file JSON lines dalam format OTLP/JSON (ExportTraceServiceRequest).
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+from config.settings import TRACING_ENABLED, TRACE_BUFFER_SIZE, TRACE_EXPORT_PATH
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'agent-pribadi'
+
+_current_span: ContextVar[Optional['Span']] = ContextVar('ag_current_span', default=None)
+
+_buffer: deque = deque(maxlen=TRACE_BUFFER_SIZE)
+_buffer_lock = threading.Lock()
+_export_lock = threading.Lock()
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+def _otlp_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class Trace:
+    """Kumpulan span dari satu command."""
+
+    __slots__ = ('trace_id', 'spans')
+
+    def __init__(self):
+        self.trace_id = _new_id(16)
+        self.spans: List['Span'] = []
+
+    @property
+    def root(self) -> 'Span':
+        return self.spans[0]
+
+    def _depths(self) -> Dict[str, int]:
+        depths: Dict[str, int] = {}
+        for span in self.spans:
+            depths[span.span_id] = depths.get(span.parent_id, -1) + 1 if span.parent_id else 0
+        return depths
+
+    def timing(self) -> Dict:
+        """Ringkasan untuk field `timing` di response (offset relatif root)."""
+        root = self.root
+        depths = self._depths()
+        return {
+            'trace_id': self.trace_id,
+            'total_ms': round(root.duration_ms, 3),
+            'spans': [
+                {
+                    'name': span.name,
+                    'depth': depths[span.span_id],
+                    'offset_ms': round((span.start_ns - root.start_ns) / 1e6, 3),
+                    'duration_ms': round(span.duration_ms, 3),
+                    **({'attributes': dict(span.attributes)} if span.attributes else {}),
+                    **({'error': span.error} if span.error else {})
+                }
+                for span in self.spans[1:]
+            ]
+        }
+
+    def to_dict(self) -> Dict:
+        """Format untuk /api/debug/traces."""
+        root = self.root
+        return {
+            'trace_id': self.trace_id,
+            'name': root.name,
+            'start': root.start_ns / 1e9,
+            'attributes': dict(root.attributes),
+            **self.timing()
+        }
+
+    def to_otlp_spans(self) -> List[Dict]:
+        spans = []
+        for span in self.spans:
+            entry = {
+                'traceId': self.trace_id,
+                'spanId': span.span_id,
+                'name': span.name,
+                'kind': 2 if span.parent_id is None else 1,  # SERVER / INTERNAL
+                'startTimeUnixNano': str(span.start_ns),
+                'endTimeUnixNano': str(span.end_ns or span.start_ns),
+                'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in span.attributes.items()]
+            }
+            if span.parent_id:
+                entry['parentSpanId'] = span.parent_id
+            if span.error:
+                entry['status'] = {'code': 2, 'message': span.error}
+            spans.append(entry)
+        return spans
+
+
+def to_otlp(traces: List[Trace]) -> Dict:
+    """Bungkus traces sebagai ExportTraceServiceRequest (OTLP/JSON)."""
+    spans = [span for trace in traces for span in trace.to_otlp_spans()]
+    return {
+        'resourceSpans': [{
+            'resource': {
+                'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]
+            },
+            'scopeSpans': [{
+                'scope': {'name': __name__},
+                'spans': spans
+            }]
+        }]
+    }
+
+
+class Span:
+    """Satu span; dipakai sebagai context manager (`with span(...)`)."""
+
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'start_ns', 'end_ns', 'attributes', 'error', '_token')
+
+    def __init__(self, trace: Trace, parent_id: Optional[str], name: str, attributes: Dict):
+        self.trace = trace
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = 0
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self._token = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> 'Span':
+        self.trace.spans.append(self)
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        if self.parent_id is None:
+            _finish(self.trace)
+        return False
+
+
+class _NoopSpan:
+    """Span pengganti di luar trace (tidak mencatat apa pun)."""
+
+    trace = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def start_trace(name: str, **attributes):
+    """Mulai trace baru dengan root span name (context manager).
+
+    Returns:
+        Span root, atau no-op jika TRACING_ENABLED False
+    """
+    if not TRACING_ENABLED:
+        return _NOOP
+    return Span(Trace(), None, name, attributes)
+
+
+def span(name: str, **attributes):
+    """Child span dari span aktif; no-op jika tidak ada trace aktif."""
+    parent = _current_span.get()
+    if parent is None:
+        return _NOOP
+    return Span(parent.trace, parent.span_id, name, attributes)
+
+
+def set_attribute(key: str, value: Any) -> None:
+    """Set atribut pada span aktif (jika ada)."""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes[key] = value
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id dari span aktif (None di luar trace)."""
+    current = _current_span.get()
+    return current.trace.trace_id if current is not None else None
+
+
+def traced(name: str):
+    """Decorator: jalankan fungsi di dalam span name."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _finish(trace: Trace) -> None:
+    with _buffer_lock:
+        _buffer.append(trace)
+    if TRACE_EXPORT_PATH:
+        _export(trace)
+
+
+def _export(trace: Trace) -> None:
+    line = json.dumps(to_otlp([trace]), separators=(',', ':')) + '\n'
+    try:
+        with _export_lock:
+            with open(TRACE_EXPORT_PATH, 'a', encoding='utf-8') as f:
+                f.write(line)
+    except OSError as e:
+        logger.warning(f"Failed to export trace {trace.trace_id}: {e}")
+
+
+def get_traces(limit: Optional[int] = None) -> List[Trace]:
+    """Trace terbaru dari ring buffer (terbaru lebih dulu).
+
+    Args:
+        limit: Jumlah maksimal trace
+    """
+    with _buffer_lock:
+        traces = list(_buffer)
+    traces.reverse()
+    return traces[:limit] if limit else traces
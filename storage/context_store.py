@@ -0,0 +1,220 @@
+"""Shared Context Store untuk Agent Pribadi (AG)
+
+Backend context berbasis SQLite (mode WAL) yang aman dipakai beberapa
+worker/proses sekaligus:
+- Setiap event ditulis dalam satu transaksi BEGIN IMMEDIATE, jadi counter
+  (interaction_count, EWMA stat) di-update atomik di database, bukan
+  read-modify-write di memori proses
+- History command dan sample stat dipangkas di dalam transaksi yang sama
+- `PRAGMA data_version` berubah setiap ada commit dari koneksi lain, dipakai
+  sebagai version stamp untuk invalidasi cache per proses
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.settings import CONTEXT_DB_PATH
+from core.metrics import DB_OPERATION_SECONDS, timed
+from core.tracing import traced
+
+# Busy timeout (detik) saat worker lain sedang menulis
+_BUSY_TIMEOUT = 5.0
+
+
+class ContextStore:
+    """Penyimpanan context bersama (commands, counters, stats) di SQLite."""
+
+    def __init__(self, db_path: Path = CONTEXT_DB_PATH):
+        """Inisialisasi store.
+
+        Args:
+            db_path: Path file SQLite context
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = None
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Koneksi persisten per proses (dibuat ulang setelah fork)."""
+        if self._conn is None or self._pid != os.getpid():
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=_BUSY_TIMEOUT, isolation_level=None,
+                                   check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._init_tables(conn)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _init_tables(self, conn: sqlite3.Connection) -> None:
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS context_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS context_commands (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                command TEXT NOT NULL,
+                command_type TEXT,
+                success INTEGER NOT NULL,
+                timestamp TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS context_stats (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                stat TEXT NOT NULL,
+                ts REAL NOT NULL,
+                value REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_context_stats_stat ON context_stats(stat, id);
+            CREATE TABLE IF NOT EXISTS context_series (
+                stat TEXT PRIMARY KEY,
+                ewma REAL NOT NULL
+            );
+            INSERT OR IGNORE INTO context_meta (key, value) VALUES ('interaction_count', '0');
+        ''')
+
+    def data_version(self) -> int:
+        """Version stamp: berubah jika koneksi lain commit sejak pengecekan terakhir."""
+        with self._lock:
+            return self._get_connection().execute('PRAGMA data_version').fetchone()[0]
+
+    @timed(DB_OPERATION_SECONDS, 'context_add_command')
+    @traced('db.context_add_command')
+    def add_command(self, command: str, command_type: str, success: bool, timestamp: str,
+                    keep: int) -> int:
+        """Simpan command dan naikkan interaction_count secara atomik.
+
+        Args:
+            command: Command yang dijalankan
+            command_type: Tipe command
+            success: Apakah command berhasil
+            timestamp: Waktu command (ISO format)
+            keep: Jumlah command terakhir yang disimpan
+
+        Returns:
+            int: interaction_count setelah increment
+        """
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('''
+                    INSERT INTO context_commands (command, command_type, success, timestamp)
+                    VALUES (?, ?, ?, ?)
+                ''', (command, command_type, int(success), timestamp))
+                conn.execute('''
+                    DELETE FROM context_commands
+                    WHERE id <= (SELECT id FROM context_commands ORDER BY id DESC LIMIT 1 OFFSET ?)
+                ''', (keep,))
+                conn.execute('''
+                    UPDATE context_meta SET value = CAST(value AS INTEGER) + 1
+                    WHERE key = 'interaction_count'
+                ''')
+                conn.execute('''
+                    INSERT INTO context_meta (key, value) VALUES ('last_updated', ?)
+                    ON CONFLICT(key) DO UPDATE SET value = excluded.value
+                ''', (timestamp,))
+                count = conn.execute(
+                    "SELECT CAST(value AS INTEGER) FROM context_meta WHERE key = 'interaction_count'"
+                ).fetchone()[0]
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return count
+
+    @timed(DB_OPERATION_SECONDS, 'context_add_stat')
+    @traced('db.context_add_stat')
+    def add_stat(self, stat: str, ts: float, value: float, keep: int, alpha: float) -> float:
+        """Simpan sample stat dan update EWMA secara atomik.
+
+        Args:
+            stat: Jenis stat
+            ts: Timestamp (epoch)
+            value: Nilai
+            keep: Jumlah sample terakhir yang disimpan per stat
+            alpha: Bobot sample terbaru untuk EWMA
+
+        Returns:
+            float: EWMA setelah update
+        """
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('INSERT INTO context_stats (stat, ts, value) VALUES (?, ?, ?)', (stat, ts, value))
+                conn.execute('''
+                    DELETE FROM context_stats
+                    WHERE stat = ? AND id <= (
+                        SELECT id FROM context_stats WHERE stat = ? ORDER BY id DESC LIMIT 1 OFFSET ?
+                    )
+                ''', (stat, stat, keep))
+                conn.execute('''
+                    INSERT INTO context_series (stat, ewma) VALUES (?, ?)
+                    ON CONFLICT(stat) DO UPDATE SET ewma = ewma * (1 - ?) + excluded.ewma * ?
+                ''', (stat, value, alpha, alpha))
+                ewma = conn.execute('SELECT ewma FROM context_series WHERE stat = ?', (stat,)).fetchone()[0]
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return ewma
+
+    @timed(DB_OPERATION_SECONDS, 'context_load')
+    @traced('db.context_load')
+    def load(self) -> Dict:
+        """Baca seluruh context dalam satu snapshot baca yang konsisten.
+
+        Returns:
+            Dict: {'data_version', 'interaction_count', 'last_updated', 'preferences',
+                   'last_commands', 'stats': {stat: {'t', 'v', 'ewma'}}}
+        """
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute('BEGIN')
+            try:
+                version = conn.execute('PRAGMA data_version').fetchone()[0]
+                meta = {row['key']: row['value'] for row in conn.execute('SELECT key, value FROM context_meta')}
+                commands = [
+                    {
+                        "command": row['command'],
+                        "type": row['command_type'],
+                        "success": bool(row['success']),
+                        "timestamp": row['timestamp']
+                    }
+                    for row in conn.execute(
+                        'SELECT command, command_type, success, timestamp FROM context_commands ORDER BY id'
+                    )
+                ]
+                stats: Dict[str, Dict[str, List]] = {}
+                for row in conn.execute('SELECT stat, ts, value FROM context_stats ORDER BY id'):
+                    series = stats.setdefault(row['stat'], {'t': [], 'v': [], 'ewma': None})
+                    series['t'].append(row['ts'])
+                    series['v'].append(row['value'])
+                for row in conn.execute('SELECT stat, ewma FROM context_series'):
+                    if row['stat'] in stats:
+                        stats[row['stat']]['ewma'] = row['ewma']
+            finally:
+                conn.execute('COMMIT')
+
+        return {
+            'data_version': version,
+            'interaction_count': int(meta.get('interaction_count') or 0),
+            'last_updated': meta.get('last_updated'),
+            'preferences': json.loads(meta['preferences']) if meta.get('preferences') else {},
+            'last_commands': commands,
+            'stats': stats
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
@@ -4,6 +4,10 @@ Mengelola SQLite database untuk:
 - Command history
 - Reminders (future feature)
 - Usage statistics
+- Skor mirror download (throughput/latency, persist antar run)
+
+Durasi setiap operasi publik dicatat ke ag_db_operation_duration_seconds
+(core.metrics) dan sebagai span di trace command yang aktif.
 """
 
 import sqlite3
@@ -12,6 +16,8 @@ from datetime import datetime
 from typing import List, Dict, Optional
 from pathlib import Path
 from config.settings import DB_PATH, MAX_COMMAND_HISTORY
+from core.metrics import DB_OPERATION_SECONDS, timed
+from core.tracing import traced
 
 
 class AgentDatabase:
@@ -24,6 +30,7 @@ class AgentDatabase:
             db_path: Path ke file database SQLite
         """
         self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._init_database()
     
     def _get_connection(self) -> sqlite3.Connection:
@@ -66,6 +73,18 @@ class AgentDatabase:
             )
         ''')
         
+        # Tabel skor mirror download (per host, EWMA)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS mirror_scores (
+                host TEXT PRIMARY KEY,
+                throughput REAL NOT NULL DEFAULT 0,
+                latency REAL NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                failures INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL
+            )
+        ''')
+        
         # Index untuk performa
         cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_command_timestamp 
@@ -75,6 +94,8 @@ class AgentDatabase:
         conn.commit()
         conn.close()
     
+    @timed(DB_OPERATION_SECONDS, 'add_command_history')
+    @traced('db.add_command_history')
     def add_command_history(
         self,
         command: str,
@@ -142,6 +163,8 @@ class AgentDatabase:
             ''', (delete_count,))
             conn.commit()
     
+    @timed(DB_OPERATION_SECONDS, 'get_command_history')
+    @traced('db.get_command_history')
     def get_command_history(self, limit: int = 20) -> List[Dict]:
         """Mengambil command history terbaru.
         
@@ -166,6 +189,28 @@ class AgentDatabase:
         
         return [dict(row) for row in rows]
     
+    @timed(DB_OPERATION_SECONDS, 'get_history_version')
+    @traced('db.get_history_version')
+    def get_history_version(self) -> int:
+        """High-water mark command history (id terbesar, AUTOINCREMENT).
+        
+        Berubah setiap kali entry ditambahkan (cleanup history lama hanya
+        terjadi saat insert), jadi cukup sebagai ETag /api/history.
+        
+        Returns:
+            int: Id entry terbaru (0 jika history kosong)
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT MAX(id) as version FROM command_history')
+        version = cursor.fetchone()['version']
+        
+        conn.close()
+        return version or 0
+    
+    @timed(DB_OPERATION_SECONDS, 'get_command_statistics')
+    @traced('db.get_command_statistics')
     def get_command_statistics(self) -> Dict:
         """Mengambil statistik penggunaan command.
         
@@ -202,6 +247,8 @@ class AgentDatabase:
             'most_used_commands': most_used
         }
     
+    @timed(DB_OPERATION_SECONDS, 'add_reminder')
+    @traced('db.add_reminder')
     def add_reminder(self, remind_at: str, message: str) -> int:
         """Menambahkan reminder baru.
         
@@ -228,6 +275,8 @@ class AgentDatabase:
         
         return reminder_id
     
+    @timed(DB_OPERATION_SECONDS, 'get_pending_reminders')
+    @traced('db.get_pending_reminders')
     def get_pending_reminders(self) -> List[Dict]:
         """Mengambil reminders yang masih pending.
         
@@ -249,6 +298,84 @@ class AgentDatabase:
         
         return [dict(row) for row in rows]
 
+    
+    @timed(DB_OPERATION_SECONDS, 'get_mirror_scores')
+    @traced('db.get_mirror_scores')
+    def get_mirror_scores(self, hosts: List[str]) -> Dict[str, Dict]:
+        """Mengambil skor mirror yang tersimpan.
+        
+        Args:
+            hosts: List host mirror (scheme://netloc)
+        
+        Returns:
+            Dict: {host: {throughput, latency, successes, failures, updated_at}}
+        """
+        if not hosts:
+            return {}
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        placeholders = ', '.join('?' for _ in hosts)
+        cursor.execute(f'''
+            SELECT host, throughput, latency, successes, failures, updated_at
+            FROM mirror_scores
+            WHERE host IN ({placeholders})
+        ''', list(hosts))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return {row['host']: dict(row) for row in rows}
+    
+    @timed(DB_OPERATION_SECONDS, 'record_mirror_result')
+    @traced('db.record_mirror_result')
+    def record_mirror_result(
+        self,
+        host: str,
+        success: bool,
+        throughput: float = 0.0,
+        latency: float = 0.0,
+        alpha: float = 0.3
+    ) -> None:
+        """Update skor mirror dengan EWMA hasil probe/download terbaru.
+        
+        Args:
+            host: Host mirror (scheme://netloc)
+            success: Apakah probe/download berhasil
+            throughput: Throughput terukur (bytes/detik)
+            latency: Latency terukur (detik)
+            alpha: Bobot pengukuran terbaru
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        now = datetime.now().isoformat()
+        
+        if success:
+            cursor.execute('''
+                INSERT INTO mirror_scores (host, throughput, latency, successes, failures, updated_at)
+                VALUES (?, ?, ?, 1, 0, ?)
+                ON CONFLICT(host) DO UPDATE SET
+                    throughput = CASE WHEN successes = 0 THEN excluded.throughput
+                                 ELSE throughput * (1 - ?) + excluded.throughput * ? END,
+                    latency = CASE WHEN successes = 0 THEN excluded.latency
+                              ELSE latency * (1 - ?) + excluded.latency * ? END,
+                    successes = successes + 1,
+                    updated_at = excluded.updated_at
+            ''', (host, throughput, latency, now, alpha, alpha, alpha, alpha))
+        else:
+            cursor.execute('''
+                INSERT INTO mirror_scores (host, successes, failures, updated_at)
+                VALUES (?, 0, 1, ?)
+                ON CONFLICT(host) DO UPDATE SET
+                    failures = failures + 1,
+                    updated_at = excluded.updated_at
+            ''', (host, now))
+        
+        conn.commit()
+        conn.close()
+
 
 # Singleton instance
 _db_instance = None